@@ -0,0 +1,55 @@
+'''
+    Benchmark of 1M Card comparisons against the previous __gt__, which rebuilt the face_value-to-int dict
+    on every call and let __lt__ build it twice through __ge__.
+    Run from the repository root: python -m benchmarks.bench_card_compare
+'''
+import argparse
+import random
+import time
+from src.card import Card, CANONICAL_CARDS, sort_cards
+
+
+def legacy_gt(card: Card, other: Card) -> bool:
+    face_values = ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K']
+    face_value_str_to_int = {}
+    for i in range(len(face_values)):
+        face_value_str_to_int[face_values[i]] = i + 1
+    return face_value_str_to_int[card.get_face_value()] > face_value_str_to_int[other.get_face_value()]
+
+
+def legacy_lt(card: Card, other: Card) -> bool:
+    return not (legacy_gt(card, other) or card.has_same_face_value(other))
+
+
+def time_comparisons(compare, pairs: list[tuple[Card, Card]]) -> float:
+    start = time.perf_counter()
+    for card, other in pairs:
+        compare(card, other)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Card comparisons.')
+    parser.add_argument('--num-comparisons', type=int, default=1_000_000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    pairs = [(rng.choice(CANONICAL_CARDS), rng.choice(CANONICAL_CARDS)) for _ in range(args.num_comparisons)]
+
+    legacy_seconds = time_comparisons(legacy_lt, pairs)
+    seconds = time_comparisons(Card.__lt__, pairs)
+    print(f'{args.num_comparisons} comparisons (A < B): legacy {legacy_seconds:.3f}s, '
+          f'rank table {seconds:.3f}s, speedup {legacy_seconds / seconds:.1f}x')
+
+    cards = [card for card, other in pairs]
+    start = time.perf_counter()
+    sorted(cards)
+    sorted_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    sort_cards(cards)
+    key_seconds = time.perf_counter() - start
+    print(f'sorting {len(cards)} cards: sorted() with __lt__ {sorted_seconds:.3f}s, sort_cards {key_seconds:.3f}s')
+
+
+if __name__ == '__main__':
+    main()
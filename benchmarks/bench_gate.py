@@ -0,0 +1,324 @@
+'''
+    Benchmark regression gate.
+    Plays a fixed set of deterministic scenarios through Game, measures rounds/sec and the latency percentiles of
+    every round and of every call on the hot path of a round, see HOT_CALLS, and compares them with a baseline file.
+    Exits with status 1 if a scenario got slower than the threshold allows or stayed too noisy to tell.
+    Timings of the same code swing by tens of percent between runs on a busy machine, so every repeat of a scenario
+    is paired with a fixed pure-Python reference workload, and the scenarios are compared relative to it.
+    Medians over the repeats are compared. The allowed slowdown widens with the spread measured between repeats,
+    up to the spread allowed by --max-noise: a scenario noisier than that is measured again, and fails if it stays so.
+    Run from the repository root:
+        python -m benchmarks.bench_gate                    compare with benchmarks/baseline.json
+        python -m benchmarks.bench_gate --update-baseline  measure and write the baseline
+    Timings depend on the machine, so the baseline is not checked in. Generate it on the machine the gate runs on,
+    from the last commit known to be fast enough, then compare the commit under test with it:
+        git checkout <known good commit>
+        python -m benchmarks.bench_gate --update-baseline
+        git checkout <commit under test>
+        python -m benchmarks.bench_gate
+    Generate it again after changing the machine, the Python version or the scenarios.
+'''
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+from src.deck import Deck
+from src.shoe import Shoe
+from src.game import Game
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+DEFAULT_THRESHOLD = 0.25
+# p99 latencies move with every interrupt and process of a shared machine, so they get a threshold of their own.
+DEFAULT_TAIL_THRESHOLD = 0.5
+DEFAULT_REPEAT = 11
+# The allowed slowdown is at least this many times the combined spread of the baseline and the new results.
+DEFAULT_NOISE_FACTOR = 3.0
+# Largest noise of a result or of the baseline a comparison is made with, so the allowed slowdown never widens past
+# max(threshold, noise_factor * sqrt(2) * max_noise).
+DEFAULT_MAX_NOISE = 0.1
+DEFAULT_RETRIES = 2
+_PERCENTILES = (50, 90, 99)
+_TAIL_PERCENTILE = 99
+# Calls a round is made of, each timed on its own.
+HOT_CALLS = ('shuffle_cards', 'assign_initial_two_cards', 'run_dealer_turn', 'run_player_turn', 'get_winners')
+
+# Name: (dealer_info, players_info, number of decks in a Shoe or None for a new Deck every round, number of rounds, seed).
+SCENARIOS = {
+    'heads_up': (('dealer_id', 0.3), [('player1', 0.4)], None, 6000, 1),
+    'main_table': (('dealer_id', 0.3), [('player1', 0.3), ('player2', 0.4), ('player3', 0.5)], None, 6000, 2),
+    'full_table': (('dealer_id', 0.3), [(f'player{i}', 0.1 * i) for i in range(1, 8)], None, 4000, 3),
+    'shoe_table': (('dealer_id', 0.3), [(f'player{i}', 0.1 * i) for i in range(1, 6)], 6, 4000, 4),
+}
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    '''
+        Nearest-rank percentile of an ascending list.
+    '''
+    idx = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[idx]
+
+
+def play_scenario(name: str) -> dict[str, list[float]]:
+    '''
+        Play the rounds of a scenario with its seeds the way Game.play_round does.
+        Every round deals from a Deck shuffled with Deck.shuffle_cards, or from a shared Shoe reshuffled at its cut card.
+        Return the latencies in seconds of every round under 'round' and of every call of HOT_CALLS under its name.
+        A round with blackjacks has no dealer or player turns, and a Shoe is only shuffled at its cut card.
+    '''
+    dealer_info, players_info, num_decks, num_rounds, seed = SCENARIOS[name]
+    deck_rng = random.Random(seed)
+    decision_rng = random.Random(seed + 1)
+    shoe = None
+    if num_decks is not None:
+        shoe = Shoe(num_decks, rng = deck_rng)
+        shoe.shuffle_cards()
+    latencies = {call: [] for call in ('round',) + HOT_CALLS}
+    timer = time.perf_counter_ns
+    gc_was_enabled = gc.isenabled()
+    gc.disable()  # Like timeit, so that collections do not land in random rounds.
+    try:
+        for i in range(num_rounds):
+            round_start = timer()
+            if shoe is None:
+                deck = Deck(deck_rng)
+                start = timer()
+                deck.shuffle_cards()
+                latencies['shuffle_cards'].append(timer() - start)
+            else:
+                deck = shoe
+            game = Game(dealer_info, players_info, deck = deck, rng = decision_rng)
+            start = timer()
+            game.assign_initial_two_cards()
+            latencies['assign_initial_two_cards'].append(timer() - start)
+            if not game.get_blackjacks():
+                start = timer()
+                game.run_dealer_turn()
+                latencies['run_dealer_turn'].append(timer() - start)
+                while not game.is_game_end():
+                    start = timer()
+                    game.run_player_turn()
+                    latencies['run_player_turn'].append(timer() - start)
+                start = timer()
+                game.get_winners()
+                latencies['get_winners'].append(timer() - start)
+            latencies['round'].append(timer() - round_start)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return {call: [ns / 1e9 for ns in call_latencies] for call, call_latencies in latencies.items()}
+
+
+class _Reference:
+    __slots__ = ('value',)
+
+    def __init__(self, value: int):
+        self.value = value
+
+    def add(self, other: '_Reference') -> int:
+        return self.value + other.value
+
+
+def reference_speed(num_ops: int = 20000) -> float:
+    '''
+        Run a fixed pure-Python workload of object construction, method calls and list operations, the same kind of
+        work as a round, and return its operations per second. It does not depend on the code under test, so the
+        ratio of a scenario to it cancels out how fast the machine happens to be at the moment.
+    '''
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        items = []
+        total = 0
+        for i in range(num_ops):
+            item = _Reference(i & 63)
+            items.append(item)
+            total += item.add(items[len(items) >> 1])
+            if len(items) > 52:
+                items.clear()
+        return num_ops / (time.perf_counter() - start)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def median(values: list[float]) -> float:
+    values = sorted(values)
+    middle = len(values) // 2
+    return values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2
+
+
+def relative_spread(values: list[float]) -> float:
+    '''
+        Median absolute deviation relative to the median, a spread that single outlier runs do not move.
+    '''
+    center = median(values)
+    return median([abs(value - center) for value in values]) / center if center else 0.0
+
+
+def measure_scenario(name: str, repeat: int = DEFAULT_REPEAT) -> dict:
+    '''
+        Play a scenario once to warm up, then repeat times, each time right after the reference workload.
+        Return the medians over the repeats of the rounds/sec, of each round latency percentile in microseconds,
+        of each latency percentile of every call of HOT_CALLS made in the scenario under 'calls', and of the reference
+        operations/sec, and the spread (see relative_spread) of the rounds/sec relative to the reference.
+    '''
+    play_scenario(name)
+    references = []
+    speeds = []
+    percentiles = {}
+    for trial in range(repeat):
+        references.append(reference_speed())
+        latencies = play_scenario(name)
+        speeds.append(len(latencies['round']) / sum(latencies['round']))
+        for call, call_latencies in latencies.items():
+            call_latencies.sort()
+            for pct in _PERCENTILES:
+                if call_latencies:
+                    percentiles.setdefault(call, {}).setdefault(pct, []).append(percentile(call_latencies, pct) * 1e6)
+    result = {'rounds_per_sec': median(speeds)}
+    for pct in _PERCENTILES:
+        result[f'p{pct}_us'] = median(percentiles['round'][pct])
+    result['calls'] = {call: {f'p{pct}_us': median(percentiles[call][pct]) for pct in _PERCENTILES}
+                       for call in HOT_CALLS if call in percentiles}
+    result['reference_per_sec'] = median(references)
+    result['noise'] = relative_spread([speed / reference for speed, reference in zip(speeds, references)])
+    return result
+
+
+def run_scenario(name: str, repeat: int = DEFAULT_REPEAT, max_noise: float = DEFAULT_MAX_NOISE,
+                 retries: int = DEFAULT_RETRIES) -> dict:
+    '''
+        Measure a scenario, see measure_scenario, again up to retries times while its noise is above max_noise.
+        Return the least noisy of the measurements.
+    '''
+    result = measure_scenario(name, repeat)
+    for retry in range(retries):
+        if result['noise'] <= max_noise:
+            break
+        new_result = measure_scenario(name, repeat)
+        if new_result['noise'] < result['noise']:
+            result = new_result
+    return result
+
+
+def run_scenarios(names: list[str] = None, repeat: int = DEFAULT_REPEAT, max_noise: float = DEFAULT_MAX_NOISE,
+                  retries: int = DEFAULT_RETRIES) -> dict:
+    names = list(SCENARIOS) if names is None else names
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'scenarios': {name: run_scenario(name, repeat, max_noise, retries) for name in names},
+    }
+
+
+def _compare_latencies(label: str, latencies: dict, expected: dict, scale: float, allowed: float,
+                       tail_allowed: float) -> list[str]:
+    regressions = []
+    for pct in _PERCENTILES:
+        metric = f'p{pct}_us'
+        metric_allowed = tail_allowed if pct >= _TAIL_PERCENTILE else allowed
+        if metric in expected and metric in latencies and latencies[metric] > expected[metric] / scale * (1 + metric_allowed):
+            regressions.append(f'{label} {metric} {latencies[metric]:,.1f}, baseline {expected[metric] / scale:,.1f}, '
+                               f'allowed slowdown {metric_allowed:.0%}')
+    return regressions
+
+
+def compare(results: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD,
+            noise_factor: float = DEFAULT_NOISE_FACTOR, max_noise: float = DEFAULT_MAX_NOISE,
+            tail_threshold: float = DEFAULT_TAIL_THRESHOLD) -> list[str]:
+    '''
+        threshold: allowed relative slowdown, e.g. 0.25 for 25% fewer rounds/sec or 25% higher latency.
+        It is widened to noise_factor times the combined noise of both results when that is larger.
+        tail_threshold: allowed relative slowdown of p99 latencies, widened the same way.
+        max_noise: largest noise of the results or of the baseline to compare with. A noisier scenario is reported
+        instead of compared, so the allowed slowdown is at most max(threshold, noise_factor * sqrt(2) * max_noise).
+        When both results have a reference speed, the baseline is first scaled to the speed of the machine
+        the results were measured at.
+        Return a message for every scenario in both results and baseline that is too noisy, and for every metric of
+        the others, of the round or of a hot call, that regressed beyond the allowed slowdown.
+    '''
+    regressions = []
+    for name, result in results['scenarios'].items():
+        expected = baseline['scenarios'].get(name)
+        if expected is None:
+            continue
+        if max(result.get('noise', 0.0), expected.get('noise', 0.0)) > max_noise:
+            regressions.append(f'{name}: noise {result.get("noise", 0.0):.1%}, baseline {expected.get("noise", 0.0):.1%}, '
+                               f'above {max_noise:.1%}, too noisy to compare')
+            continue
+        noise = math.hypot(result.get('noise', 0.0), expected.get('noise', 0.0))
+        scale = 1.0
+        if 'reference_per_sec' in result and 'reference_per_sec' in expected:
+            scale = result['reference_per_sec'] / expected['reference_per_sec']
+        allowed = max(threshold, noise_factor * noise)
+        tail_allowed = max(tail_threshold, noise_factor * noise)
+        expected_rounds_per_sec = expected['rounds_per_sec'] * scale
+        if result['rounds_per_sec'] < expected_rounds_per_sec * (1 - allowed):
+            regressions.append(f'{name}: {result["rounds_per_sec"]:,.0f} rounds/sec, '
+                               f'baseline {expected_rounds_per_sec:,.0f}, allowed slowdown {allowed:.0%}')
+        regressions += _compare_latencies(f'{name}:', result, expected, scale, allowed, tail_allowed)
+        for call, latencies in result.get('calls', {}).items():
+            if call in expected.get('calls', {}):
+                regressions += _compare_latencies(f'{name}: {call}', latencies, expected['calls'][call], scale, allowed,
+                                                  tail_allowed)
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Compare the throughput of fixed Game scenarios with a stored baseline.')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='path of the baseline JSON file')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='allowed relative slowdown')
+    parser.add_argument('--tail-threshold', type=float, default=DEFAULT_TAIL_THRESHOLD,
+                        help='allowed relative slowdown of p99 latencies')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--noise-factor', type=float, default=DEFAULT_NOISE_FACTOR,
+                        help='minimum allowed slowdown in multiples of the measured noise')
+    parser.add_argument('--max-noise', type=float, default=DEFAULT_MAX_NOISE,
+                        help='largest noise to compare with, scenarios above it are measured again and then fail')
+    parser.add_argument('--retries', type=int, default=DEFAULT_RETRIES, help='measurements again of a noisy scenario')
+    parser.add_argument('--scenario', action='append', choices=list(SCENARIOS), help='scenario to run, all if not given')
+    parser.add_argument('--update-baseline', action='store_true', help='write the measured results as the new baseline')
+    args = parser.parse_args()
+    results = run_scenarios(args.scenario, args.repeat, args.max_noise, args.retries)
+    for name, result in results['scenarios'].items():
+        latencies = ', '.join(f'p{pct} {result[f"p{pct}_us"]:,.1f}us' for pct in _PERCENTILES)
+        print(f'{name:12} {result["rounds_per_sec"]:10,.0f} rounds/sec   {latencies}   noise {result["noise"]:.1%}')
+        for call, call_result in result['calls'].items():
+            latencies = ', '.join(f'p{pct} {call_result[f"p{pct}_us"]:,.1f}us' for pct in _PERCENTILES)
+            print(f'    {call:26} {latencies}')
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent = 2)
+        print(f'Baseline written to {args.baseline}')
+        noisy = [name for name, result in results['scenarios'].items() if result['noise'] > args.max_noise]
+        if noisy:
+            print(f'Warning: {", ".join(noisy)} above the max noise, compared with nothing until measured again.',
+                  file = sys.stderr)
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f'No baseline at {args.baseline}. Run with --update-baseline on a known good commit first.', file = sys.stderr)
+        return 2
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    for key in ('python', 'implementation', 'machine'):
+        if baseline.get(key) != results[key]:
+            print(f'Warning: baseline measured with {key} {baseline.get(key)}, not {results[key]}.', file = sys.stderr)
+    regressions = compare(results, baseline, args.threshold, args.noise_factor, args.max_noise, args.tail_threshold)
+    for regression in regressions:
+        print(f'REGRESSION {regression}', file = sys.stderr)
+    if regressions:
+        return 1
+    print(f'No regression beyond {args.threshold:.0%}.')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,55 @@
+'''
+    Compare rounds dealt from a new lazily shuffled Deck per round with rounds dealt from one InfiniteDeck:
+    throughput, and how far the infinite deck moves the win, bust and blackjack rates of every seat.
+    The differences are shown with the half width of their 95% normal approximation interval, so the ones
+    larger than the interval are the card removal effects the infinite deck ignores.
+    Run from the repository root: python -m benchmarks.bench_infinite_deck
+'''
+import argparse
+import math
+import time
+from src.simulation import run_rounds, SimulationResult
+
+_DEALER_INFO = ('dealer_id', 0.3)
+_PLAYERS_INFO = [('player1', 0.3), ('player2', 0.4), ('player3', 0.5)]
+
+
+def timed_run(num_rounds: int, seed: int, infinite_deck: bool) -> tuple[SimulationResult, float]:
+    '''
+        Return the result and the rounds per second.
+    '''
+    start = time.perf_counter()
+    result = run_rounds(_DEALER_INFO, _PLAYERS_INFO, num_rounds, seed, infinite_deck = infinite_deck)
+    return result, num_rounds / (time.perf_counter() - start)
+
+
+def rate_diff(count: int, other_count: int, num_rounds: int) -> tuple[float, float]:
+    '''
+        Return the difference of two rates over independent runs of num_rounds rounds and the half width of its 95% interval.
+    '''
+    rate, other_rate = count / num_rounds, other_count / num_rounds
+    half_width = 1.96 * math.sqrt((rate * (1 - rate) + other_rate * (1 - other_rate)) / num_rounds)
+    return other_rate - rate, half_width
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare finite and infinite deck rounds.')
+    parser.add_argument('--num-rounds', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    finite, finite_speed = timed_run(args.num_rounds, args.seed, False)
+    infinite, infinite_speed = timed_run(args.num_rounds, args.seed, True)
+    print(f'finite deck   {finite_speed:9.0f} rounds/s')
+    print(f'infinite deck {infinite_speed:9.0f} rounds/s   {infinite_speed / finite_speed:.2f}x')
+    print(f'{"seat":10} {"rate":10} {"finite":>8} {"infinite":>8} {"diff":>16}')
+    for name, finite_counts, infinite_counts in [('win', finite.get_wins(), infinite.get_wins()),
+                                                 ('bust', finite.get_busts(), infinite.get_busts()),
+                                                 ('blackjack', finite.get_blackjacks(), infinite.get_blackjacks())]:
+        for participant_id in finite.get_participant_ids():
+            diff, half_width = rate_diff(finite_counts[participant_id], infinite_counts[participant_id], args.num_rounds)
+            print(f'{participant_id:10} {name:10} {finite_counts[participant_id] / args.num_rounds:8.4f} '
+                  f'{infinite_counts[participant_id] / args.num_rounds:8.4f} {diff:+8.4f} +- {half_width:.4f}')
+
+
+if __name__ == '__main__':
+    main()
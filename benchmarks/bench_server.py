@@ -0,0 +1,38 @@
+'''
+    Load test of the asyncio table server: many tables play rounds concurrently and the decision latency is reported.
+    Without --port a TableServer is started in the same event loop, so the latency includes both sides.
+    Run from the repository root: python -m benchmarks.bench_server --num-tables 1000
+'''
+import argparse
+import asyncio
+from src.server import TableServer, run_load_test
+
+
+async def run(args) -> dict:
+    if args.port is not None:
+        return await run_load_test(args.host, args.port, args.num_tables, args.clients_per_table, args.num_rounds, seed = args.seed)
+    server = TableServer(max_tables = args.num_tables, seed = args.seed)
+    await server.start()
+    try:
+        return await run_load_test('127.0.0.1', server.get_port(), args.num_tables, args.clients_per_table, args.num_rounds,
+                                   seed = args.seed)
+    finally:
+        await server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the asyncio table server.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, help='port of a running server. A server is started in-process if not given')
+    parser.add_argument('--num-tables', type=int, default=1000)
+    parser.add_argument('--clients-per-table', type=int, default=1)
+    parser.add_argument('--num-rounds', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    result = asyncio.run(run(args))
+    print(f'{result["rounds"]} rounds at {args.num_tables} tables: {result["rounds_per_sec"]:,.0f} rounds/sec, '
+          f'{result["decisions"]} decisions, p50 {result["p50_us"]:,.0f}us, p99 {result["p99_us"]:,.0f}us')
+
+
+if __name__ == '__main__':
+    main()
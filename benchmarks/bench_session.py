@@ -0,0 +1,52 @@
+'''
+    Compare playing rounds on a new Game and Deck per round, as simulation.run_rounds does, with one Game played
+    through Game.play_rounds, which resets the hands, turn number and deck in place between rounds.
+    Run from the repository root: python -m benchmarks.bench_session
+'''
+import argparse
+import random
+import time
+from src.deck import Deck
+from src.game import Game
+
+_DEALER_INFO = ('dealer_id', 0.3)
+_PLAYERS_INFO = [('player1', 0.3), ('player2', 0.4), ('player3', 0.5)]
+
+
+def new_game_per_round(num_rounds: int, seed: int) -> float:
+    '''
+        Return the rounds per second.
+    '''
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    for i in range(num_rounds):
+        deck = Deck(rng)
+        deck.shuffle_cards(lazy = True)
+        Game(_DEALER_INFO, _PLAYERS_INFO, deck = deck, rng = rng).play_round()
+    return num_rounds / (time.perf_counter() - start)
+
+
+def session(num_rounds: int, seed: int) -> float:
+    '''
+        Return the rounds per second.
+    '''
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    for blackjack_players, winners in Game(_DEALER_INFO, _PLAYERS_INFO, rng = rng).play_rounds(num_rounds):
+        pass
+    return num_rounds / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare a new Game per round with a Game.play_rounds session.')
+    parser.add_argument('--num-rounds', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    before = max(new_game_per_round(args.num_rounds, seed) for seed in range(args.repeat))
+    after = max(session(args.num_rounds, seed) for seed in range(args.repeat))
+    print(f'new game per round {before:9.0f} rounds/s')
+    print(f'play_rounds        {after:9.0f} rounds/s   {after / before:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,31 @@
+'''
+    Throughput of run_simulation for an increasing number of worker processes.
+    Run from the repository root: python -m benchmarks.bench_simulation
+'''
+import argparse
+import os
+import time
+from src.simulation import run_simulation
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the process-pool Monte Carlo runner.')
+    parser.add_argument('--num-rounds', type=int, default=200_000)
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    dealer_info = ('dealer_id', 0.3)
+    players_info = [('player1', 0.3), ('player2', 0.4), ('player3', 0.5)]
+    base_rate = None
+    num_workers = 1
+    while num_workers <= args.max_workers:
+        start = time.perf_counter()
+        run_simulation(dealer_info, players_info, args.num_rounds, num_workers = num_workers, seed = args.seed)
+        rate = args.num_rounds / (time.perf_counter() - start)
+        base_rate = base_rate or rate
+        print(f'{num_workers} workers: {rate:,.0f} rounds/sec, speedup {rate / base_rate:.2f}x')
+        num_workers *= 2
+
+
+if __name__ == '__main__':
+    main()
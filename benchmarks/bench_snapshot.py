@@ -0,0 +1,63 @@
+'''
+    Compare checkpointing a Game mid-round with Game.to_bytes / Game.from_bytes against pickle.
+    pickle also stores the random.Random state of the game, which a snapshot leaves out.
+    Run from the repository root: python -m benchmarks.bench_snapshot
+'''
+import argparse
+import pickle
+import random
+import timeit
+from src.deck import Deck
+from src.shoe import Shoe
+from src.game import Game
+
+
+def make_game(num_players: int, num_decks: int = None, seed: int = 0) -> Game:
+    '''
+        A game after the initial deal and the dealer's turn, dealt from a Deck or from a Shoe of num_decks decks.
+    '''
+    rng = random.Random(seed)
+    deck = Deck(rng) if num_decks is None else Shoe(num_decks, rng = rng)
+    game = Game(('dealer_id', 0.3), [(f'player{i}', 0.1 * i) for i in range(1, num_players + 1)], deck = deck, rng = rng)
+    game._deck.shuffle_cards()
+    game.assign_initial_two_cards()
+    game.run_dealer_turn()
+    return game
+
+
+def best_us(function, number: int, repeat: int) -> float:
+    return min(timeit.repeat(function, number = number, repeat = repeat)) / number * 1e6
+
+
+def run(num_players: int, num_decks: int = None, number: int = 2000, repeat: int = 7) -> dict:
+    game = make_game(num_players, num_decks)
+    data = game.to_bytes()
+    pickled = pickle.dumps(game)
+    result = {
+        'snapshot_bytes': len(data),
+        'pickle_bytes': len(pickled),
+        'to_bytes_us': best_us(game.to_bytes, number, repeat),
+        'from_bytes_us': best_us(lambda: Game.from_bytes(data), number, repeat),
+        'dumps_us': best_us(lambda: pickle.dumps(game), number, repeat),
+        'loads_us': best_us(lambda: pickle.loads(pickled), number, repeat),
+    }
+    result['speedup'] = (result['dumps_us'] + result['loads_us']) / (result['to_bytes_us'] + result['from_bytes_us'])
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare Game snapshots with pickle.')
+    parser.add_argument('--number', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=7)
+    args = parser.parse_args()
+    for num_players, num_decks in [(1, None), (3, None), (7, None), (5, 6)]:
+        result = run(num_players, num_decks, args.number, args.repeat)
+        deck = 'deck' if num_decks is None else f'{num_decks}-deck shoe'
+        print(f'{num_players} players, {deck:12} snapshot {result["snapshot_bytes"]:5} B '
+              f'{result["to_bytes_us"]:6.1f} + {result["from_bytes_us"]:6.1f} us   '
+              f'pickle {result["pickle_bytes"]:5} B {result["dumps_us"]:6.1f} + {result["loads_us"]:6.1f} us   '
+              f'{result["speedup"]:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+'''
+    Micro and macro benchmarks of the hot paths of Card, Deck, Player and Game.
+    Every benchmark is timed with timeit over several repeats. The results are printed and, with --output,
+    written as JSON so that runs can be compared.
+    Run from the repository root: python -m benchmarks.bench_suite --output results.json
+'''
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import timeit
+from src.card import Card, CANONICAL_CARDS
+from src.deck import Deck
+from src.player import Player
+from src.game import Game
+from src.events import iter_rounds
+
+_DEALER_INFO = ('dealer_id', 0.3)
+_PLAYERS_INFO = [('player1', 0.3), ('player2', 0.4), ('player3', 0.5)]
+
+
+def bench_card_construct(rng: random.Random):
+    face_values = [rng.choice(['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']) for i in range(1000)]
+    suits = [rng.choice(['club', 'diamond', 'heart', 'spade']) for i in range(1000)]
+
+    def run():
+        for face_value, suit in zip(face_values, suits):
+            Card(face_value, suit)
+    return run, 1000
+
+
+def bench_card_compare(rng: random.Random):
+    pairs = [(rng.choice(CANONICAL_CARDS), rng.choice(CANONICAL_CARDS)) for i in range(1000)]
+
+    def run():
+        for card, other in pairs:
+            card < other
+    return run, 1000
+
+
+def bench_deck_construct(rng: random.Random):
+    return Deck, 1
+
+
+def bench_deck_shuffle(rng: random.Random):
+    deck = Deck(rng)
+    return deck.shuffle_cards, 1
+
+
+def bench_deck_issue_card(rng: random.Random):
+    '''
+        Issue the 52 cards of a shuffled deck one at a time.
+    '''
+    deck = Deck(rng)
+    deck.shuffle_cards()
+    player = Player('player_id', 0.3)
+
+    def run():
+        deck.return_issued_cards()
+        player._cards = []
+        for i in range(52):
+            deck.issue_card(player)
+    return run, 52
+
+
+def make_bench_calculate_score(num_cards: int):
+    def bench(rng: random.Random):
+        '''
+            Score new hands of num_cards cards, including setting the cards at hand.
+        '''
+        hands = [rng.sample(CANONICAL_CARDS, num_cards) for i in range(100)]
+        player = Player('player_id', 0.3)
+
+        def run():
+            for hand in hands:
+                player._cards = hand
+                player.calculate_score()
+        return run, 100
+    return bench
+
+
+def bench_game_play_round(rng: random.Random):
+    '''
+        One round on a new shuffled deck through Game.play_round.
+    '''
+    def run():
+        deck = Deck(rng)
+        deck.shuffle_cards(lazy = True)
+        Game(_DEALER_INFO, _PLAYERS_INFO, deck = deck, rng = rng).play_round()
+    return run, 1
+
+
+def bench_main_rounds(rng: random.Random):
+    '''
+        100 rounds through iter_rounds, the way src/main.py plays them.
+    '''
+    def run():
+        for record in iter_rounds(_DEALER_INFO, _PLAYERS_INFO, num_rounds = 100, rng = rng):
+            pass
+    return run, 100
+
+
+# Name: (setup returning the function to time and the number of operations per call, number of calls per repeat).
+BENCHMARKS = {
+    'card_construct': (bench_card_construct, 200),
+    'card_compare': (bench_card_compare, 500),
+    'deck_construct': (bench_deck_construct, 50000),
+    'deck_shuffle': (bench_deck_shuffle, 5000),
+    'deck_issue_card': (bench_deck_issue_card, 5000),
+    'player_calculate_score_2': (make_bench_calculate_score(2), 2000),
+    'player_calculate_score_5': (make_bench_calculate_score(5), 2000),
+    'player_calculate_score_10': (make_bench_calculate_score(10), 2000),
+    'game_play_round': (bench_game_play_round, 5000),
+    'main_rounds': (bench_main_rounds, 50),
+}
+
+
+def run_benchmark(name: str, repeat: int = 5, scale: float = 1.0, seed: int = 0) -> dict:
+    '''
+        Time one benchmark repeat times.
+        scale: factor on the number of calls per repeat, e.g. 0.1 for a quick run.
+        Return a dict with the best and median time per operation in nanoseconds.
+    '''
+    setup, number = BENCHMARKS[name]
+    run, ops_per_call = setup(random.Random(seed))
+    number = max(1, int(number * scale))
+    timings = timeit.Timer(run).repeat(repeat = repeat, number = number)
+    ns_per_op = [timing / (number * ops_per_call) * 1e9 for timing in timings]
+    return {
+        'repeat': repeat,
+        'number': number,
+        'ops_per_call': ops_per_call,
+        'best_ns_per_op': min(ns_per_op),
+        'median_ns_per_op': statistics.median(ns_per_op),
+    }
+
+
+def run_suite(names: list[str] = None, repeat: int = 5, scale: float = 1.0, seed: int = 0) -> dict:
+    '''
+        Run the benchmarks in names, all of them if not given.
+        Return the JSON-serializable results together with the interpreter and machine they were measured on.
+    '''
+    names = list(BENCHMARKS) if names is None else names
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'timestamp': time.time(),
+        'benchmarks': {name: run_benchmark(name, repeat, scale, seed) for name in names},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the hot paths of Card, Deck, Player and Game.')
+    parser.add_argument('--output', help='path of the JSON file to write the results to')
+    parser.add_argument('--filter', default='', help='only run the benchmarks whose name contains this string')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--scale', type=float, default=1.0, help='factor on the number of calls per repeat')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    names = [name for name in BENCHMARKS if args.filter in name]
+    results = run_suite(names, args.repeat, args.scale, args.seed)
+    for name, result in results['benchmarks'].items():
+        print(f'{name:28} best {result["best_ns_per_op"]:12,.0f} ns/op   median {result["median_ns_per_op"]:12,.0f} ns/op')
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent = 2)
+        print(f'Results written to {args.output}', file = sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+from src.player import Player, Dealer
+import numpy as np
+
+# Value of the card at each position of a freshly constructed Deck (2-10, J, Q, K, A with 4 suits each).
+# Aces are stored as 1 and promoted to 11 by _calculate_scores, exactly like Player.calculate_score.
+_DECK_SIZE = 52
+_CARD_VALUES = np.array([face_value for face_value in range(2, 11) for suit in range(4)] + [10] * 12 + [1] * 4, dtype=np.int16)
+
+
+def _calculate_scores(hard_totals: np.ndarray, num_aces: np.ndarray) -> np.ndarray:
+    '''
+        Vectorized Player.calculate_score.
+        hard_totals: sum of card values with every Ace counted as 1.
+        num_aces: number of Aces in each hand.
+        Return the scores, -1 for busted hands.
+    '''
+    soft = (num_aces > 0) & (hard_totals <= 11)
+    return np.where(hard_totals > 21, -1, hard_totals + soft * 10)
+
+
+class BatchResult:
+    '''
+        Per-table outcome arrays of BatchGame.play_rounds.
+        Seat 0 is the dealer and seat i (i >= 1) is the i-th player.
+            seat_ids: ids of the dealer and players in seat order.
+            scores: (num_tables, num_seats) final scores, -1 if busted.
+            blackjacks: (num_tables, num_seats) True if the initial two cards sum to 21.
+            ended_by_blackjack: (num_tables,) True if the round ended right after the initial deal.
+            winners: (num_tables, num_seats) True for the alive seats with equal highest score.
+            num_cards_issued: (num_tables,) number of cards dealt from each table's deck.
+    '''
+    def __init__(self, seat_ids: list[str], scores: np.ndarray, blackjacks: np.ndarray,
+                 ended_by_blackjack: np.ndarray, winners: np.ndarray, num_cards_issued: np.ndarray):
+        self.seat_ids = seat_ids
+        self.scores = scores
+        self.blackjacks = blackjacks
+        self.ended_by_blackjack = ended_by_blackjack
+        self.winners = winners
+        self.num_cards_issued = num_cards_issued
+
+    def get_num_tables(self) -> int:
+        return len(self.scores)
+
+
+class BatchGame:
+    def __init__(self, dealer_info: tuple[str, float], players_info: list[tuple[str, float]]):
+        '''
+            Play many independent rounds of Game at once on integer arrays.
+            dealer_info and players_info have the same meaning as in Game.
+            Every table has its own freshly shuffled 52-card deck.
+        '''
+        if not players_info:
+            raise ValueError('At least one player is needed.')
+        if len(players_info) > 25:
+            raise ValueError('Max number of players is 25.')
+        # Reuse the validation of Player/Dealer for ids and probabilities of drawing.
+        self._dealer = Dealer(dealer_info[0], dealer_info[1])
+        self._players = [Player(player_info[0], player_info[1], None, *player_info[2:]) for player_info in players_info]
+        for player in self._players:
+            if not player.has_default_policy():
+                raise TypeError(f'BatchGame only draws with prob_to_draw, not with the {type(player.get_policy()).__name__} '
+                                f'of {player.get_player_id()}.')
+
+    def get_num_seats(self) -> int:
+        '''
+            Return number of seats, i.e. the dealer plus the players.
+        '''
+        return len(self._players) + 1
+
+    def _run_turn(self, seat: int, draws: np.ndarray, values: np.ndarray, positions: np.ndarray,
+                  hard_totals: np.ndarray, num_aces: np.ndarray, rng: np.random.Generator):
+        '''
+            Vectorized Game.run_dealer_turn (seat 0) or Game.run_player_turn (seat >= 1).
+            draws: tables that still take part in the turn. Modified in place.
+        '''
+        participant = self._dealer if seat == 0 else self._players[seat - 1]
+        prob_to_draw = participant.get_prob_to_draw()
+        while True:
+            scores = _calculate_scores(hard_totals[:, seat], num_aces[:, seat])
+            draws &= (scores != -1) & (positions < _DECK_SIZE)
+            decisions = rng.random(len(draws)) < prob_to_draw
+            if seat == 0:
+                decisions |= scores < 17
+            draws &= decisions
+            tables = np.nonzero(draws)[0]
+            if len(tables) == 0:
+                return
+            cards = values[tables, positions[tables]]
+            hard_totals[tables, seat] += cards
+            num_aces[tables, seat] += cards == 1
+            positions[tables] += 1
+
+    def play_rounds(self, num_tables: int, rng: np.random.Generator = None) -> BatchResult:
+        '''
+            Play one round on each of num_tables tables, following src/main.py:
+                deal two cards to the dealer and then to each player,
+                end the round if anyone has a blackjack,
+                otherwise run the dealer's turn, every player's turn and pick the winners.
+            rng: numpy random generator. A new unseeded generator is used if not given.
+            Return a BatchResult.
+        '''
+        if num_tables < 1:
+            raise ValueError('num_tables must be positive.')
+        if rng is None:
+            rng = np.random.default_rng()
+        num_seats = self.get_num_seats()
+        decks = rng.random((num_tables, _DECK_SIZE)).argsort(axis=1)
+        values = _CARD_VALUES[decks]
+
+        initial_cards = values[:, :num_seats * 2].reshape(num_tables, num_seats, 2)
+        hard_totals = initial_cards.sum(axis=2)
+        num_aces = (initial_cards == 1).sum(axis=2)
+        positions = np.full(num_tables, num_seats * 2)
+
+        blackjacks = _calculate_scores(hard_totals, num_aces) == 21
+        ended_by_blackjack = blackjacks.any(axis=1)
+        for seat in range(num_seats):
+            self._run_turn(seat, ~ended_by_blackjack, values, positions, hard_totals, num_aces, rng)
+
+        scores = _calculate_scores(hard_totals, num_aces)
+        best_scores = scores.max(axis=1, keepdims=True)
+        winners = (scores != -1) & (scores == best_scores) & ~ended_by_blackjack[:, None]
+        seat_ids = [self._dealer.get_player_id()] + [player.get_player_id() for player in self._players]
+        return BatchResult(seat_ids, scores, blackjacks, ended_by_blackjack, winners, positions)
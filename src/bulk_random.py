@@ -0,0 +1,79 @@
+from functools import lru_cache
+import random
+
+# Bounded integers are drawn in bulk: a single uniform integer below the product of several consecutive bounds
+# is split into its mixed-radix digits, which are independent and uniform on their own bounds.
+# Products are kept below 2**64 so that one getrandbits call usually serves a dozen positions.
+_MAX_PRODUCT = 1 << 64
+
+
+def randbelow(rng: random.Random, n: int) -> int:
+    '''
+        Return a uniform integer in [0, n). Same as rng.randrange(n) for random.Random, without its argument checks.
+    '''
+    getrandbits = rng.getrandbits
+    k = n.bit_length()
+    r = getrandbits(k)
+    while r >= n:
+        r = getrandbits(k)
+    return r
+
+
+@lru_cache(maxsize=None)
+def _plan(num_cards: int, start: int) -> tuple[tuple[int, int, tuple[tuple[int, int], ...]], ...]:
+    '''
+        Groups of the Fisher-Yates positions start..num_cards-2 of a sequence of num_cards elements.
+        Every group is the product of the bounds of its positions, its bit length and its (position, bound) pairs,
+        the bound of position i being num_cards - i.
+    '''
+    plan = []
+    i = start
+    while i < num_cards - 1:
+        product = 1
+        positions = []
+        while i < num_cards - 1 and product * (num_cards - i) <= _MAX_PRODUCT:
+            product *= num_cards - i
+            positions.append((i, num_cards - i))
+            i += 1
+        plan.append((product, product.bit_length(), tuple(positions)))
+    return tuple(plan)
+
+
+def shuffle(cards: list | bytearray, rng: random.Random, start: int = 0) -> bool:
+    '''
+        Shuffle cards[start:] in place, swapping every position i with a uniform position in [i, len(cards)),
+        i.e. uniformly over all orders, drawing the swap positions in bulk.
+        Return True if successful.
+    '''
+    getrandbits = rng.getrandbits
+    for product, k, positions in _plan(len(cards), start):
+        r = getrandbits(k)
+        while r >= product:
+            r = getrandbits(k)
+        for i, bound in positions:
+            r, offset = divmod(r, bound)
+            if offset:
+                cards[i], cards[i + offset] = cards[i + offset], cards[i]
+    return True
+
+
+def draw_offsets(rng: random.Random, num_cards: int, start: int) -> list[int]:
+    '''
+        Draw the swap offsets of the next group of Fisher-Yates positions from start, for a sequence of num_cards elements.
+        Return them in reverse, so that list.pop() gives the offset of position start first.
+        The offset of position i is uniform in [0, num_cards - i). An empty list if start is the last position or beyond.
+    '''
+    plan = _plan(num_cards, start)
+    if not plan:
+        return []
+    product, k, positions = plan[0]
+    getrandbits = rng.getrandbits
+    r = getrandbits(k)
+    while r >= product:
+        r = getrandbits(k)
+    offsets = []
+    for i, bound in positions:
+        r, offset = divmod(r, bound)
+        offsets.append(offset)
+    offsets.reverse()
+    return offsets
@@ -1,81 +1,146 @@
+_FACE_VALUES = ('2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A')
+_SUITS = ('club', 'diamond', 'heart', 'spade')
+_FACE_VALUE_TO_RANK = {face_value: rank for rank, face_value in enumerate(_FACE_VALUES)}
+_SUIT_TO_IDX = {suit: idx for idx, suit in enumerate(_SUITS)}
+# Lookup tables indexed by rank, i.e. the position of the face_value in _FACE_VALUES.
+_SCORES = (2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10, -1)
+_IS_FACE = (False,) * 9 + (True, True, True, False)
+_IS_ACE = (False,) * 12 + (True,)
+# Order used by comparisons: A < 2 < ... < 10 < J < Q < K, indexed by rank.
+_COMPARISON_RANKS = (2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 1)
+# Indexed by code: value of the card in a hand total with an Ace counted as 1.
+_HARD_VALUE_BY_CODE = tuple(1 if _IS_ACE[code >> 2] else _SCORES[code >> 2] for code in range(52))
+# Indexed by code: comparison rank of the card and the sort key breaking ties by suit_idx.
+_COMPARISON_RANK_BY_CODE = tuple(_COMPARISON_RANKS[code >> 2] for code in range(52))
+_RANK_KEY_BY_CODE = tuple(_COMPARISON_RANKS[code >> 2] * 4 + (code & 3) for code in range(52))
+
+
 class Card:
-    _VALID_FACE_VALUES = {'2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A'}
-    _VALID_SUITS = {'spade', 'club', 'diamond', 'heart'}
-    
+    '''
+        A card is stored as the integer code rank * 4 + suit_idx, where rank is the index of its face_value in
+        ('2', ..., '10', 'J', 'Q', 'K', 'A') and suit_idx is the index of its suit in ('club', 'diamond', 'heart', 'spade').
+        Codes 0-51 follow the order of the cards of a freshly constructed Deck.
+    '''
+    _VALID_FACE_VALUES = set(_FACE_VALUES)
+    _VALID_SUITS = set(_SUITS)
+    __slots__ = ('_code', '_interned')
+
     def __init__(self, face_value: str, suit: str):
-        if face_value not in Card._VALID_FACE_VALUES:
+        if face_value not in _FACE_VALUE_TO_RANK:
             raise ValueError(f'Invalid face_value input. Valid face_values are {Card._VALID_FACE_VALUES}.')
-        if suit not in Card._VALID_SUITS:
+        if suit not in _SUIT_TO_IDX:
             raise ValueError(f'Invalid suit input. Valid suits are {self._VALID_SUITS}.')
-        self._face_value = face_value
-        self._suit = suit
-        
+        self._code = _FACE_VALUE_TO_RANK[face_value] * 4 + _SUIT_TO_IDX[suit]
+        self._interned = False
+
+    @staticmethod
+    def from_code(code: int) -> 'Card':
+        '''
+            Return the canonical immutable Card object for the code.
+        '''
+        return CANONICAL_CARDS[code]
+
+    def _check_mutable(self):
+        if self._interned:
+            raise AttributeError('Canonical Card objects are immutable. Construct a new Card instead.')
+
+    @property
+    def _face_value(self) -> str:
+        return _FACE_VALUES[self._code >> 2]
+
+    @_face_value.setter
+    def _face_value(self, face_value: str):
+        self._check_mutable()
+        self._code = _FACE_VALUE_TO_RANK[face_value] * 4 + (self._code & 3)
+
+    @property
+    def _suit(self) -> str:
+        return _SUITS[self._code & 3]
+
+    @_suit.setter
+    def _suit(self, suit: str):
+        self._check_mutable()
+        self._code = (self._code & ~3) | _SUIT_TO_IDX[suit]
+
     def __eq__(self, other): # __eq__ (i.e. A == B ) is always reserved for comparing all fields of two objects A and B
-        return (self._face_value == other._face_value and 
-                self._suit == other._suit)
+        return self._code == other._code
 
     def __gt__(self, other):
         '''
             Check if A > B by comparing their face_value.
         '''
-        face_values = ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K']
-        face_value_str_to_int = {}
-        for i in range(len(face_values)):
-            face_value_str_to_int[face_values[i]] = i + 1
-        return face_value_str_to_int[self._face_value] > face_value_str_to_int[other._face_value] 
+        return _COMPARISON_RANK_BY_CODE[self._code] > _COMPARISON_RANK_BY_CODE[other._code]
 
     def has_same_face_value(self, other):
         '''
             Check if two cards have same face_value.
         '''
-        return self._face_value == other._face_value
-    
+        return self._code >> 2 == other._code >> 2
+
     def __ge__(self, other):
         '''
            Check if A >= B by comparing their face_value.
         '''
-        return self > other or self.has_same_face_value(other)
-    
+        return _COMPARISON_RANK_BY_CODE[self._code] >= _COMPARISON_RANK_BY_CODE[other._code]
+
     def __lt__(self, other):
         '''
             Check if A < B by comparing their face_value.
         '''
-        return not self >= other
-    
+        return _COMPARISON_RANK_BY_CODE[self._code] < _COMPARISON_RANK_BY_CODE[other._code]
+
     def __le__(self, other):
-        return self < other or self.has_same_face_value(other)
-    
+        return _COMPARISON_RANK_BY_CODE[self._code] <= _COMPARISON_RANK_BY_CODE[other._code]
+
+    def rank_key(self) -> int:
+        '''
+            Return the sort key of the card: comparison rank first, ties broken by suit.
+            Distinct cards have distinct keys, so the key orders cards totally.
+        '''
+        return _RANK_KEY_BY_CODE[self._code]
+
     def __str__(self):
         return f"Card object with face_value={self._face_value}, suit={self._suit}"
-        
+
+    def __reduce__(self):
+        if self._interned:
+            return (Card.from_code, (self._code,))
+        return (Card, (self._face_value, self._suit))
+
     def set_face_value(self, face_value: str) -> bool:
-        if face_value not in Card._VALID_FACE_VALUES:
+        if face_value not in _FACE_VALUE_TO_RANK:
             raise ValueError(f'Invalid face_value input. Valid face_values are {Card._VALID_FACE_VALUES}.')
         self._face_value = face_value
         return True
-        
+
     def set_suit(self, suit: str) -> bool:
-        if suit not in Card._VALID_SUITS:
+        if suit not in _SUIT_TO_IDX:
             raise ValueError(f'Invalid suit input. Valid suits are {Card._VALID_SUITS}.')
-        self._suit = suit   
+        self._suit = suit
         return True
-        
+
     def get_face_value(self) -> str:
-        return self._face_value
-    
+        return _FACE_VALUES[self._code >> 2]
+
     def get_suit(self) -> str:
-        return self._suit
-    
+        return _SUITS[self._code & 3]
+
+    def get_code(self) -> int:
+        '''
+            Return the integer code rank * 4 + suit_idx of the card.
+        '''
+        return self._code
+
     def is_face(self) -> bool:
         '''
-            Check if the face_value is 'J','K','Q'. 
+            Check if the face_value is 'J','K','Q'.
             Return True if so, False otherwise.
         '''
-        return self._face_value.isalpha() and self._face_value != 'A'
-    
+        return _IS_FACE[self._code >> 2]
+
     def is_ace(self) -> bool:
-        return self._face_value == 'A'
-    
+        return _IS_ACE[self._code >> 2]
+
     def score(self) -> int:
         '''
             Return the numeric value of the card.
@@ -83,14 +148,40 @@ class Card:
             J,K,Q: 10.
             A: -1.
         '''
-        if self._face_value.isnumeric():
-            return int(self._face_value)
-        elif self.is_face():
-            return 10
-        else:
-            return -1
-
-    
-    
-    
-    
\ No newline at end of file
+        return _SCORES[self._code >> 2]
+
+
+def _make_canonical_card(code: int) -> Card:
+    card = Card(_FACE_VALUES[code >> 2], _SUITS[code & 3])
+    card._interned = True
+    return card
+
+# The 52 shared immutable Card objects, indexed by code. Deck reuses them instead of constructing new cards.
+CANONICAL_CARDS = tuple(_make_canonical_card(code) for code in range(52))
+
+
+def rank_key(card: Card) -> int:
+    '''
+        Sort key for sorted(cards, key=rank_key) and (rank_key(card), ...) entries of heapq.
+        Cards are ordered by face_value as in the comparisons (A lowest, K highest), ties broken by suit.
+    '''
+    return _RANK_KEY_BY_CODE[card._code]
+
+
+def sort_cards(cards: list[Card], reverse: bool = False) -> list[Card]:
+    '''
+        Return a new list of the cards sorted by rank_key.
+    '''
+    return sorted(cards, key=rank_key, reverse=reverse)
+
+
+def compare_cards(cards: list[Card], other_cards: list[Card]) -> list[int]:
+    '''
+        Compare the face_values of two equally long lists of cards pairwise.
+        Return a list with 1 where the card is greater, -1 where it is smaller and 0 where the face_values are equal.
+    '''
+    if len(cards) != len(other_cards):
+        raise ValueError('Input lists of cards must have the same length.')
+    ranks = _COMPARISON_RANK_BY_CODE
+    return [(ranks[card._code] > ranks[other._code]) - (ranks[card._code] < ranks[other._code])
+            for card, other in zip(cards, other_cards)]
@@ -0,0 +1,174 @@
+from src.card import Card
+from src.deck import Deck
+from src.shoe import Shoe
+from src.policy import Policy, BasicStrategyPolicy, _UPCARD_VALUES
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.player import Player
+
+_NUM_RANKS = 13
+_CARDS_PER_DECK = 52
+
+
+class CountingSystem:
+    def __init__(self, name: str, weights: tuple[int, ...]):
+        '''
+            name: name of the system, e.g. 'Hi-Lo'.
+            weights: count added for each card leaving the deck, 13 weights indexed by rank ('2', ..., '10', 'J', 'Q', 'K', 'A').
+            A system whose weights do not sum to 0 over a deck is unbalanced, and its running count starts at
+            -(imbalance of a deck) * (num_decks - 1), e.g. 4 - 4 * num_decks for KO.
+        '''
+        if len(weights) != _NUM_RANKS:
+            raise ValueError(f'weights must have {_NUM_RANKS} entries, one per rank.')
+        self._name = name
+        self._weights = tuple(weights)
+        # Indexed by card code, i.e. rank * 4 + suit_idx.
+        self._weights_by_code = tuple(weight for weight in self._weights for suit_idx in range(4))
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, CountingSystem) and self._name == other._name and self._weights == other._weights
+
+    def __str__(self) -> str:
+        return f'CountingSystem {self._name} with weights {self._weights}'
+
+    def get_name(self) -> str:
+        return self._name
+
+    def get_weights(self) -> tuple[int, ...]:
+        return self._weights
+
+    def is_balanced(self) -> bool:
+        return sum(self._weights) == 0
+
+    def get_initial_running_count(self, num_decks: int) -> int:
+        return -sum(self._weights) * 4 * (num_decks - 1)
+
+
+HI_LO = CountingSystem('Hi-Lo', (1, 1, 1, 1, 1, 0, 0, 0, -1, -1, -1, -1, -1))
+KO = CountingSystem('KO', (1, 1, 1, 1, 1, 1, 0, 0, -1, -1, -1, -1, -1))
+OMEGA_II = CountingSystem('Omega II', (1, 1, 2, 2, 2, 1, 0, -1, -2, -2, -2, -2, 0))
+
+
+class CardCounter:
+    def __init__(self, deck: Deck | Shoe, system: CountingSystem = HI_LO):
+        '''
+            Running count of the cards issued from deck since it was last shuffled, with the weights of system.
+            The counter reads the cards the deck has issued since the previous query, so Deck.issue_card and
+            Shoe.issue_card pay nothing for it and a query costs one addition per card dealt in between,
+            e.g. one per decision when read by a policy in Game.run_player_turn.
+            The count starts again whenever the issued cards are put back, i.e. the deck is fully shuffled or its cards
+            are replaced, e.g. when Game reshuffles a Shoe at the cut card. A lazy shuffle of a Deck keeps the count.
+        '''
+        if not isinstance(system, CountingSystem):
+            raise TypeError('system must be a CountingSystem')
+        self._deck = deck
+        self._system = system
+        self._weights_by_code = system._weights_by_code
+        self._is_shoe = isinstance(deck, Shoe)
+        self._num_shuffles = deck._num_shuffles
+        self._idx = self._get_idx_of_last_shuffle()
+        self._idx_of_last_shuffle = self._idx
+        self._running_count = self._get_initial_running_count()
+
+    def __str__(self) -> str:
+        return (f'CardCounter {self._system._name} with running count: {self.get_running_count()}, '
+                f'true count: {self.get_true_count():.2f}')
+
+    def _get_initial_running_count(self) -> int:
+        return self._system.get_initial_running_count(round(len(self._deck._cards) / _CARDS_PER_DECK))
+
+    def _get_idx_of_last_shuffle(self) -> int:
+        '''
+            A Shoe deals from its first card after every shuffle. A Deck keeps its cursor when fully shuffled.
+        '''
+        if self._is_shoe:
+            return 0
+        return min(self._deck._idx_of_last_shuffle, self._deck._idx_of_next_card_to_issue)
+
+    def _sync(self):
+        '''
+            Add the weights of the cards issued since the previous query. Start again from the first card dealt after
+            the last shuffle if the deck was shuffled since, or from the first card if its cursor moved back before it.
+        '''
+        deck = self._deck
+        idx = deck._idx_of_next_card_to_issue
+        if deck._num_shuffles != self._num_shuffles or idx < self._idx:
+            self._num_shuffles = deck._num_shuffles
+            self._idx = self._get_idx_of_last_shuffle()
+            self._idx_of_last_shuffle = self._idx
+            self._running_count = self._get_initial_running_count()
+        if idx == self._idx:
+            return
+        weights_by_code = self._weights_by_code
+        if self._is_shoe:
+            self._running_count += sum(map(weights_by_code.__getitem__, deck._cards[self._idx:idx]))
+        else:
+            self._running_count += sum(weights_by_code[card._code] for card in deck._cards[self._idx:idx])
+        self._idx = idx
+
+    def get_system(self) -> CountingSystem:
+        return self._system
+
+    def get_num_cards_seen(self) -> int:
+        '''
+            Return the number of cards counted since the last shuffle.
+        '''
+        self._sync()
+        return self._idx - self._idx_of_last_shuffle
+
+    def get_running_count(self) -> int:
+        self._sync()
+        return self._running_count
+
+    def get_true_count(self) -> float:
+        '''
+            Return the running count per deck remaining, 0.0 once no cards remain.
+        '''
+        self._sync()
+        num_remaining_cards = len(self._deck._cards) - self._idx
+        if num_remaining_cards == 0:
+            return 0.0
+        return self._running_count * _CARDS_PER_DECK / num_remaining_cards
+
+
+# Hit or stand plays of the Illustrious 18 for Hi-Lo: (hard score, upcard value 2-10 or 11 for an Ace) mapped to the
+# true count at or above which to stand.
+HI_LO_STAND_INDICES = {
+    (16, 10): 0,
+    (15, 10): 4,
+    (16, 9): 5,
+    (13, 2): -1,
+    (13, 3): -2,
+    (12, 2): 3,
+    (12, 3): 2,
+    (12, 4): 0,
+    (12, 5): -2,
+    (12, 6): -1,
+}
+
+
+class CountIndexPolicy(Policy):
+    def __init__(self, counter: CardCounter, base_policy: Policy = None, stand_indices: dict = HI_LO_STAND_INDICES):
+        '''
+            Deviate from base_policy by the true count of counter: for the hard scores and upcards of stand_indices,
+            stand if the true count is at least the index and draw otherwise. base_policy decides everything else.
+            counter: counter of the deck the game deals from.
+            base_policy: BasicStrategyPolicy if not given.
+            stand_indices: the defaults are for Hi-Lo, see HI_LO_STAND_INDICES.
+        '''
+        if not isinstance(counter, CardCounter):
+            raise TypeError('counter must be a CardCounter')
+        self._counter = counter
+        self._base_policy = base_policy if base_policy is not None else BasicStrategyPolicy()
+        self._stand_indices = dict(stand_indices)
+
+    def get_counter(self) -> CardCounter:
+        return self._counter
+
+    def should_draw(self, player: 'Player', dealer_upcard: Card = None) -> bool:
+        if dealer_upcard is not None and not player.is_soft():
+            index = self._stand_indices.get((player.calculate_score(), _UPCARD_VALUES[dealer_upcard._code >> 2]))
+            if index is not None:
+                return self._counter.get_true_count() < index
+        return self._base_policy.should_draw(player, dealer_upcard)
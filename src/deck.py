@@ -1,18 +1,81 @@
-from src.card import Card
+from src.card import Card, CANONICAL_CARDS, _FACE_VALUE_TO_RANK
 from src.player import Player
+from src.bulk_random import shuffle, draw_offsets
 import random
 
+_NUM_RANKS = 13
+# Ranks of the cards of each hard value 1 (Ace) - 10, i.e. the values of probability.composition_of.
+_RANKS_BY_HARD_VALUE = ((12,), (0,), (1,), (2,), (3,), (4,), (5,), (6,), (7,), (8, 9, 10, 11))
+
+
+def mask_of(cards: list[Card]) -> int:
+    '''
+        Return the set of cards as a 52-bit mask, bit i set if a card with code i is in cards.
+    '''
+    mask = 0
+    for card in cards:
+        mask |= 1 << card._code
+    return mask
+
+
+def cards_of_mask(mask: int) -> list[Card]:
+    '''
+        Return the canonical cards of a mask in code order.
+    '''
+    return [card for card in CANONICAL_CARDS if mask >> card._code & 1]
+
+
+def rank_counts_of_mask(mask: int) -> list[int]:
+    '''
+        Return the number of cards of each rank in a mask, 13 counts indexed by rank. The 4 bits of a rank are
+        consecutive, so each count is the popcount of one nibble.
+    '''
+    return [(mask >> (rank * 4) & 0xF).bit_count() for rank in range(_NUM_RANKS)]
+
+
 class Deck:
-    def __init__(self):
-        self._cards = []
-        for face_value in range(2, 11):
-            for suit in ['club','diamond','heart','spade']:
-                self._cards.append(Card(str(face_value), suit))
-        for face_value in ['J','Q','K','A']:
-            for suit in ['club','diamond','heart','spade']:
-                self._cards.append(Card(face_value, suit))
-        self._idx_of_next_card_to_issue = 0
+    def __init__(self, rng: random.Random = None):
+        '''
+            rng: random number generator used for shuffling, e.g. a seeded random.Random.
+            The global random module is used if not given.
+        '''
+        # Cards 2-10, J, Q, K, A with suits club, diamond, heart, spade, i.e. the canonical cards in code order.
+        self._init_fields(rng, list(CANONICAL_CARDS), 0, False)
+
+    def _init_fields(self, rng: random.Random, cards: list[Card], idx_of_next_card_to_issue: int, lazy_shuffle: bool):
+        '''
+            Set every field of the deck, for both __init__ and _restore, so the two can not drift apart.
+        '''
+        self._rng = rng if rng is not None else random
+        self._cards = cards
+        self._idx_of_next_card_to_issue = idx_of_next_card_to_issue
+        self._lazy_shuffle = lazy_shuffle
+        # Swap offsets drawn in bulk for the lazy shuffle, in reverse, the last one for position _lazy_offsets_idx.
+        self._lazy_offsets = []
+        self._lazy_offsets_idx = 0
+        # Composition of the cards not yet issued: the set of their codes as a 52-bit mask and the number of cards of
+        # each rank. It is computed on the first query, then updated as cards are issued, returned, swapped across the
+        # cursor or shuffled, so decks that are never queried do not pay for it.
+        # _composition_cards and _composition_idx are the list and cursor it is up to date for, see _sync_composition.
+        self._remaining_mask = 0
+        self._rank_counts = None
+        self._composition_cards = None
+        self._composition_idx = 0
+        # Incremented whenever the issued cards are put back, by a full shuffle or new cards, so trackers like
+        # counting.CardCounter start again from _idx_of_last_shuffle. A lazy shuffle only reorders unissued cards.
+        self._num_shuffles = 0
+        self._idx_of_last_shuffle = 0
                 
+    @classmethod
+    def _restore(cls, rng: random.Random, cards: list[Card], idx_of_next_card_to_issue: int, lazy_shuffle: bool) -> 'Deck':
+        '''
+            Construct a deck from already validated fields, e.g. a Game snapshot, without the checks of __init__.
+            cards: canonical Card objects.
+        '''
+        deck = cls.__new__(cls)
+        deck._init_fields(rng, cards, idx_of_next_card_to_issue, lazy_shuffle)
+        return deck
+
     def __str__(self) -> str:
         return f'Deck with cards: {[str(card) for card in self._cards]}'
     
@@ -22,29 +85,98 @@ class Deck:
     def set_cards(self, cards: list[Card]) -> bool:
         if not all(isinstance(card, Card) for card in cards):
             raise TypeError('Input cards must be a list of Card objects')
-        self._cards = cards
+        # Only immutable canonical cards are dealt, so a card at hand can not change afterwards.
+        self._cards = [CANONICAL_CARDS[card._code] for card in cards]
+        self._lazy_shuffle = False
+        self._num_shuffles += 1
+        self._idx_of_last_shuffle = self._idx_of_next_card_to_issue
             
     def get_cards(self) -> list[Card]:
+        '''
+            Getter for self._cards. It never moves cards or draws random numbers, so it can be called at any time,
+            e.g. to print a game mid-round, without changing the cards dealt next.
+            While a lazy shuffle is pending, the cards not yet issued are unordered: their order is not the order they
+            will be dealt in. Call complete_shuffle() first to fix the dealing order.
+        '''
         return self._cards
     
+    def set_rng(self, rng: random.Random) -> bool:
+        self._rng = rng
+        return True
+    
     def _swap_card(self,i: int, j: int):
         '''
             Swap cards on idx i and index j.
         '''
         if i == j:
             return 
+        idx = self._idx_of_next_card_to_issue
+        if (i < idx) != (j < idx) and self._is_composition_synced():
+            # One of the cards is issued and the other is not: they trade places in the composition.
+            issued, unissued = (self._cards[i], self._cards[j]) if i < idx else (self._cards[j], self._cards[i])
+            self._remaining_mask = self._remaining_mask & ~(1 << unissued._code) | 1 << issued._code
+            self._rank_counts[unissued._code >> 2] -= 1
+            self._rank_counts[issued._code >> 2] += 1
         temp = self._cards[i]
         self._cards[i] = self._cards[j]
         self._cards[j] = temp
     
-    def shuffle_cards(self) -> bool:
+    def shuffle_cards(self, lazy: bool = False) -> bool:
+        '''
+            lazy: if True, no card is moved now. Instead issue_card picks each card uniformly from the cards not
+            yet issued at the moment it is dealt (Fisher-Yates one step at a time), so the cost is proportional to
+            the number of cards dealt. The sequence of issued cards has the same distribution as after a full shuffle.
+            Return True if successful.
+        '''
         if not self._cards:
             raise Exception('Can not shuffle empty deck of cards.')
-        for i in range(len(self._cards)):
-            idx = random.randint(i, len(self._cards)-1)
-            self._swap_card(i, idx)
+        if lazy:
+            self._lazy_shuffle = True
+            self._lazy_offsets = []
+            return True
+        self._lazy_shuffle = False
+        self._num_shuffles += 1
+        self._idx_of_last_shuffle = self._idx_of_next_card_to_issue
+        shuffle(self._cards, self._rng)
+        if self._composition_cards is not None:
+            # Issued cards may be moved back among the unissued ones.
+            self._index_composition()
+        return True
+
+    def return_issued_cards(self) -> bool:
+        '''
+            Put every issued card back into the deck in place, without moving any card.
+            Shuffle the deck before dealing from it again.
+            Return True if successful.
+        '''
+        if self._is_composition_synced():
+            for card in self._cards[:self._idx_of_next_card_to_issue]:
+                self._remaining_mask |= 1 << card._code
+                self._rank_counts[card._code >> 2] += 1
+            self._composition_idx = 0
+        self._idx_of_next_card_to_issue = 0
+        self._num_shuffles += 1
+        self._idx_of_last_shuffle = 0
+        return True
+
+    def complete_shuffle(self) -> bool:
+        '''
+            End a pending lazy shuffle by shuffling the cards that have not been issued yet, so the order of
+            get_cards() is the dealing order. This draws random numbers. Does nothing if no lazy shuffle is pending.
+            Return True if successful.
+        '''
+        if self._lazy_shuffle:
+            shuffle(self._cards, self._rng, self._idx_of_next_card_to_issue)
+            self._lazy_shuffle = False
         return True
     
+    def reshuffle_if_needed(self, num_cards_needed: int = 0) -> bool:
+        '''
+            A single deck has no cut card and is never reshuffled automatically. Kept for the same contract as Shoe.
+            Return False.
+        '''
+        return False
+    
     def issue_card(self, player: Player, num_cards_to_issue: int = 1) -> bool:
         '''
             player: player or dealer.
@@ -54,18 +186,123 @@ class Deck:
             Return True if sucessful.
             Raise Exception if no more cards available in the card pool.
         '''
+        idx = self._idx_of_next_card_to_issue
+        synced = self._composition_cards is self._cards and self._composition_idx == idx
         for i in range(num_cards_to_issue):
             if self.get_num_remaining_cards() == 0:
                 raise Exception('Deck is already empty.')
-            player._cards.append(self._cards[self._idx_of_next_card_to_issue]) # use player._cards to directly access field. No need to use getter/setter inside.
+            if self._lazy_shuffle:
+                self._swap_card(self._idx_of_next_card_to_issue, self._idx_of_next_card_to_issue + self._next_lazy_offset())
+            player._receive_card(self._cards[self._idx_of_next_card_to_issue]) # keeps the player's running hand state up to date.
             self._idx_of_next_card_to_issue += 1
+        if synced:
+            # Keep the composition index up to date, see _sync_composition.
+            rank_counts = self._rank_counts
+            for card in self._cards[idx:self._idx_of_next_card_to_issue]:
+                self._remaining_mask &= ~(1 << card._code)
+                rank_counts[card._code >> 2] -= 1
+            self._composition_idx = self._idx_of_next_card_to_issue
         return True
        
+    def _next_lazy_offset(self) -> int:
+        '''
+            Offset of the card to swap into the next position to issue, uniform over the cards not yet issued.
+            Offsets are drawn a dozen positions at a time. They are drawn again if the cursor has moved since.
+        '''
+        idx = self._idx_of_next_card_to_issue
+        if not self._lazy_offsets or self._lazy_offsets_idx != idx:
+            self._lazy_offsets = draw_offsets(self._rng, len(self._cards), idx)
+            if not self._lazy_offsets:
+                return 0
+        self._lazy_offsets_idx = idx + 1
+        return self._lazy_offsets.pop()
+
     def get_num_remaining_cards(self) -> int:
         '''
             Return the number of remaining available cards that have not been issued.
         '''
         return len(self._cards) - self._idx_of_next_card_to_issue
+
+    def get_unissued_cards(self) -> list[Card]:
+        '''
+            Return a new list of the cards that have not been issued yet.
+            The order is the dealing order unless a lazy shuffle is pending, in which case it is not meaningful.
+        '''
+        return self._cards[self._idx_of_next_card_to_issue:]
+
+    def _index_composition(self):
+        '''
+            Compute the composition index from the unissued cards.
+        '''
+        self._remaining_mask = 0
+        self._rank_counts = [0] * _NUM_RANKS
+        for card in self._cards[self._idx_of_next_card_to_issue:]:
+            self._remaining_mask |= 1 << card._code
+            self._rank_counts[card._code >> 2] += 1
+        self._composition_cards = self._cards
+        self._composition_idx = self._idx_of_next_card_to_issue
+
+    def _is_composition_synced(self) -> bool:
+        return self._composition_cards is self._cards and self._composition_idx == self._idx_of_next_card_to_issue
+
+    def _sync_composition(self):
+        '''
+            The deck keeps the composition index up to date itself once computed, so this is O(1). It is only computed
+            on the first query, after set_cards, or if the list of cards or the cursor was set directly, e.g. by a test.
+            A lazy shuffle only reorders unissued cards, so it never changes the index.
+        '''
+        if not self._is_composition_synced():
+            self._index_composition()
+
+    def get_remaining_mask(self) -> int:
+        '''
+            Return the cards not yet issued as a 52-bit mask, bit i set if a card with code i remains (see mask_of).
+            The mask is a cheap hashable key of the exact remaining cards of a deck without duplicates.
+        '''
+        self._sync_composition()
+        return self._remaining_mask
+
+    def get_remaining_mask_without(self, known_cards: list[Card]) -> int:
+        '''
+            Return the mask of the cards not yet issued minus known_cards, e.g. cards seen in other hands.
+        '''
+        self._sync_composition()
+        return self._remaining_mask & ~mask_of(known_cards)
+
+    def get_rank_counts(self) -> list[int]:
+        '''
+            Return a new list of the number of cards not yet issued of each rank, 13 counts indexed by rank
+            ('2', ..., '10', 'J', 'Q', 'K', 'A').
+        '''
+        self._sync_composition()
+        return list(self._rank_counts)
+
+    def count_remaining(self, face_value: str) -> int:
+        '''
+            Return the number of cards with face_value that have not been issued.
+        '''
+        if face_value not in _FACE_VALUE_TO_RANK:
+            raise ValueError(f'Invalid face_value input. Valid face_values are {Card._VALID_FACE_VALUES}.')
+        self._sync_composition()
+        return self._rank_counts[_FACE_VALUE_TO_RANK[face_value]]
+
+    def count_remaining_value(self, hard_value: int) -> int:
+        '''
+            Return the number of cards not yet issued with hard value 1 (Ace) - 10, e.g. 10 counts 10, J, Q and K.
+        '''
+        if not 1 <= hard_value <= 10:
+            raise ValueError('hard_value must be between 1 and 10.')
+        self._sync_composition()
+        return sum(self._rank_counts[rank] for rank in _RANKS_BY_HARD_VALUE[hard_value - 1])
+
+    def get_value_counts(self) -> list[int]:
+        '''
+            Return the number of cards not yet issued of each hard value 1 (Ace) - 10 as a list of 10 counts,
+            the same as probability.composition_of(self.get_unissued_cards()).
+        '''
+        self._sync_composition()
+        counts = self._rank_counts
+        return [counts[12]] + counts[:8] + [counts[8] + counts[9] + counts[10] + counts[11]]
    
   # def add_card(self, card_to_add: Card) -> bool:
     #     '''
@@ -0,0 +1,122 @@
+from src.player import Player
+from src.deck import Deck
+from src.game import Game
+from typing import Iterator, NamedTuple
+import random
+
+# Participants are identified by their seat: 0 is the dealer, 1, 2, ... are the players in turn order.
+# Cards are identified by their code, see Card.get_code.
+
+
+class InitialHand(NamedTuple):
+    seat: int
+    cards: tuple[int, ...]
+
+
+class DrawDecision(NamedTuple):
+    '''
+        A decision taken during a turn. card is the code of the card drawn, -1 if the participant stood.
+    '''
+    seat: int
+    draws: bool
+    card: int
+
+
+class FinalScore(NamedTuple):
+    '''
+        score: same as Player.calculate_score(), -1 if busted.
+    '''
+    seat: int
+    score: int
+
+
+class RoundEnd(NamedTuple):
+    '''
+        winner_seats is empty if the round ended with blackjacks.
+    '''
+    blackjack_seats: tuple[int, ...]
+    winner_seats: tuple[int, ...]
+
+
+class RoundRecord(NamedTuple):
+    '''
+        All events of one round, in seat order.
+    '''
+    round_number: int
+    initial_hands: tuple[tuple[int, ...], ...]
+    draws: tuple[DrawDecision, ...]
+    final_scores: tuple[int, ...]
+    blackjack_seats: tuple[int, ...]
+    winner_seats: tuple[int, ...]
+
+
+def _seats_of(participants: list[Player], selected: list[Player]) -> tuple[int, ...]:
+    return tuple(seat for seat, participant in enumerate(participants) if any(participant is other for other in selected))
+
+
+def _iter_turn(game: Game, seat: int, participant: Player) -> Iterator[DrawDecision]:
+    '''
+        Same loop as Game.run_dealer_turn and Game.run_player_turn, yielding every decision taken.
+    '''
+    deck = game._deck
+    dealer_upcard = game._dealer._hand[0] if seat > 0 and game._dealer._hand else None
+    while participant.is_alive() and deck.get_num_remaining_cards() > 0:
+        if not participant.draw(dealer_upcard):
+            yield DrawDecision(seat, False, -1)
+            return
+        deck.issue_card(participant)
+        yield DrawDecision(seat, True, participant._cards[-1].get_code())
+
+
+def iter_round_events(game: Game) -> Iterator[InitialHand | DrawDecision | FinalScore | RoundEnd]:
+    '''
+        Play one round from the initial deal the same way Game.play_round does, yielding its events as they happen:
+        an InitialHand per seat, the DrawDecisions of every turn, a FinalScore per seat and a RoundEnd.
+        The round is played lazily, so a consumer that stops early leaves the rest of the round unplayed.
+    '''
+    participants = [game._dealer] + game._players
+    game.assign_initial_two_cards()
+    for seat, participant in enumerate(participants):
+        yield InitialHand(seat, tuple(card.get_code() for card in participant.get_cards()))
+    blackjack_players = game.get_blackjacks()
+    if not blackjack_players:
+        yield from _iter_turn(game, 0, game._dealer)
+        while not game.is_game_end():
+            seat = game._turn_number + 1
+            yield from _iter_turn(game, seat, participants[seat])
+            game._turn_number += 1
+    for seat, participant in enumerate(participants):
+        yield FinalScore(seat, participant.calculate_score())
+    winners = [] if blackjack_players else game.get_winners()
+    yield RoundEnd(_seats_of(participants, blackjack_players), _seats_of(participants, winners))
+
+
+def iter_rounds(dealer_info: tuple[str, float], players_info: list[tuple[str, float]], num_rounds: int = None,
+                rng: random.Random = None) -> Iterator[RoundRecord]:
+    '''
+        Play rounds one at a time, each on a new lazily shuffled Deck, and yield a RoundRecord per round.
+        num_rounds: number of rounds to play. Rounds are played until the consumer stops if not given.
+        rng: random number generator for the shuffles and drawing decisions. The global random module is used if not given.
+        Only the current round is kept in memory.
+    '''
+    if num_rounds is not None and num_rounds < 0:
+        raise ValueError('num_rounds can not be negative.')
+    round_number = 0
+    while num_rounds is None or round_number < num_rounds:
+        deck = Deck(rng)
+        deck.shuffle_cards(lazy = True)
+        game = Game(dealer_info, players_info, deck = deck, rng = rng)
+        initial_hands = []
+        draws = []
+        final_scores = []
+        for event in iter_round_events(game):
+            if type(event) is DrawDecision:
+                draws.append(event)
+            elif type(event) is InitialHand:
+                initial_hands.append(event.cards)
+            elif type(event) is FinalScore:
+                final_scores.append(event.score)
+            else:
+                yield RoundRecord(round_number, tuple(initial_hands), tuple(draws), tuple(final_scores),
+                                  event.blackjack_seats, event.winner_seats)
+        round_number += 1
@@ -1,48 +1,168 @@
 from src.player import Player, Dealer
-from src.card import Card
+from src.card import CANONICAL_CARDS
 from src.deck import Deck
+from src.shoe import Shoe
+from src.infinite_deck import InfiniteDeck
+from src.instrumentation import GameStats, instrument_player, uninstrument_player
+from src.policy import (ProbabilisticPolicy, DealerPolicy, LookupTablePolicy, BasicStrategyPolicy, PROBABILISTIC_POLICY,
+                        DEALER_POLICY, _TABLE_SIZE)
+from typing import Iterator
 import random
+import struct
+import time
+
+# Cards a Shoe keeps in reserve for every hand of a round: the initial two cards and two draws. A hand takes
+# fewer than three cards on average, so a table this size does not run the shoe dry in the middle of a turn.
+_NUM_CARDS_PER_HAND = 4
+
+# Binary snapshot format of Game.to_bytes, little-endian:
+#   header: magic b'BJ', version, deck kind (0 Deck, 1 Shoe), lazy shuffle flag, turn number, number of players.
+#   Deck: number of cards, index of the next card to issue.
+#   Shoe: number of decks, penetration, number of cards, index of the next card to issue, index of the cut card.
+#   dealer, then every player: id length, number of cards at hand, prob_to_draw, policy tag (see _POLICY_TAGS).
+#   UTF-8 ids of the dealer and players, back to back.
+#   for every participant with a LookupTablePolicy tag: its table and its default, one byte each.
+#   card codes at hand of the dealer and players, back to back.
+#   card codes of the deck or shoe.
+# Version 1 snapshots have no policy tags and no tables, and restore every seat with its default policy.
+_SNAPSHOT_MAGIC = b'BJ'
+_SNAPSHOT_VERSION = 2
+_HEADER = struct.Struct('<2sBBBHH')
+_DECK_HEADER = struct.Struct('<HH')
+_SHOE_HEADER = struct.Struct('<HdIII')
+_PARTICIPANTS = {1: struct.Struct('<BBd'), 2: struct.Struct('<BBdB')}
+# Policy tags: the default policy of the seat, or one of the policies that can be encoded, by exact type.
+_DEFAULT_POLICY_TAG = 0
+_LOOKUP_TABLE_POLICY_TAG = 4
+_POLICY_TAGS = {ProbabilisticPolicy: 1, DealerPolicy: 2, BasicStrategyPolicy: 3, LookupTablePolicy: _LOOKUP_TABLE_POLICY_TAG}
+_TAGGED_POLICIES = {1: PROBABILISTIC_POLICY, 2: DEALER_POLICY, 3: BasicStrategyPolicy()}
+_LOOKUP_TABLE_POLICY_SIZE = _TABLE_SIZE + 1
+
+
+def _policy_tag(participant: Player) -> int:
+    '''
+        Raise TypeError if the policy of the participant can not be encoded in a snapshot.
+    '''
+    policy = participant._policy
+    if policy is type(participant)._policy:
+        return _DEFAULT_POLICY_TAG
+    tag = _POLICY_TAGS.get(type(policy))
+    if tag is None:
+        raise TypeError(f'The {type(policy).__name__} of {participant._player_id} can not be encoded in a snapshot.')
+    return tag
+
+
+def _max_num_players(deck: Deck | Shoe | InfiniteDeck) -> int:
+    '''
+        See Game.get_max_num_players.
+    '''
+    if isinstance(deck, InfiniteDeck):
+        return len(CANONICAL_CARDS) // 2 - 1
+    if isinstance(deck, Shoe):
+        return len(deck._cards) // _NUM_CARDS_PER_HAND - 1
+    return len(deck._cards) // 2 - 1
+
 
 class Game:
-    def __init__(self, dealer_info: tuple[str, float] = None, players_info: list[tuple[str, float]] = None):
+    def __init__(self, dealer_info: tuple[str, float] = None, players_info: list[tuple[str, float]] = None, deck: Deck | Shoe | InfiniteDeck = None,
+                 rng: random.Random = None, stats: GameStats = None):
         '''
-            players: a list of players for the game.
+            players_info: (player_id, prob_to_draw) of every player, optionally followed by a Policy, see src/policy.py.
             Constructing a card pool which is a list of Card objects with 1-9, J,Q,K,A. Each 4 cards. No jokers.
+            deck: optional card pool to use instead, e.g. a multi-deck Shoe, or an InfiniteDeck dealing with replacement.
+            A new Deck is used if not given.
+            rng: optional random number generator, e.g. a seeded random.Random, for shuffling the new Deck and for
+            the drawing decisions of the dealer and players. The global random module is used if not given.
             Construct a field for turning number which indicates the current turn number of the game.
             Construct a field for the list of players in the game.
+            The max number of players is the number of cards in the card pool // 2 - 1, i.e. 25 for a single deck.
+            stats: optional GameStats to instrument the game with, see enable_instrumentation.
         '''
-        self._turn_number = 0
-        self._deck = Deck()
+        deck = deck if deck is not None else Deck(rng)
         if not dealer_info:
-            self._dealer = None
+            dealer = None
         else:
-            self._dealer = Dealer(dealer_info[0], dealer_info[1]) 
+            dealer = Dealer(dealer_info[0], dealer_info[1], rng) 
         if not players_info:
-            self._players = None
-        elif (len(players_info) > 25):
-            raise ValueError('Max number of players is 25.')
+            players = None
+        elif (len(players_info) > _max_num_players(deck)):
+            raise ValueError(f'Max number of players is {_max_num_players(deck)}.')
         else:
-            self._players = [Player(player_id, prob_to_draw) for player_id, prob_to_draw in players_info]
+            players = [Player(player_info[0], player_info[1], rng, *player_info[2:]) for player_info in players_info]
+        self._init_fields(0, rng, deck, dealer, players)
+        if stats is not None:
+            self.enable_instrumentation(stats)
                 
+    def _init_fields(self, turn_number: int, rng: random.Random, deck: Deck | Shoe | InfiniteDeck, dealer: Dealer,
+                     players: list[Player]):
+        '''
+            Set every field of the game. __init__ builds the deck and participants first, from_bytes decodes them.
+        '''
+        self._turn_number = turn_number
+        # Kept for the dealer and players that reset_game constructs.
+        self._rng = rng
+        self._deck = deck
+        self._dealer = dealer
+        self._players = players
+        self._stats = None
+
     def __str__(self) -> str:
         '''
             toString method.
         '''
         return (f"Game object with number of players: {self.get_num_players()}, "
                 f"current turn number: {self._turn_number}, "
-                f"available card pool: {[ str(card) for card in self._deck._cards]}, "
+                f"available card pool: {[ str(card) for card in self._deck.get_cards()]}, "
                 f"dealer: {str(self._dealer)}"
                 f"players: {[str(player) for player in self._players]}")
     
     def print_essential_info(self) -> str:
         return (f'Game with {self.get_num_players()} players, current turn number is {self._turn_number}')
         
+    def enable_instrumentation(self, stats: GameStats = None) -> GameStats:
+        '''
+            Start counting cards issued, calculate_score calls and draw decisions, and timing the phases of a round.
+            Cards issued and draw decisions are derived from the number of remaining cards around each phase,
+            so Deck and Player are not slowed down. A game without instrumentation only pays one check per phase.
+            stats: GameStats to collect into. A new one is used if not given.
+            Return the GameStats.
+        '''
+        self._stats = stats if stats is not None else GameStats()
+        for participant in self._get_participants():
+            instrument_player(participant, self._stats)
+        return self._stats
+
+    def disable_instrumentation(self) -> bool:
+        self._stats = None
+        for participant in self._get_participants():
+            uninstrument_player(participant)
+        return True
+
+    def get_stats(self) -> GameStats:
+        '''
+            Return the GameStats of the game, None if instrumentation is disabled.
+        '''
+        return self._stats
+
+    def _get_participants(self) -> list[Player]:
+        participants = [self._dealer] if self._dealer is not None else []
+        return participants + (self._players or [])
+
     def get_turn_number(self):
         return self._turn_number
         
     def get_players(self) -> list[Player]:
         return self._players
     
+    def get_max_num_players(self) -> int:
+        '''
+            Return the max number of players, so that everyone including the dealer can get the initial two cards.
+            An InfiniteDeck seats as many players as a single deck.
+            A Shoe, which is reshuffled rather than put back between rounds, seats as many as a full shoe can play
+            a round for at _NUM_CARDS_PER_HAND cards per hand.
+        '''
+        return _max_num_players(self._deck)
+    
     def get_num_players(self) -> int:
         '''
             Return number of players in the game.
@@ -54,9 +174,11 @@ class Game:
             Add a player to the end of player list.
             Return True if successful.
         '''
-        if len(self._players) == 25:
-            raise Exception('Max number of players is 25.')
+        if len(self._players) >= self.get_max_num_players():
+            raise Exception(f'Max number of players is {self.get_max_num_players()}.')
         self._players.append(player)
+        if self._stats is not None:
+            instrument_player(player, self._stats)
         return True
     
     def remove_player(self, player_id: str) -> bool:
@@ -84,13 +206,22 @@ class Game:
     def assign_initial_two_cards(self) -> bool:
         '''
             Assign initial two cards to dealer and each player.
+            A Shoe whose cut card has been reached, or with fewer than _NUM_CARDS_PER_HAND cards left for every hand,
+            is reshuffled first.
             Return True if successful.
         '''
+        stats = self._stats
+        if stats is not None:
+            start = time.perf_counter_ns()
+        self._deck.reshuffle_if_needed((len(self._players)+1)*_NUM_CARDS_PER_HAND)
         if self._deck.get_num_remaining_cards() < (len(self._players)+1)*2:
             raise Exception('Deck is empty.')
         self._deck.issue_card(player = self._dealer, num_cards_to_issue = 2)
         for player in self._players:
             self._deck.issue_card(player = player, num_cards_to_issue = 2)
+        if stats is not None:
+            stats._cards_issued += (len(self._players)+1)*2
+            stats.record_phase('deal', time.perf_counter_ns() - start)
         return True
         
     def run_dealer_turn(self) -> bool:
@@ -98,9 +229,25 @@ class Game:
             Dealer's turn to draw card.
             Return True if successfully draws card.
         '''
+        stats = self._stats
+        if stats is not None:
+            start = time.perf_counter_ns()
+            num_remaining_cards = self._deck.get_num_remaining_cards()
         while self._dealer.is_alive() and self._deck.get_num_remaining_cards() > 0 and self._dealer.draw():
             self._deck.issue_card(self._dealer)
+        if stats is not None:
+            self._record_turn(stats, self._dealer, num_remaining_cards)
+            stats.record_phase('dealer_turn', time.perf_counter_ns() - start)
         return True
+
+    def _record_turn(self, stats: GameStats, participant: Player, num_remaining_cards: int):
+        '''
+            Count the cards drawn in a turn and the draw decisions: one per card drawn,
+            plus the decision to stop unless the turn ended by busting or running out of cards.
+        '''
+        num_cards_drawn = num_remaining_cards - self._deck.get_num_remaining_cards()
+        stats._cards_issued += num_cards_drawn
+        stats._draw_decisions += num_cards_drawn + (participant.is_alive() and self._deck.get_num_remaining_cards() > 0)
                 
     def run_player_turn(self) -> bool:
         '''
@@ -108,58 +255,252 @@ class Game:
             Return True if successful.
             Return False if no next player.
         '''
-        if self.turn_number >= len(self._players):
+        if self._turn_number >= len(self._players):
             raise Exception('Everyone had their turns. No more turns.')
+        stats = self._stats
+        if stats is not None:
+            start = time.perf_counter_ns()
+            num_remaining_cards = self._deck.get_num_remaining_cards()
         player = self._players[self._turn_number]
-        while player.is_alive() and self._deck.get_num_remaining_cards() > 0 and player.draw():
+        dealer_upcard = self._dealer._hand[0] if self._dealer._hand else None
+        while player.is_alive() and self._deck.get_num_remaining_cards() > 0 and player.draw(dealer_upcard):
             self._deck.issue_card(player)
         self._turn_number += 1
+        if stats is not None:
+            self._record_turn(stats, player, num_remaining_cards)
+            stats.record_phase('player_turn', time.perf_counter_ns() - start)
         return True
         
     def get_blackjacks(self) -> list[Player]:
         '''
             Return the list of dealer and players whose initial two cards sum to 21.
         '''
+        stats = self._stats
+        if stats is not None:
+            start = time.perf_counter_ns()
         blackjack_players = []
         if self._dealer.is_blackjack():
                 blackjack_players.append(self._dealer)
         for player in self._players:
             if player.is_blackjack():
                 blackjack_players.append(player)
+        if stats is not None:
+            stats.record_phase('blackjacks', time.perf_counter_ns() - start)
         return blackjack_players
     
     def get_winners(self) -> list[Player]:
         '''
             Return the list of dealer and players with equal highest score at the end of the game.
         '''
+        stats = self._stats
+        if stats is not None:
+            start = time.perf_counter_ns()
         winners = []
         if self._dealer.is_alive():
             winners.append(self._dealer)
-        for player in self.players:
+        for player in self._players:
             if player.is_alive():
                 if not winners:
                     winners.append(player)
-                elif player.score > winners[0]:
+                elif player.calculate_score() > winners[0].calculate_score():
                     winners = []
                     winners.append(player)
-                elif player.score == winners[0]:
+                elif player.calculate_score() == winners[0].calculate_score():
                     winners.append(player)
+        if stats is not None:
+            stats.record_phase('winners', time.perf_counter_ns() - start)
         return winners
     
+    def play_round(self) -> tuple[list[Player], list[Player]]:
+        '''
+            Play one round from the initial deal the same way src/main.py does:
+            assign the initial two cards, end the round if there are blackjacks,
+            otherwise run the dealer's turn and every player's turn.
+            Return the list of blackjack players and the list of winners. 
+            The list of winners is empty if the round ended with blackjacks.
+        '''
+        stats = self._stats
+        if stats is not None:
+            start = time.perf_counter_ns()
+        self.assign_initial_two_cards()
+        blackjack_players = self.get_blackjacks()
+        if blackjack_players:
+            winners = []
+        else:
+            self.run_dealer_turn()
+            while not self.is_game_end():
+                self.run_player_turn()
+            winners = self.get_winners()
+        if stats is not None:
+            stats.record_phase('round', time.perf_counter_ns() - start)
+        return blackjack_players, winners
+    
+    def resolve_round(self) -> tuple[list[Player], list[Player]]:
+        '''
+            Return the list of blackjack players and the list of winners of the round, like play_round,
+            scoring every hand at once with NumPy, see src/hand_scoring.py. For many games use hand_scoring.resolve_rounds.
+        '''
+        from src.hand_scoring import resolve_round  # NumPy is only needed here.
+        return resolve_round(self)
+
+    def to_bytes(self) -> bytes:
+        '''
+            Encode the deck or shoe with its order and cursor, the turn number, and the id, probability of drawing,
+            policy and cards at hand of the dealer and every player. Cards are stored as their codes, one byte each.
+            Random number generators and instrumentation are not part of the snapshot.
+            Return the versioned snapshot, a few hundred bytes for a single Deck.
+            Raise TypeError for a game on an InfiniteDeck, which has no order of cards to encode, or with a participant
+            whose policy is not the default of its seat, a ProbabilisticPolicy, DealerPolicy, BasicStrategyPolicy
+            or LookupTablePolicy, e.g. a policy with state of its own.
+        '''
+        deck = self._deck
+        if isinstance(deck, InfiniteDeck):
+            raise TypeError('A game on an InfiniteDeck can not be snapshotted.')
+        participants = [self._dealer] + (self._players or [])
+        is_shoe = isinstance(deck, Shoe)
+        player_ids = [participant._player_id.encode('utf-8') for participant in participants]
+        parts = [_HEADER.pack(_SNAPSHOT_MAGIC, _SNAPSHOT_VERSION, is_shoe, not is_shoe and deck._lazy_shuffle,
+                              self._turn_number, len(participants) - 1)]
+        if is_shoe:
+            parts.append(_SHOE_HEADER.pack(deck._num_decks, deck._penetration, len(deck._cards),
+                                           deck._idx_of_next_card_to_issue, deck._idx_of_cut_card))
+        else:
+            parts.append(_DECK_HEADER.pack(len(deck._cards), deck._idx_of_next_card_to_issue))
+        policy_tags = [_policy_tag(participant) for participant in participants]
+        participant_struct = _PARTICIPANTS[_SNAPSHOT_VERSION]
+        for participant, player_id, policy_tag in zip(participants, player_ids, policy_tags):
+            parts.append(participant_struct.pack(len(player_id), len(participant._hand), participant._prob_to_draw, policy_tag))
+        parts.extend(player_ids)
+        for participant, policy_tag in zip(participants, policy_tags):
+            if policy_tag == _LOOKUP_TABLE_POLICY_TAG:
+                parts.append(participant._policy._table + bytes([participant._policy._default]))
+        parts.append(bytes([card._code for participant in participants for card in participant._hand]))
+        parts.append(bytes(deck._cards) if is_shoe else bytes([card._code for card in deck._cards]))
+        return b''.join(parts)
+
+    @staticmethod
+    def from_bytes(data: bytes, rng: random.Random = None) -> 'Game':
+        '''
+            Restore a game encoded by to_bytes. Cards are restored as the canonical Card objects.
+            rng: random number generator for the deck and the drawing decisions, as in the constructor.
+            Raise ValueError if the data is not a snapshot of a supported version.
+        '''
+        data = bytes(data)
+        try:
+            magic, version, is_shoe, lazy_shuffle, turn_number, num_players = _HEADER.unpack_from(data, 0)
+        except struct.error:
+            raise ValueError('Data is too short for a Game snapshot.')
+        if magic != _SNAPSHOT_MAGIC:
+            raise ValueError('Data is not a Game snapshot.')
+        if version not in _PARTICIPANTS:
+            raise ValueError(f'Unsupported Game snapshot version {version}.')
+        participant_struct = _PARTICIPANTS[version]
+        try:
+            offset = _HEADER.size
+            if is_shoe:
+                num_decks, penetration, num_cards, idx_of_next_card, idx_of_cut_card = _SHOE_HEADER.unpack_from(data, offset)
+                offset += _SHOE_HEADER.size
+            else:
+                num_cards, idx_of_next_card = _DECK_HEADER.unpack_from(data, offset)
+                offset += _DECK_HEADER.size
+            end = offset + participant_struct.size * (num_players + 1)
+            if len(data) < end:
+                raise ValueError('Game snapshot is truncated.')
+            columns = list(zip(*participant_struct.iter_unpack(data[offset:end])))
+            if version == 1:
+                columns.append((_DEFAULT_POLICY_TAG,) * (num_players + 1))
+            id_lengths, nums_hand_cards, probs_to_draw, policy_tags = columns
+            offset = end
+            cards = CANONICAL_CARDS
+            participants = []
+            policies_offset = offset + sum(id_lengths)
+            hand_codes_offset = policies_offset + _LOOKUP_TABLE_POLICY_SIZE * policy_tags.count(_LOOKUP_TABLE_POLICY_TAG)
+            hand_cards = [cards[code] for code in data[hand_codes_offset:hand_codes_offset + sum(nums_hand_cards)]]
+            hand_offset = 0
+            for seat, (id_length, num_hand_cards, prob_to_draw, policy_tag) in enumerate(
+                    zip(id_lengths, nums_hand_cards, probs_to_draw, policy_tags)):
+                if not 0 <= prob_to_draw <= 1:
+                    raise ValueError('probability of drawing card must be between 0 and 1')
+                player_id = data[offset:offset + id_length].decode('utf-8')
+                offset += id_length
+                if policy_tag == _DEFAULT_POLICY_TAG:
+                    policy = None
+                elif policy_tag == _LOOKUP_TABLE_POLICY_TAG:
+                    table = data[policies_offset:policies_offset + _LOOKUP_TABLE_POLICY_SIZE]
+                    policies_offset += _LOOKUP_TABLE_POLICY_SIZE
+                    policy = LookupTablePolicy(table[:-1], default = bool(table[-1]))
+                elif policy_tag in _TAGGED_POLICIES:
+                    policy = _TAGGED_POLICIES[policy_tag]
+                else:
+                    raise ValueError(f'Unknown policy tag {policy_tag} in Game snapshot.')
+                participants.append((Dealer if seat == 0 else Player)._restore(
+                    player_id, prob_to_draw, rng, hand_cards[hand_offset:hand_offset + num_hand_cards], policy))
+                hand_offset += num_hand_cards
+            if hand_offset != len(hand_cards):
+                raise ValueError('Game snapshot is truncated.')
+            offset = hand_codes_offset + hand_offset
+            if len(data) != offset + num_cards:
+                raise ValueError('Game snapshot is truncated or has trailing data.')
+        except (struct.error, IndexError):
+            raise ValueError('Game snapshot is truncated or corrupted.')
+        if turn_number > num_players:
+            raise ValueError('Game snapshot has a turn number past the last player.')
+        if idx_of_next_card > num_cards:
+            raise ValueError('Game snapshot has issued more cards than its deck holds.')
+        deck_codes = data[offset:]
+        if is_shoe:
+            # A shoe always holds all of its decks, in any order: num_decks copies of every card code and nothing else.
+            if (num_decks < 1 or not 0 < penetration <= 1 or idx_of_cut_card > num_cards or
+                    num_cards != len(cards) * num_decks or
+                    any(deck_codes.count(code) != num_decks for code in range(len(cards)))):
+                raise ValueError('Game snapshot has an invalid shoe.')
+            deck = Shoe._restore(num_decks, penetration, rng, bytearray(deck_codes), idx_of_next_card, idx_of_cut_card)
+        else:
+            if len(set(deck_codes)) != num_cards or max(deck_codes, default = 0) >= len(cards):
+                raise ValueError('Game snapshot has an invalid deck: every card must be a distinct card code.')
+            deck = Deck._restore(rng, [cards[code] for code in deck_codes], idx_of_next_card, bool(lazy_shuffle))
+        # Built directly, like the participants, rather than through __init__, which would construct a Deck to discard.
+        game = Game.__new__(Game)
+        game._init_fields(turn_number, rng, deck, participants[0], participants[1:])
+        return game
+
     def reset_game(self, dealer_info: tuple[str, float] = None, players_info: list[tuple[str, float]] = None) -> bool:
         '''
-            Reset the game.
-            Reset card pool, turn number and optionally resetting the list of players if given. 
+            Reset the game for a new round, in place: reset the turn number, empty the hands of the dealer and players
+            and put the issued cards of a Deck back and shuffle it lazily. A Shoe keeps dealing until its cut card,
+            and an InfiniteDeck has nothing to reset.
+            dealer_info, players_info: if given, replace the dealer or the players, which are kept otherwise.
             Return True if successful.
         '''
         self._turn_number = 0
-        if not dealer_info:
-            self._dealer = None
-        else:
-            self._dealer = Dealer(dealer_info[0], dealer_info[1]) 
-        if not players_info:
-            self._playerss = None
-        else:
-            self._players = [Player(player_id, prob_to_draw) for player_id, prob_to_draw in players_info]
+        if dealer_info:
+            self._dealer = Dealer(dealer_info[0], dealer_info[1], self._rng)
+        elif self._dealer is not None:
+            self._dealer._clear_hand()
+        if players_info:
+            self._players = [Player(player_info[0], player_info[1], self._rng, *player_info[2:]) for player_info in players_info]
+        elif self._players is not None:
+            for player in self._players:
+                player._clear_hand()
+        if isinstance(self._deck, Deck):
+            self._deck.return_issued_cards()
+            self._deck.shuffle_cards(lazy = True)
+        if self._stats is not None and (dealer_info or players_info):
+            self.enable_instrumentation(self._stats)
         return True
-        
\ No newline at end of file
+
+    def play_rounds(self, num_rounds: int = None) -> Iterator[tuple[list[Player], list[Player]]]:
+        '''
+            Play a session of rounds on this game, resetting it in place with reset_game before every round,
+            so no Deck, Card, Player or Dealer is constructed between rounds.
+            num_rounds: number of rounds to play. Rounds are played until the consumer stops if not given.
+            Yield the list of blackjack players and the list of winners of every round, like play_round.
+            The dealer, players and their hands are reused, so read them before asking for the next round.
+        '''
+        if num_rounds is not None and num_rounds < 0:
+            raise ValueError('num_rounds can not be negative.')
+        round_number = 0
+        while num_rounds is None or round_number < num_rounds:
+            self.reset_game()
+            yield self.play_round()
+            round_number += 1
@@ -0,0 +1,113 @@
+from src.card import _HARD_VALUE_BY_CODE
+from src.player import Player
+from src.game import Game
+from operator import attrgetter
+from typing import NamedTuple
+import numpy as np
+
+# Hands are rows of card codes (see Card.get_code) padded with PAD. Both lookup tables end with an entry for PAD,
+# which is -1 and so indexes the last entry.
+PAD = -1
+_HARD_VALUES = np.array(_HARD_VALUE_BY_CODE + (0,), dtype=np.int16)
+_IS_ACE = np.array([value == 1 for value in _HARD_VALUE_BY_CODE] + [False])
+_get_code = attrgetter('_code')
+
+
+class _Padding:
+    '''
+        Stands in for a Card after the end of a hand.
+    '''
+    __slots__ = ()
+    _code = PAD
+
+
+_PAD_CARD = _Padding()
+
+
+class HandScores(NamedTuple):
+    '''
+        Arrays with one value per hand:
+            hard_totals: total with every Ace counted as 1.
+            soft_totals: total with Aces promoted to 11 as far as possible without busting.
+            scores: same as Player.calculate_score, i.e. the soft total, -1 if busted.
+            busted: True if the hard total is over 21.
+            blackjacks: True for hands of exactly two cards scoring 21, same as Player.is_blackjack.
+    '''
+    hard_totals: np.ndarray
+    soft_totals: np.ndarray
+    scores: np.ndarray
+    busted: np.ndarray
+    blackjacks: np.ndarray
+
+
+def score_hands(codes: np.ndarray) -> HandScores:
+    '''
+        Score many hands in one NumPy pass.
+        codes: 2-D integer array, one hand per row, card codes followed by PAD.
+        Return the HandScores of the rows.
+    '''
+    codes = np.asarray(codes)
+    if codes.ndim != 2:
+        raise ValueError('codes must be a 2-D array of card codes, one hand per row.')
+    if codes.size and (codes.min() < PAD or codes.max() >= len(_HARD_VALUE_BY_CODE)):
+        raise ValueError(f'Card codes must be between 0 and {len(_HARD_VALUE_BY_CODE) - 1}, or {PAD} for padding.')
+    hard_totals = _HARD_VALUES[codes].sum(axis=1)
+    num_aces = _IS_ACE[codes].sum(axis=1)
+    num_cards = (codes != PAD).sum(axis=1)
+    busted = hard_totals > 21
+    # Same promotion as Player.calculate_score: min((21 - score) // 10, num_aces) Aces counted as 11.
+    soft_totals = hard_totals + np.minimum(np.maximum(21 - hard_totals, 0) // 10, num_aces) * 10
+    scores = np.where(busted, -1, soft_totals)
+    return HandScores(hard_totals, soft_totals, scores, busted, (num_cards == 2) & (scores == 21))
+
+
+def get_hand_codes(games: list[Game]) -> tuple[np.ndarray, np.ndarray]:
+    '''
+        Gather the hands of the dealer and players of every game, in seat order, as rows padded with PAD.
+        Return the (num_games, max_num_seats, max_num_cards) codes and a (num_games, max_num_seats) mask of the seats
+        that exist, for games with fewer players than others.
+    '''
+    num_seats = max(len(game._players) + 1 for game in games)
+    num_cards = max(len(participant._hand) for game in games for participant in [game._dealer] + game._players)
+    padding = [_PAD_CARD] * num_cards
+    # The cards are gathered as objects and read in one pass, which is cheaper than a list of codes per hand.
+    cards = []
+    for game in games:
+        cards += game._dealer._hand
+        cards += padding[len(game._dealer._hand):]
+        for player in game._players:
+            cards += player._hand
+            cards += padding[len(player._hand):]
+        cards += padding * (num_seats - 1 - len(game._players))
+    codes = np.fromiter(map(_get_code, cards), dtype=np.int8, count=len(cards)).reshape(len(games), num_seats, num_cards)
+    seat_mask = np.arange(num_seats) < np.array([len(game._players) + 1 for game in games])[:, None]
+    return codes, seat_mask
+
+
+def resolve_rounds(games: list[Game]) -> tuple[np.ndarray, np.ndarray]:
+    '''
+        End-of-round resolution of many games at once, the same as Game.play_round:
+        blackjacks are the seats whose initial two cards score 21, and winners are the alive seats with the
+        equal highest score, none if the round ended with blackjacks.
+        Return two (num_games, max_num_seats) boolean arrays, blackjacks and winners, seat 0 being the dealer.
+    '''
+    if not games:
+        raise ValueError('At least one game is needed.')
+    codes, seat_mask = get_hand_codes(games)
+    num_games, num_seats, num_cards = codes.shape
+    hand_scores = score_hands(codes.reshape(num_games * num_seats, num_cards))
+    scores = np.where(seat_mask, hand_scores.scores.reshape(num_games, num_seats), -1)
+    blackjacks = hand_scores.blackjacks.reshape(num_games, num_seats) & seat_mask
+    ended_by_blackjack = blackjacks.any(axis=1, keepdims=True)
+    winners = (scores != -1) & (scores == scores.max(axis=1, keepdims=True)) & ~ended_by_blackjack
+    return blackjacks, winners
+
+
+def resolve_round(game: Game) -> tuple[list[Player], list[Player]]:
+    '''
+        Return the blackjack players and winners of a played round as lists, like Game.play_round.
+    '''
+    blackjacks, winners = resolve_rounds([game])
+    participants = [game._dealer] + game._players
+    return ([participant for participant, is_blackjack in zip(participants, blackjacks[0]) if is_blackjack],
+            [participant for participant, is_winner in zip(participants, winners[0]) if is_winner])
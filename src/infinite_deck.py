@@ -0,0 +1,95 @@
+from src.card import Card, CANONICAL_CARDS
+from src.player import Player
+import random
+
+# An infinite deck never runs out. The number of remaining cards is counted down from this, so that Game and
+# GameStats can still take differences of it.
+_NUM_CARDS = 1 << 62
+
+
+class InfiniteDeck:
+    def __init__(self, rng: random.Random = None, cards: list[Card] = None, batch_size: int = 64):
+        '''
+            Deals every card with replacement, i.e. an infinite number of decks: card removal has no effect,
+            so a study that does not care about it needs no deck per round and no shuffle.
+            rng: random number generator used for sampling. The global random module is used if not given.
+            cards: the composition sampled from, duplicates weighting a card, e.g. Deck.get_unissued_cards() to
+            sample from the cards left in a deck. Defaults to one deck of the canonical cards.
+            batch_size: number of cards sampled at a time. Cards are sampled in bulk from the composition,
+            so a round costs only the cards actually drawn.
+        '''
+        if cards is None:
+            cards = CANONICAL_CARDS
+        if not cards:
+            raise ValueError('cards must not be empty.')
+        if not all(isinstance(card, Card) for card in cards):
+            raise TypeError('Input cards must be a list of Card objects')
+        if batch_size < 1:
+            raise ValueError('batch_size must be at least 1')
+        self._rng = rng if rng is not None else random
+        self._cards = tuple(CANONICAL_CARDS[card._code] for card in cards)
+        self._batch_size = batch_size
+        # Sampled cards not dealt yet, dealt from the end.
+        self._samples = []
+        self._num_cards_issued = 0
+
+    def __str__(self) -> str:
+        return f'InfiniteDeck sampling from {len(self._cards)} cards, {self._num_cards_issued} cards issued'
+
+    def set_rng(self, rng: random.Random) -> bool:
+        '''
+            Cards already sampled with the previous generator are dropped.
+        '''
+        self._rng = rng
+        self._samples = []
+        return True
+
+    def get_cards(self) -> list[Card]:
+        '''
+            Return the composition the cards are sampled from.
+        '''
+        return list(self._cards)
+
+    def shuffle_cards(self) -> bool:
+        '''
+            Every card is already drawn independently, so there is nothing to shuffle. Kept for the same contract as Deck.
+            Return True.
+        '''
+        return True
+
+    def reshuffle_if_needed(self, num_cards_needed: int = 0) -> bool:
+        '''
+            Never needed. Kept for the same contract as Shoe.
+            Return False.
+        '''
+        return False
+
+    def issue_card(self, player: Player, num_cards_to_issue: int = 1) -> bool:
+        '''
+            player: player or dealer.
+            num_cards_to_issue: number of cards to issue.
+            Same contract as Deck.issue_card, except that it never runs out of cards.
+            Return True if sucessful.
+        '''
+        samples = self._samples
+        for i in range(num_cards_to_issue):
+            if not samples:
+                samples += self._rng.choices(self._cards, k = self._batch_size)
+            player._receive_card(samples.pop())
+        self._num_cards_issued += num_cards_to_issue
+        return True
+
+    def get_num_cards_issued(self) -> int:
+        return self._num_cards_issued
+
+    def get_num_remaining_cards(self) -> int:
+        '''
+            Return a number of remaining cards far above what any game can deal.
+        '''
+        return _NUM_CARDS - self._num_cards_issued
+
+    def get_unissued_cards(self) -> list[Card]:
+        '''
+            Return the composition the cards are sampled from, which dealing does not change.
+        '''
+        return list(self._cards)
@@ -0,0 +1,120 @@
+from src.player import Player
+
+# Phases of a round timed by Game. 'round' is a whole Game.play_round.
+PHASES = ('deal', 'blackjacks', 'dealer_turn', 'player_turn', 'winners', 'round')
+# Bucket i of a latency histogram counts durations d with 2**i <= d < 2**(i+1) nanoseconds (bucket 0 also d < 1).
+_NUM_BUCKETS = 40
+
+
+class GameStats:
+    def __init__(self):
+        '''
+            Counters and per-phase latency histograms collected by an instrumented Game.
+            One GameStats can be shared by several games, e.g. every game of a simulation run.
+        '''
+        self.reset()
+
+    def reset(self) -> bool:
+        self._cards_issued = 0
+        self._score_calls = 0
+        self._draw_decisions = 0
+        self._phase_counts = {phase: 0 for phase in PHASES}
+        self._phase_total_ns = {phase: 0 for phase in PHASES}
+        self._phase_max_ns = {phase: 0 for phase in PHASES}
+        self._phase_histograms = {phase: [0] * _NUM_BUCKETS for phase in PHASES}
+        return True
+
+    def record_phase(self, phase: str, elapsed_ns: int):
+        self._phase_counts[phase] += 1
+        self._phase_total_ns[phase] += elapsed_ns
+        if elapsed_ns > self._phase_max_ns[phase]:
+            self._phase_max_ns[phase] = elapsed_ns
+        self._phase_histograms[phase][min(elapsed_ns.bit_length() - 1, _NUM_BUCKETS - 1) if elapsed_ns > 0 else 0] += 1
+
+    def get_cards_issued(self) -> int:
+        return self._cards_issued
+
+    def get_score_calls(self) -> int:
+        '''
+            Number of calculate_score calls on the instrumented players, see instrument_player.
+        '''
+        return self._score_calls
+
+    def get_draw_decisions(self) -> int:
+        return self._draw_decisions
+
+    def get_rounds_per_sec(self) -> float:
+        '''
+            Rounds per second spent inside Game.play_round. 0.0 before the first round.
+        '''
+        total_ns = self._phase_total_ns['round']
+        return self._phase_counts['round'] / total_ns * 1e9 if total_ns else 0.0
+
+    def get_percentile_ns(self, phase: str, pct: float) -> int:
+        '''
+            Upper bound of the histogram bucket holding the pct-th percentile latency of a phase. 0 if never timed.
+        '''
+        count = self._phase_counts[phase]
+        if count == 0:
+            return 0
+        rank = pct / 100 * count
+        cumulative = 0
+        for bucket, bucket_count in enumerate(self._phase_histograms[phase]):
+            cumulative += bucket_count
+            if cumulative >= rank and bucket_count:
+                return min(2 ** (bucket + 1), self._phase_max_ns[phase])
+        return self._phase_max_ns[phase]
+
+    def snapshot(self) -> dict:
+        '''
+            Return a copy of the counters and, per phase, the count, total and max latency in nanoseconds and the histogram.
+        '''
+        return {
+            'cards_issued': self._cards_issued,
+            'score_calls': self._score_calls,
+            'draw_decisions': self._draw_decisions,
+            'phases': {phase: {'count': self._phase_counts[phase],
+                               'total_ns': self._phase_total_ns[phase],
+                               'max_ns': self._phase_max_ns[phase],
+                               'histogram': list(self._phase_histograms[phase])}
+                       for phase in PHASES},
+        }
+
+    def merge(self, other: 'GameStats') -> bool:
+        '''
+            Add the counters and histograms of another GameStats, e.g. from another worker process.
+            Return True if successful.
+        '''
+        self._cards_issued += other._cards_issued
+        self._score_calls += other._score_calls
+        self._draw_decisions += other._draw_decisions
+        for phase in PHASES:
+            self._phase_counts[phase] += other._phase_counts[phase]
+            self._phase_total_ns[phase] += other._phase_total_ns[phase]
+            self._phase_max_ns[phase] = max(self._phase_max_ns[phase], other._phase_max_ns[phase])
+            self._phase_histograms[phase] = [count + other_count for count, other_count
+                                             in zip(self._phase_histograms[phase], other._phase_histograms[phase])]
+        return True
+
+
+def instrument_player(player: Player, stats: GameStats) -> bool:
+    '''
+        Count the calculate_score calls of the player in stats: those of Game, e.g. the blackjack checks and get_winners,
+        and of policies such as DealerPolicy. Only the calls are counted, not the scoring work: the score is kept up to
+        date as cards are added, and is_alive, get_hand_state and LookupTablePolicy read it without calling calculate_score.
+        The counting wrapper is set on the instance only, so uninstrumented players pay nothing.
+        Return True if successful.
+    '''
+    uninstrument_player(player)
+    calculate_score = player.calculate_score
+
+    def counting_calculate_score():
+        stats._score_calls += 1
+        return calculate_score()
+    player.calculate_score = counting_calculate_score
+    return True
+
+
+def uninstrument_player(player: Player) -> bool:
+    player.__dict__.pop('calculate_score', None)
+    return True
@@ -1,4 +1,4 @@
-from src.game import Game 
+from src.events import iter_rounds
 
 # main 算外部了，所以必须用getter和setter，不能直接用dot method来access field。
 # main 就是在外部调用API，API给你啥功能你用啥，里面不对你开放。
@@ -6,19 +6,11 @@ from src.game import Game
 def main():
     dealer_info = ('dealer_id', 0.3)
     players_info = [('player1',0.3), ('player2', 0.4), ('player3', 0.5)]
-    game = Game(dealer_info, players_info)
-    game.assign_initial_two_cards()
-    blackjack_players = game.get_blackjacks()
-    if blackjack_players:
-        print(f'blackjack players are: {[player.get_player_id() for player in blackjack_players]}')
-        return 
-    game.run_dealer_turn()
-    while not game.is_game_end():
-        game.run_player_turn()
-    winners = game.get_winners()
-    if winners:
-        print(f'winners are: {[winner.get_player_id() for winner in winners]}')
-    else:
-        print('no winners.')
-
-       
\ No newline at end of file
+    participant_ids = [dealer_info[0]] + [player_id for player_id, prob_to_draw in players_info]
+    for record in iter_rounds(dealer_info, players_info, num_rounds = 1):
+        if record.blackjack_seats:
+            print(f'blackjack players are: {[participant_ids[seat] for seat in record.blackjack_seats]}')
+        elif record.winner_seats:
+            print(f'winners are: {[participant_ids[seat] for seat in record.winner_seats]}')
+        else:
+            print('no winners.')
@@ -0,0 +1,192 @@
+from src.deck import Deck
+from src.game import Game
+from src.player import Player
+from src.simulation import derive_seeds
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+from itertools import chain
+from typing import Iterator, NamedTuple
+import math
+import os
+import random
+
+DEFAULT_GRID = tuple(i / 10 for i in range(11))
+# A hand of one deck holds at most 11 cards without busting (four Aces, four 2s and three 3s), so a turn takes
+# at most 9 draws and one more decision.
+_MAX_DECISIONS_PER_TURN = 10
+
+
+class CandidateResult(NamedTuple):
+    '''
+        Win rate of the tuned seat with one prob_to_draw, with its confidence interval, and the confidence interval
+        of the difference with the best candidate, measured on the same rounds. Both intervals are 0 for the best one.
+    '''
+    prob_to_draw: float
+    num_rounds: int
+    wins: int
+    win_rate: float
+    ci_low: float
+    ci_high: float
+    diff_ci_low: float
+    diff_ci_high: float
+
+
+class OptimizationResult(NamedTuple):
+    '''
+        best: the candidate with the highest win rate.
+        candidates: every candidate evaluated, by increasing prob_to_draw.
+    '''
+    player_id: str
+    best: CandidateResult
+    candidates: tuple[CandidateResult, ...]
+
+
+def _overflow_numbers(seed: int) -> Iterator[float]:
+    '''
+        Numbers for the decisions of a seat past the ones drawn before the round, from their own stream,
+        so the streams of the seat stay aligned across candidates whatever happens in the round.
+    '''
+    yield from iter(random.Random(seed).random, None)
+
+
+class _RoundNumbers:
+    '''
+        Random numbers for the decisions of one seat in one round, drawn before the round.
+        Used as the rng of a player: the policies only call random().
+    '''
+    __slots__ = ('random',)
+
+
+def _run_candidate(dealer_info: tuple[str, float], players_info: list[tuple[str, float]], seat: int, prob_to_draw: float,
+                   num_rounds: int, seed: int) -> bytes:
+    '''
+        Play num_rounds rounds with the player in seat (1 for the first player) drawing with prob_to_draw.
+        The deck and every seat have their own random streams derived from seed, and every round takes the same
+        amount of random numbers from each stream whatever happens in it, so every candidate of a shard is dealt the
+        same shuffles and every seat decides on the same numbers round by round:
+        a full shuffle per round, since a lazy one draws a number per card dealt,
+        and _MAX_DECISIONS_PER_TURN numbers per seat and round, of which the seat uses as many as it needs,
+        plus the seed of the seat's numbers past those, see _overflow_numbers.
+        Return one byte per round, 1 if the player in seat was among the winners.
+    '''
+    deck_seed, *seat_seeds = derive_seeds(seed, len(players_info) + 2)
+    deck_rng = random.Random(deck_seed)
+    seat_rngs = [random.Random(seat_seed) for seat_seed in seat_seeds]
+    numbers = [_RoundNumbers() for seat_seed in seat_seeds]
+    wins = bytearray(num_rounds)
+    for i in range(num_rounds):
+        deck = Deck(deck_rng)
+        deck.shuffle_cards()
+        game = Game(dealer_info, players_info, deck = deck)
+        participants = [game._dealer] + game._players
+        for participant, seat_rng, seat_numbers in zip(participants, seat_rngs, numbers):
+            seat_numbers.random = chain([seat_rng.random() for j in range(_MAX_DECISIONS_PER_TURN)],
+                                        _overflow_numbers(seat_rng.getrandbits(64))).__next__
+            participant.set_rng(seat_numbers)
+        player = participants[seat]
+        player.set_prob_to_draw(prob_to_draw)
+        blackjack_players, winners = game.play_round()
+        if any(player is winner for winner in winners):
+            wins[i] = 1
+    return bytes(wins)
+
+
+def _evaluate(dealer_info: tuple[str, float], players_info: list[tuple[str, float]], seat: int, probs: list[float],
+              shard_sizes: list[int], shard_seeds: list[int], executor: ProcessPoolExecutor = None) -> dict[float, bytes]:
+    '''
+        Return the per-round wins of every candidate over all shards, in shard order.
+    '''
+    if executor is None:
+        return {prob_to_draw: b''.join(_run_candidate(dealer_info, players_info, seat, prob_to_draw, shard_size, shard_seed)
+                                       for shard_size, shard_seed in zip(shard_sizes, shard_seeds))
+                for prob_to_draw in probs}
+    futures = {prob_to_draw: [executor.submit(_run_candidate, dealer_info, players_info, seat, prob_to_draw, shard_size, shard_seed)
+                              for shard_size, shard_seed in zip(shard_sizes, shard_seeds)]
+               for prob_to_draw in probs}
+    return {prob_to_draw: b''.join(future.result() for future in shard_futures) for prob_to_draw, shard_futures in futures.items()}
+
+
+def _summarize(wins_by_prob: dict[float, bytes], confidence: float) -> list[CandidateResult]:
+    '''
+        Normal approximation intervals. The difference with the best candidate is paired round by round,
+        which is what the common random numbers make narrow.
+    '''
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    num_rounds = len(next(iter(wins_by_prob.values())))
+    best_prob = max(sorted(wins_by_prob), key = lambda prob_to_draw: sum(wins_by_prob[prob_to_draw]))
+    best_wins = wins_by_prob[best_prob]
+    results = []
+    for prob_to_draw in sorted(wins_by_prob):
+        wins = wins_by_prob[prob_to_draw]
+        num_wins = sum(wins)
+        win_rate = num_wins / num_rounds
+        half_width = z * math.sqrt(win_rate * (1 - win_rate) / num_rounds)
+        # Round by round differences are -1, 0 or 1: only the counts of each are needed.
+        num_better = sum(1 for win, best_win in zip(wins, best_wins) if win > best_win)
+        num_worse = sum(1 for win, best_win in zip(wins, best_wins) if win < best_win)
+        diff = (num_better - num_worse) / num_rounds
+        diff_variance = (num_better + num_worse) / num_rounds - diff ** 2
+        diff_half_width = z * math.sqrt(max(diff_variance, 0.0) / num_rounds)
+        results.append(CandidateResult(prob_to_draw, num_rounds, num_wins, win_rate, max(win_rate - half_width, 0.0),
+                                       min(win_rate + half_width, 1.0), diff - diff_half_width, diff + diff_half_width))
+    return results
+
+
+def optimize_prob_to_draw(dealer_info: tuple[str, float], players_info: list[tuple[str, float]], player_id: str,
+                          grid: list[float] = DEFAULT_GRID, num_rounds: int = 20000, num_refinements: int = 0,
+                          num_workers: int = None, seed: int = None, confidence: float = 0.95) -> OptimizationResult:
+    '''
+        Search the prob_to_draw of one player that maximizes its win rate at the table, the other seats unchanged.
+        Every candidate plays the same num_rounds rounds: the same shuffles and, for every other seat, the same stream
+        of random numbers (common random numbers), so differences between candidates are measured with far less noise
+        than their win rates.
+        grid: candidate values of prob_to_draw, each between 0 and 1.
+        num_refinements: number of adaptive steps after the grid. Each one evaluates 4 new values around the best
+        candidate so far, at a quarter of the previous spacing.
+        num_workers: number of worker processes the candidates and shards of rounds are fanned out to.
+        Defaults to the number of CPUs. With 1 worker everything runs in this process.
+        seed: master seed. The same seed and number of workers always give identical results.
+        confidence: level of the confidence intervals.
+        Return the OptimizationResult.
+    '''
+    seats = [player_info[0] for player_info in players_info]
+    if player_id not in seats:
+        raise ValueError(f'No player with id {player_id}.')
+    for player_info in players_info:
+        # The candidates are compared by prob_to_draw, which a seat with a policy of its own does not use.
+        if not Player(player_info[0], player_info[1], None, *player_info[2:]).has_default_policy():
+            raise TypeError(f'optimize_prob_to_draw only plays seats drawing with prob_to_draw, not with the '
+                            f'{type(player_info[2]).__name__} of {player_info[0]}.')
+    if not grid or any(not 0 <= prob_to_draw <= 1 for prob_to_draw in grid):
+        raise ValueError('grid must have values of prob_to_draw between 0 and 1.')
+    if num_rounds < 1:
+        raise ValueError('num_rounds must be at least 1.')
+    if not 0 < confidence < 1:
+        raise ValueError('confidence must be between 0 and 1.')
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+    if num_workers < 1:
+        raise ValueError('num_workers must be at least 1.')
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(64)
+    seat = seats.index(player_id) + 1
+    num_shards = min(num_workers, num_rounds)
+    shard_seeds = derive_seeds(seed, num_shards)
+    shard_sizes = [num_rounds // num_shards + (shard < num_rounds % num_shards) for shard in range(num_shards)]
+    probs = sorted(set(float(prob_to_draw) for prob_to_draw in grid))
+    executor = ProcessPoolExecutor(max_workers = num_workers) if num_workers > 1 else None
+    try:
+        wins_by_prob = _evaluate(dealer_info, players_info, seat, probs, shard_sizes, shard_seeds, executor)
+        spacing = min((b - a for a, b in zip(probs, probs[1:])), default = 0.1)
+        for refinement in range(num_refinements):
+            spacing /= 4
+            best_prob = max(sorted(wins_by_prob), key = lambda prob_to_draw: sum(wins_by_prob[prob_to_draw]))
+            new_probs = sorted(set(round(min(max(best_prob + k * spacing, 0.0), 1.0), 12) for k in (-2, -1, 1, 2))
+                               - set(wins_by_prob))
+            wins_by_prob.update(_evaluate(dealer_info, players_info, seat, new_probs, shard_sizes, shard_seeds, executor))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    candidates = _summarize(wins_by_prob, confidence)
+    best = max(candidates, key = lambda candidate: candidate.wins)
+    return OptimizationResult(player_id, best, tuple(candidates))
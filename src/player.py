@@ -1,48 +1,162 @@
-from src.card import Card
+from src.card import Card, CANONICAL_CARDS, _HARD_VALUE_BY_CODE
+from src.policy import Policy, PROBABILISTIC_POLICY, DEALER_POLICY
+from typing import NamedTuple
 import random
 
+
+class HandState(NamedTuple):
+    '''
+        Read-only snapshot of the running state of the cards at hand.
+            hard_total: total with every Ace counted as 1.
+            num_aces: number of Aces at hand.
+            is_soft: True if an Ace is counted as 11.
+            score: same as Player.calculate_score().
+    '''
+    hard_total: int
+    num_aces: int
+    is_soft: bool
+    score: int
+
+
+def _score_of(hard_total: int, num_aces: int) -> int:
+    '''
+        Score of a hand given its hard total and number of Aces, -1 if busted.
+        At most one Ace can be counted as 11, and only if the hard total is at most 11.
+    '''
+    if hard_total > 21:
+        return -1
+    if num_aces and hard_total <= 11:
+        return hard_total + 10
+    return hard_total
+
+
 class Player:
-    def __init__(self,player_id: str, prob_to_draw: float):
+    # Decides whether to draw. Shared by every Player that has not been given its own policy.
+    _policy = PROBABILISTIC_POLICY
+
+    def __init__(self,player_id: str, prob_to_draw: float, rng: random.Random = None, policy: Policy = None):
         '''
             player_number: the player number for the player.
             Construct player number.
             Construct self._cards which is a dict of Card objects that player has at hand
             # self._cards: {str, int}. Key is content of card and value is the number of such cards. 
             self._card: list of Card object.
+            The hard total, number of Aces and score of the cards at hand are kept up to date as cards are added,
+            so score, bust and blackjack checks do not rescan the cards.
+            rng: random number generator for drawing decisions. The global random module is used if not given.
+            policy: decides whether to draw, see src/policy.py. By default the player draws with probability prob_to_draw.
         '''
-        self._player_id = player_id
-        self._cards = []
-        self._score = 0
+        if policy is not None and not isinstance(policy, Policy):
+            raise TypeError('policy must be a Policy object')
         if not isinstance(prob_to_draw, float) and not isinstance(prob_to_draw, int):
             raise TypeError('probability of drawing should be type float')
         if prob_to_draw < 0 or prob_to_draw > 1:
             raise ValueError('probability of drawing card must be between 0 and 1')
-        self._prob_to_draw = float(prob_to_draw)
-        
+        self._init_fields(player_id, float(prob_to_draw), rng, [], policy)
+
+    def _init_fields(self, player_id: str, prob_to_draw: float, rng: random.Random, cards: list[Card], policy: Policy):
+        '''
+            Set every field of a player or dealer. __init__ validates the arguments first, _restore does not.
+            policy: the default policy of the class is kept if None.
+        '''
+        self._player_id = player_id
+        if policy is not None:
+            self._policy = policy
+        self._rng = rng if rng is not None else random
+        self._prob_to_draw = prob_to_draw
+        self._cards = cards
+
+    @classmethod
+    def _restore(cls, player_id: str, prob_to_draw: float, rng: random.Random, cards: list[Card],
+                 policy: Policy = None) -> 'Player':
+        '''
+            Construct a player or dealer from already validated fields, e.g. a Game snapshot, without the checks of __init__.
+            policy: the default policy of the class is kept if not given.
+        '''
+        player = cls.__new__(cls)
+        player._init_fields(player_id, prob_to_draw, rng, cards, policy)
+        return player
+
     def __eq__(self, other) -> bool:
         return (self._player_id == other._player_id and 
                 self._prob_to_draw == other._prob_to_draw and 
                 self._cards == other._cards and 
                 self._score == other._score)
 
+    @property
+    def _cards(self) -> list[Card]:
+        return self._hand
+
+    @_cards.setter
+    def _cards(self, cards: list[Card]):
+        '''
+            Replacing the cards at hand recomputes the running hand state.
+        '''
+        self._hand = cards
+        self._recalculate_hand_state()
+
+    def _recalculate_hand_state(self):
+        hard_total = 0
+        num_aces = 0
+        for card in self._hand:
+            hard_total += _HARD_VALUE_BY_CODE[card._code]
+            num_aces += card._code >= 48  # Aces have the 4 highest codes.
+        self._hard_total = hard_total
+        self._num_aces = num_aces
+        self._num_cards = len(self._hand)
+        self._score = _score_of(hard_total, num_aces)
+
+    def _receive_card(self, card: Card):
+        '''
+            Append a card to the cards at hand and update the hand state in O(1).
+            Used by Deck.issue_card, which only issues Card objects.
+        '''
+        self._hand.append(card)
+        self._hard_total += _HARD_VALUE_BY_CODE[card._code]
+        self._num_aces += card._code >= 48  # Aces have the 4 highest codes.
+        self._num_cards += 1
+        self._score = _score_of(self._hard_total, self._num_aces)
+
+    def _clear_hand(self):
+        '''
+            Empty the cards at hand in place, keeping the list, e.g. between the rounds of Game.play_rounds.
+        '''
+        self._hand.clear()
+        self._recalculate_hand_state()
+
+    def _sync_hand_state(self):
+        '''
+            Recompute the hand state if cards were appended to or removed from the list directly.
+        '''
+        if len(self._hand) != self._num_cards:
+            self._recalculate_hand_state()
+
     def set_cards(self, cards: list[Card]) -> bool:
+        '''
+            Replace the cards at hand. The hand keeps its own list of the canonical Card objects of the cards,
+            so later changes to cards or to the Card objects in it do not reach the hand.
+        '''
         for card in cards:
             if not isinstance(card, Card):
                 raise TypeError('input needs to be a list of Card objects')
-        self._cards = cards
+        self._cards = [CANONICAL_CARDS[card._code] for card in cards]
         return True
     
     def add_card(self, card: Card) -> bool:
+        '''
+            Add the canonical Card object of card to the cards at hand.
+        '''
         if not isinstance(card, Card):
             raise TypeError('input card must be Card object')
-        self._cards.append(card)
+        self._receive_card(CANONICAL_CARDS[card._code])
         return True
 
     def get_cards(self) -> list[Card]:
         '''
-            Getter for self._cards.
+            Return a new list of the cards at hand. The hand only changes through add_card, set_cards and the cards
+            a deck issues, which keeps the running hand state in step with the cards.
         '''
-        return self._cards
+        return list(self._hand)
     
     def set_player_id(self, player_id: str) -> bool:
         if not isinstance(player_id, str):
@@ -64,6 +178,10 @@ class Player:
     
     def get_prob_to_draw(self) -> float:
         return self._prob_to_draw
+    
+    def set_rng(self, rng: random.Random) -> bool:
+        self._rng = rng
+        return True
         
     def calculate_score(self):
         '''
@@ -71,43 +189,69 @@ class Player:
             Return the total score if the score is <= 21.
             Return -1 if total score if > 21.
         '''
-        if len(self._cards) == 0:
-            return 0
-        score = 0
-        num_aces = 0
-        for card in self._cards:
-            if card.is_ace():
-                num_aces += 1
-            else:
-                score += card.score()
-        score += num_aces
-        if score > 21:
-            self._score = -1
-            return -1
-        else:
-            score += min((21 - score) // 10, num_aces) * 10 
-            self._score = score
-            return score
+        if len(self._hand) != self._num_cards:
+            self._recalculate_hand_state()
+        return self._score
+
+    def get_hard_total(self) -> int:
+        '''
+            Return the total of the cards at hand with every Ace counted as 1.
+        '''
+        self._sync_hand_state()
+        return self._hard_total
+
+    def get_num_aces(self) -> int:
+        self._sync_hand_state()
+        return self._num_aces
+
+    def is_soft(self) -> bool:
+        '''
+            Return True if an Ace at hand is counted as 11.
+        '''
+        self._sync_hand_state()
+        return self._num_aces > 0 and self._hard_total <= 11
+
+    def get_hand_state(self) -> HandState:
+        self._sync_hand_state()
+        return HandState(self._hard_total, self._num_aces, self._num_aces > 0 and self._hard_total <= 11, self._score)
     
     def is_blackjack(self) -> bool:
         ''' 
             Check if the initial two cards adds up to 21.
             Return True if the score of cards at hand when the game beginns equals 21.
         '''
-        return len(self._cards) == 2 and self.calculate_score() == 21
+        return len(self._hand) == 2 and self.calculate_score() == 21
     
-    def draw(self) -> bool:
+    def set_policy(self, policy: Policy) -> bool:
+        if not isinstance(policy, Policy):
+            raise TypeError('policy must be a Policy object')
+        self._policy = policy
+        return True
+
+    def get_policy(self) -> Policy:
+        return self._policy
+
+    def has_default_policy(self) -> bool:
         '''
-            Randomly deciding whether to drawaccording to the probability of drawing of the player.
+            Return True if the player decides like the default policy of its class, i.e. only by prob_to_draw,
+            and for a dealer by the rule to draw below 17. Engines that only model prob_to_draw refuse the other players.
+        '''
+        return type(self._policy) is type(type(self)._policy)
+
+    def draw(self, dealer_upcard: Card = None) -> bool:
+        '''
+            Decide whether to draw with the policy of the player, by default
+            randomly according to the probability of drawing of the player.
+            dealer_upcard: first card of the dealer, used by policies such as basic strategy.
             Returns a boolean indicating the drawing decision.
         '''
-        return random.uniform(0, 1) < self._prob_to_draw
+        return self._policy.should_draw(self, dealer_upcard)
     
     def action(self) -> str:
         '''
             Return a string indicating drawing action.
         ''' 
-        if random.uniform(0, 1) < self._prob_to_draw:
+        if self._rng.random() < self._prob_to_draw:
             return 'Decide to draw.'
         else:
             return 'Decide not to draw.'
@@ -118,7 +262,9 @@ class Player:
             Return True if the score of cards is <=21. 
             Return False otherwise.
         '''
-        return self.calculate_score() != -1
+        if len(self._hand) != self._num_cards:
+            self._recalculate_hand_state()
+        return self._score != -1
     
     def __str__(self) -> str:
         '''
@@ -132,22 +278,15 @@ class Player:
         # For f-string, you can just split the string into multiple f-strings enclosed in parentheses. Python will automatically concatenate them
     
 class Dealer(Player):
-    def draw(self) -> bool:
-        '''
-            If score < 17, draw a card. 
-            Otherwise, randomly deciding whether to drawaccording to the probability of drawing of the player.
-            Returns a boolean indicating the drawing decision.
-        '''
-        if self.calculate_score() < 17:
-            return True
-        else:
-            return random.uniform(0, 1) < self._prob_to_draw
-        
+    # If score < 17, draw a card.
+    # Otherwise, randomly deciding whether to draw according to the probability of drawing of the dealer.
+    _policy = DEALER_POLICY
+
     def action(self) -> str:
         '''
             Return a string indicating drawing action.
         ''' 
-        if self.calculate_score() >= 17 and random.uniform(0, 1) < self._prob_to_draw:
+        if self.calculate_score() >= 17 and self._rng.random() < self._prob_to_draw:
             return 'Decide to draw.'
         else:
             return 'Decide not to draw.'
\ No newline at end of file
@@ -0,0 +1,121 @@
+from src.card import Card
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.player import Player
+
+# Lookup tables of a LookupTablePolicy are flat bytes, one decision (1 draw, 0 stand) per
+# (hard total, has an Ace, rank of the dealer's upcard):
+#     index = (hard_total * 2 + has_ace) * 13 + upcard_rank
+# hard_total is the total with every Ace counted as 1 (Player.get_hard_total), has_ace is 1 if there is an Ace at hand,
+# and upcard_rank is the rank of the dealer's first card, i.e. Card.get_code() >> 2: 0-8 for 2-10, 9-11 for J, Q, K, 12 for A.
+# With the hard total and whether there is an Ace the score and softness of the hand are known, so the table covers
+# every hard and soft total. Busted hands never ask for a decision.
+_NUM_UPCARD_RANKS = 13
+_TABLE_SIZE = 22 * 2 * _NUM_UPCARD_RANKS
+_UPCARD_VALUES = (2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10, 11)
+
+
+class Policy(ABC):
+    '''
+        Decides whether a player or dealer draws another card. Set on a player with Player.set_policy.
+        Policies hold no per-player state, so one policy can be shared by any number of players.
+    '''
+    @abstractmethod
+    def should_draw(self, player: 'Player', dealer_upcard: Card = None) -> bool:
+        '''
+            player: the player or dealer deciding, whose hand is not busted.
+            dealer_upcard: first card of the dealer, None for the dealer's own decisions or if unknown.
+            Return True to draw a card.
+        '''
+
+
+class ProbabilisticPolicy(Policy):
+    '''
+        Draw with the probability of drawing of the player, using the random number generator of the player.
+        The default policy of Player.
+    '''
+    def should_draw(self, player: 'Player', dealer_upcard: Card = None) -> bool:
+        return player._rng.random() < player._prob_to_draw
+
+
+class DealerPolicy(ProbabilisticPolicy):
+    '''
+        Always draw below 17, otherwise draw with the probability of drawing. The default policy of Dealer.
+    '''
+    def should_draw(self, player: 'Player', dealer_upcard: Card = None) -> bool:
+        if player.calculate_score() < 17:
+            return True
+        return player._rng.random() < player._prob_to_draw
+
+
+class LookupTablePolicy(Policy):
+    def __init__(self, table: bytes, default: bool = False):
+        '''
+            table: decisions indexed as described at the top of src/policy.py, see build_table.
+            default: decision when the dealer's upcard is not known, e.g. for the dealer itself.
+            Every decision is one indexed load from the table.
+        '''
+        if len(table) != _TABLE_SIZE:
+            raise ValueError(f'table must have {_TABLE_SIZE} entries')
+        self._table = bytes(table)
+        self._default = default
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, LookupTablePolicy) and self._table == other._table and self._default == other._default
+
+    def get_table(self) -> bytes:
+        return self._table
+
+    def should_draw(self, player: 'Player', dealer_upcard: Card = None) -> bool:
+        if dealer_upcard is None:
+            return self._default
+        if len(player._hand) != player._num_cards:
+            player._recalculate_hand_state()
+        return self._table[(player._hard_total * 2 + (player._num_aces > 0)) * _NUM_UPCARD_RANKS + (dealer_upcard._code >> 2)] == 1
+
+
+def build_table(should_draw) -> bytes:
+    '''
+        should_draw: function of (score, is_soft, upcard_value) returning True to draw, where score is the score of the hand
+        as in Player.calculate_score, is_soft is True if an Ace is counted as 11 and upcard_value is 2-10, or 11 for an Ace.
+        Return the flat table of a LookupTablePolicy.
+    '''
+    table = bytearray(_TABLE_SIZE)
+    for hard_total in range(22):
+        for has_ace in (0, 1):
+            is_soft = bool(has_ace) and hard_total <= 11
+            score = hard_total + 10 if is_soft else hard_total
+            for upcard_rank in range(_NUM_UPCARD_RANKS):
+                table[(hard_total * 2 + has_ace) * _NUM_UPCARD_RANKS + upcard_rank] = bool(
+                    should_draw(score, is_soft, _UPCARD_VALUES[upcard_rank]))
+    return bytes(table)
+
+
+def _basic_strategy(score: int, is_soft: bool, upcard_value: int) -> bool:
+    '''
+        Hit or stand part of the usual basic strategy: no doubling, splitting or surrender.
+    '''
+    if is_soft:
+        return score <= 17 or (score == 18 and upcard_value >= 9)
+    if score <= 11:
+        return True
+    if score == 12:
+        return not 4 <= upcard_value <= 6
+    if score <= 16:
+        return upcard_value >= 7
+    return False
+
+
+PROBABILISTIC_POLICY = ProbabilisticPolicy()
+DEALER_POLICY = DealerPolicy()
+BASIC_STRATEGY_TABLE = build_table(_basic_strategy)
+
+
+class BasicStrategyPolicy(LookupTablePolicy):
+    def __init__(self):
+        '''
+            Hit or stand by the usual basic strategy against the dealer's upcard. Stands when the upcard is not known.
+        '''
+        super().__init__(BASIC_STRATEGY_TABLE)
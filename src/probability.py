@@ -0,0 +1,379 @@
+from src.card import Card, _HARD_VALUE_BY_CODE
+from src.player import HandState, _score_of
+from src.deck import Deck
+from src.game import Game
+from collections import OrderedDict
+import heapq
+
+# Cards are grouped by their hard value 1 (Ace) - 10 (10, J, Q, K), the only property that matters for scores.
+# A deck composition is a list of 10 counts, packed into one int key with 8 bits per count (up to 255 cards per value).
+_NUM_VALUES = 10
+_BITS_PER_COUNT = 8
+# The count of 10s is the top field of a key, so it can hold any number of cards, see _lump.
+_TOP_SHIFT = _BITS_PER_COUNT * (_NUM_VALUES - 1)
+_LOW_FIELDS = (1 << _TOP_SHIFT) - 1
+# Final scores are -1 (busted) or at most 21, stored at index score + 1.
+_NUM_SCORES = 23
+# Highest final score. A hand with hard total 21 - threshold or more busts on every card of a value above threshold.
+_MAX_SCORE = 21
+_BUSTED = {-1: 1.0}
+
+
+def composition_of(cards: list[Card]) -> list[int]:
+    '''
+        Return the number of cards of each hard value 1 (Ace) - 10 as a list of 10 counts.
+    '''
+    counts = [0] * _NUM_VALUES
+    for card in cards:
+        counts[_HARD_VALUE_BY_CODE[card.get_code()] - 1] += 1
+    return counts
+
+
+def composition_key(counts: list[int]) -> int:
+    '''
+        Pack a composition into a compact hashable int.
+    '''
+    key = 0
+    for value_idx, count in enumerate(counts):
+        key |= count << (_BITS_PER_COUNT * value_idx)
+    return key
+
+
+def _counts_of_key(key: int) -> list[int]:
+    # With 8 bits per count, the counts below the top field are the bytes of the key.
+    counts = list((key & _LOW_FIELDS).to_bytes(_NUM_VALUES - 1, 'little'))
+    counts.append(key >> _TOP_SHIFT)
+    return counts
+
+
+def _lump(key: int, threshold: int) -> int:
+    '''
+        Count every card of a value above threshold as a 10. Hands that bust on all of them can not tell them apart,
+        so compositions that only differ in those values share one key, and their memoized sub-results.
+        Return the key unchanged for a threshold of 9 or more.
+    '''
+    if threshold >= _NUM_VALUES - 1:
+        return key
+    shift = _BITS_PER_COUNT * max(threshold, 0)
+    num_lumped = (key >> _TOP_SHIFT) + sum(((key & _LOW_FIELDS) >> shift).to_bytes(_NUM_VALUES - 1, 'little'))
+    return (key & ((1 << shift) - 1)) | (num_lumped << _TOP_SHIFT)
+
+
+class FinalScoreCalculator:
+    def __init__(self, prob_to_draw: float, must_draw_below: int = 0, max_cache_size: int = 100000):
+        '''
+            Exact distribution of the final score of a participant who draws from the remaining cards:
+            it always draws below must_draw_below, draws with probability prob_to_draw otherwise,
+            and stops when busted or when no cards remain.
+            With must_draw_below 0 this is Player.draw, with must_draw_below 17 it is Dealer.draw.
+            Sub-results are memoized on (hard total, has Ace, composition key) in an LRU cache of at most max_cache_size entries,
+            with the card values that bust the hand lumped together, see _lump.
+        '''
+        if not isinstance(prob_to_draw, float) and not isinstance(prob_to_draw, int):
+            raise TypeError('probability of drawing should be type float')
+        if prob_to_draw < 0 or prob_to_draw > 1:
+            raise ValueError('probability of drawing card must be between 0 and 1')
+        if max_cache_size < 1:
+            raise ValueError('max_cache_size must be at least 1')
+        self._prob_to_draw = float(prob_to_draw)
+        self._must_draw_below = must_draw_below
+        self._max_cache_size = max_cache_size
+        self._cache = OrderedDict()
+
+    def get_prob_to_draw(self) -> float:
+        return self._prob_to_draw
+
+    def get_must_draw_below(self) -> int:
+        return self._must_draw_below
+
+    def get_cache_size(self) -> int:
+        return len(self._cache)
+
+    def clear_cache(self) -> bool:
+        self._cache.clear()
+        return True
+
+    def get_final_score_distribution(self, cards: list[Card], remaining_cards: list[Card]) -> dict[int, float]:
+        '''
+            cards: the cards at hand, e.g. only the dealer's upcard if the hole card is still unknown.
+            remaining_cards: the cards that can still be drawn, in any order.
+            Return a dict mapping each possible final score to its probability. Busted is the score -1.
+        '''
+        hard_total = sum(_HARD_VALUE_BY_CODE[card.get_code()] for card in cards)
+        has_ace = any(card.is_ace() for card in cards)
+        return dict(self._distribution(hard_total, has_ace, composition_key(composition_of(remaining_cards)), len(remaining_cards)))
+
+    def _distribution(self, hard_total: int, has_ace: bool, key: int, num_remaining: int) -> dict[int, float]:
+        '''
+            key: composition of the num_remaining cards left.
+        '''
+        score = _score_of(hard_total, has_ace)
+        if score == -1:
+            return _BUSTED
+        key = _lump(key, _MAX_SCORE - hard_total)
+        memo_key = (hard_total, has_ace, key)
+        cache = self._cache
+        distribution = cache.get(memo_key)
+        if distribution is not None:
+            cache.move_to_end(memo_key)
+            return distribution
+        if num_remaining == 0:
+            distribution = {score: 1.0}
+        else:
+            prob_to_draw = 1.0 if score < self._must_draw_below else self._prob_to_draw
+            distribution = {}
+            if prob_to_draw < 1:
+                distribution[score] = 1 - prob_to_draw
+            if prob_to_draw > 0:
+                for value_idx, count in enumerate(_counts_of_key(key)):
+                    if count == 0:
+                        continue
+                    weight = prob_to_draw * count / num_remaining
+                    if hard_total + value_idx + 1 > _MAX_SCORE:
+                        distribution[-1] = distribution.get(-1, 0.0) + weight
+                        continue
+                    sub_distribution = self._distribution(hard_total + value_idx + 1, has_ace or value_idx == 0,
+                                                          key - (1 << (_BITS_PER_COUNT * value_idx)), num_remaining - 1)
+                    for final_score, prob in sub_distribution.items():
+                        distribution[final_score] = distribution.get(final_score, 0.0) + weight * prob
+        cache[memo_key] = distribution
+        if len(cache) > self._max_cache_size:
+            cache.popitem(last = False)
+        return distribution
+
+    def _play_forward(self, hard_total: int, has_ace: bool, states: dict[tuple[int, object], float],
+                      threshold: int) -> dict[tuple[int, int, object], float]:
+        '''
+            Play the turn from the same hand for every state at once, pushing the probabilities forward one hard total
+            at a time, so the hands reached from different compositions merge instead of being memoized one by one.
+            states: maps (composition key, tag) to its probability. The tag is carried along untouched.
+            threshold: the highest card value the next participants can tell apart, see _lump.
+            Return a dict mapping (final score, composition key of the remaining cards lumped by threshold, tag) to its probability.
+        '''
+        outcomes = {}
+        # Hands by hard total, as (has Ace, composition key, tag). Every card drawn raises the hard total.
+        hands = [{} for hard in range(_MAX_SCORE + 1)]
+        if hard_total > _MAX_SCORE:
+            for (key, tag), prob in states.items():
+                outcome = (-1, _lump(key, threshold), tag)
+                outcomes[outcome] = outcomes.get(outcome, 0.0) + prob
+            return outcomes
+        for (key, tag), prob in states.items():
+            hand = (has_ace, _lump(key, max(_MAX_SCORE - hard_total, threshold)), tag)
+            hands[hard_total][hand] = hands[hard_total].get(hand, 0.0) + prob
+        for hard in range(hard_total, _MAX_SCORE + 1):
+            for (ace, key, tag), prob in hands[hard].items():
+                score = _score_of(hard, ace)
+                counts = _counts_of_key(key)
+                num_remaining = sum(counts)
+                prob_to_draw = 1.0 if score < self._must_draw_below else self._prob_to_draw
+                if num_remaining == 0:
+                    prob_to_draw = 0.0
+                if prob_to_draw < 1:
+                    outcome = (score, _lump(key, threshold), tag)
+                    outcomes[outcome] = outcomes.get(outcome, 0.0) + prob * (1 - prob_to_draw)
+                if prob_to_draw == 0:
+                    continue
+                weight = prob * prob_to_draw / num_remaining
+                for value_idx, count in enumerate(counts):
+                    if count == 0:
+                        continue
+                    next_hard = hard + value_idx + 1
+                    next_key = key - (1 << (_BITS_PER_COUNT * value_idx))
+                    if next_hard > _MAX_SCORE:
+                        outcome = (-1, _lump(next_key, threshold), tag)
+                        outcomes[outcome] = outcomes.get(outcome, 0.0) + weight * count
+                    else:
+                        hand = (ace or value_idx == 0, _lump(next_key, max(_MAX_SCORE - next_hard, threshold)), tag)
+                        next_hands = hands[next_hard]
+                        next_hands[hand] = next_hands.get(hand, 0.0) + weight * count
+        return outcomes
+
+
+class DealerOutcomeCalculator(FinalScoreCalculator):
+    def __init__(self, prob_to_draw: float, max_cache_size: int = 100000):
+        '''
+            Exact distribution of the dealer's final score, using the same rule as Dealer.draw and Game.run_dealer_turn:
+            the dealer draws below 17, draws with probability prob_to_draw at 17 or above,
+            and stops when busted or when no cards remain.
+        '''
+        super().__init__(prob_to_draw, must_draw_below = 17, max_cache_size = max_cache_size)
+
+
+def _win_probabilities(distributions: list[dict[int, float]]) -> list[float]:
+    '''
+        distributions: the final score distribution of every participant, taken as independent.
+        Return the probability of each participant having the highest score without busting, ties included.
+    '''
+    # Probability of each participant ending at or below each score, busted included, at index score + 1.
+    cumulatives = []
+    for distribution in distributions:
+        cumulative = [0.0] * _NUM_SCORES
+        for final_score, prob in distribution.items():
+            cumulative[final_score + 1] += prob
+        for idx in range(1, _NUM_SCORES):
+            cumulative[idx] += cumulative[idx - 1]
+        cumulatives.append(cumulative)
+    win_probs = []
+    for seat, distribution in enumerate(distributions):
+        win_prob = 0.0
+        for final_score, prob in distribution.items():
+            if final_score == -1:
+                continue
+            for other, cumulative in enumerate(cumulatives):
+                if other != seat:
+                    prob *= cumulative[final_score + 1]
+            win_prob += prob
+        win_probs.append(win_prob)
+    return win_probs
+
+
+class WinProbabilityCalculator:
+    def __init__(self, max_cache_size: int = 100000, max_num_states: int = 50):
+        '''
+            Probability of each participant of a live Game ending up in Game.get_winners(),
+            assuming the rest of the round is played the way Game.play_round does: the dealer's turn first, then every
+            player's turn in order, all drawing from the unissued cards of the deck, whose order is uniformly random.
+            The win probabilities are exact when the deck can run out in the middle of the turns and playing them out
+            takes at most max_num_states states, see get_win_probabilities. Otherwise the final score distribution of
+            every participant still to draw is worked out on its own, and the distributions are combined as if they
+            were independent, leaving out that the cards one participant draws are not there for the next ones.
+            That moves the win probabilities by around 0.001 on a single deck from the deal.
+            One FinalScoreCalculator is kept per drawing rule, so participants with the same prob_to_draw
+            share their memoized sub-results, also across calls.
+            max_cache_size: max number of entries of each LRU cache.
+            max_num_states: max number of compositions of the cards left carried from one participant to the next
+            when the deck can run out. Past it, only the likeliest ones are kept, scaled up to the probability of all of them.
+        '''
+        if max_cache_size < 1:
+            raise ValueError('max_cache_size must be at least 1')
+        if max_num_states < 1:
+            raise ValueError('max_num_states must be at least 1')
+        self._max_cache_size = max_cache_size
+        self._max_num_states = max_num_states
+        self._calculators = {}
+
+    def get_cache_size(self) -> int:
+        return sum(calculator.get_cache_size() for calculator in self._calculators.values())
+
+    def clear_cache(self) -> bool:
+        self._calculators.clear()
+        return True
+
+    def _get_calculator(self, prob_to_draw: float, must_draw_below: int) -> FinalScoreCalculator:
+        calculator = self._calculators.get((prob_to_draw, must_draw_below))
+        if calculator is None:
+            calculator = FinalScoreCalculator(prob_to_draw, must_draw_below, self._max_cache_size)
+            self._calculators[(prob_to_draw, must_draw_below)] = calculator
+        return calculator
+
+    def get_win_probabilities(self, game: Game, dealer_turn_done: bool = None) -> dict[str, float]:
+        '''
+            game: a game whose initial two cards have been assigned. Players before the current turn number are done.
+            dealer_turn_done: whether the dealer's turn has been run. Defaults to True once a player had their turn.
+            Return a dict mapping the id of the dealer and of each player to their probability of winning.
+            Ties are shared wins, so the probabilities can sum to more than 1, or to less than 1 if everyone can bust.
+            Blackjacks are not checked: the caller ends the round the way Game.play_round does if there are any.
+            A table of five players from the deal takes milliseconds, and less with the memoized sub-results of
+            earlier calls. A deck that can run out in the middle of the turns of many players holding low hands
+            takes up to a few tenths of a second.
+        '''
+        if dealer_turn_done is None:
+            dealer_turn_done = game.get_turn_number() > 0
+        participants = [game._dealer] + game.get_players()
+        # None for the participants who are done, whose scores are fixed.
+        calculators = [None if dealer_turn_done else self._get_calculator(game._dealer.get_prob_to_draw(), 17)]
+        for seat, player in enumerate(game.get_players()):
+            calculators.append(None if seat < game.get_turn_number() else self._get_calculator(player.get_prob_to_draw(), 0))
+        for participant, calculator in zip(participants, calculators):
+            if calculator is not None and not participant.has_default_policy():
+                raise TypeError(f'WinProbabilityCalculator only models drawing with prob_to_draw, not with the '
+                                f'{type(participant.get_policy()).__name__} of {participant.get_player_id()}.')
+        hands = [participant.get_hand_state() for participant in participants]
+        deck = game._deck
+        if isinstance(deck, Deck):
+            counts = deck.get_value_counts()
+        else:
+            counts = composition_of(deck.get_unissued_cards())
+        key = composition_key(counts)
+        drawing = [seat for seat in range(len(participants)) if calculators[seat] is not None]
+        total_value = sum((value_idx + 1) * count for value_idx, count in enumerate(counts))
+        if total_value > sum(_MAX_SCORE + 10 - hands[seat].hard_total for seat in drawing):
+            # The order of the cards is uniformly random, so the final scores of the participants still to draw have
+            # the same joint distribution whatever order they draw in, as long as nobody can find the deck empty, which
+            # a participant at hard total h can not if the cards left are worth more than 31 - h per participant.
+            # Then each of them has the distribution it would have drawing first, from the cards left now.
+            distributions = [{hand.score: 1.0} if calculator is None else
+                             calculator._distribution(hand.hard_total, hand.num_aces > 0, key, sum(counts))
+                             for calculator, hand in zip(calculators, hands)]
+            return {participant.get_player_id(): prob for participant, prob in zip(participants, _win_probabilities(distributions))}
+        # Otherwise the participants draw in turn order, and the compositions each of them can leave behind to the next
+        # are pushed forward. thresholds[i] is the highest card value drawing[i] and the ones after can tell apart,
+        # see _lump.
+        thresholds = [0] * (len(drawing) + 1)
+        for i in range(len(drawing) - 1, -1, -1):
+            thresholds[i] = max(thresholds[i + 1], _MAX_SCORE - hands[drawing[i]].hard_total)
+        win_probs = self._play_joint(calculators, hands, drawing, thresholds, key)
+        if win_probs is None:
+            distributions = self._play_marginals(calculators, hands, drawing, thresholds, key)
+            win_probs = _win_probabilities(distributions)
+        return {participant.get_player_id(): prob for participant, prob in zip(participants, win_probs)}
+
+    def _play_joint(self, calculators: list[FinalScoreCalculator], hands: list[HandState], drawing: list[int],
+                    thresholds: list[int], key: int) -> list[float]:
+        '''
+            Push the compositions forward along with the highest score so far and the bit mask of the seats with it,
+            which gives the exact win probabilities. Busted participants are never among the highest.
+            Return None as soon as there are more than max_num_states of them.
+        '''
+        max_score = -1
+        mask = 0
+        for seat, hand in enumerate(hands):
+            if calculators[seat] is None and hand.score != -1:
+                if hand.score > max_score:
+                    max_score, mask = hand.score, 0
+                if hand.score == max_score:
+                    mask |= 1 << seat
+        states = {(_lump(key, thresholds[0]), (max_score, mask)): 1.0}
+        for i, seat in enumerate(drawing):
+            outcomes = calculators[seat]._play_forward(hands[seat].hard_total, hands[seat].num_aces > 0, states,
+                                                       thresholds[i + 1])
+            states = {}
+            for (final_score, next_key, (max_score, mask)), prob in outcomes.items():
+                if final_score > max_score:
+                    max_score, mask = final_score, 0
+                if final_score == max_score and final_score != -1:
+                    mask |= 1 << seat
+                state = (next_key, (max_score, mask))
+                states[state] = states.get(state, 0.0) + prob
+            if i + 1 < len(drawing) and len(states) > self._max_num_states:
+                return None
+        win_probs = [0.0] * len(hands)
+        for (next_key, (max_score, mask)), prob in states.items():
+            for seat in range(len(hands)):
+                if mask >> seat & 1:
+                    win_probs[seat] += prob
+        return win_probs
+
+    def _play_marginals(self, calculators: list[FinalScoreCalculator], hands: list[HandState], drawing: list[int],
+                        thresholds: list[int], key: int) -> list[dict[int, float]]:
+        '''
+            Push the compositions forward on their own, keeping the likeliest max_num_states of them scaled up to
+            the probability of all of them, and return the final score distribution of every participant.
+        '''
+        distributions = [{hand.score: 1.0} if calculator is None else None for calculator, hand in zip(calculators, hands)]
+        states = {(_lump(key, thresholds[0]), None): 1.0}
+        for i, seat in enumerate(drawing):
+            if len(states) > self._max_num_states:
+                states = dict(heapq.nlargest(self._max_num_states, states.items(), key = lambda state: state[1]))
+                scale = 1 / sum(states.values())
+                states = {state: prob * scale for state, prob in states.items()}
+            outcomes = calculators[seat]._play_forward(hands[seat].hard_total, hands[seat].num_aces > 0, states,
+                                                       thresholds[i + 1])
+            distribution = {}
+            states = {}
+            for (final_score, next_key, tag), prob in outcomes.items():
+                distribution[final_score] = distribution.get(final_score, 0.0) + prob
+                states[(next_key, tag)] = states.get((next_key, tag), 0.0) + prob
+            distributions[seat] = distribution
+        return distributions
@@ -0,0 +1,198 @@
+from src.player import Player
+from src.deck import Deck
+from src.game import Game
+from typing import Iterator, NamedTuple
+import random
+import struct
+import zlib
+
+# Encoded RoundLog, little-endian: shuffle seed, number of decisions, outcome checksum, then the decision bits,
+# bit i of the bits being the i-th draw() result of the round, in the order Game.play_round asked for them.
+_LOG_HEADER = struct.Struct('<IBH')
+_MAX_NUM_DECISIONS = 255
+
+
+class RoundLog(NamedTuple):
+    '''
+        Everything needed to replay one round of Game.play_round:
+            seed: seed of the random.Random the Deck of the round was shuffled with.
+            num_decisions: number of draw decisions taken in the round, forced draws of the dealer included.
+            decisions: the decisions packed as bits, see pack_decisions.
+            checksum: 16-bit checksum of the final scores, blackjacks and winners, see outcome_checksum.
+    '''
+    seed: int
+    num_decisions: int
+    decisions: bytes
+    checksum: int
+
+    def to_bytes(self) -> bytes:
+        '''
+            Return the log in 7 bytes plus one byte per 8 decisions.
+        '''
+        return _LOG_HEADER.pack(self.seed, self.num_decisions, self.checksum) + self.decisions
+
+    @staticmethod
+    def from_bytes(data: bytes, offset: int = 0) -> 'RoundLog':
+        '''
+            Decode a log encoded by to_bytes, starting at offset.
+            Raise ValueError if the data is truncated.
+        '''
+        try:
+            seed, num_decisions, checksum = _LOG_HEADER.unpack_from(data, offset)
+        except struct.error:
+            raise ValueError('Round log is truncated.')
+        start = offset + _LOG_HEADER.size
+        decisions = bytes(data[start:start + (num_decisions + 7) // 8])
+        if len(decisions) != (num_decisions + 7) // 8:
+            raise ValueError('Round log is truncated.')
+        return RoundLog(seed, num_decisions, decisions, checksum)
+
+    def get_size(self) -> int:
+        return _LOG_HEADER.size + len(self.decisions)
+
+
+def pack_decisions(decisions: list[bool]) -> bytes:
+    '''
+        Pack decisions as bits, the first decision in the lowest bit of the first byte.
+    '''
+    value = 0
+    for i, decision in enumerate(decisions):
+        if decision:
+            value |= 1 << i
+    return value.to_bytes((len(decisions) + 7) // 8, 'little')
+
+
+def unpack_decisions(data: bytes, num_decisions: int) -> list[bool]:
+    value = int.from_bytes(data, 'little')
+    return [bool(value >> i & 1) for i in range(num_decisions)]
+
+
+def outcome_checksum(game: Game, blackjack_players: list[Player], winners: list[Player]) -> int:
+    '''
+        16-bit checksum of the final score of every seat and of the seats with blackjack and the winning seats.
+    '''
+    participants = [game._dealer] + game._players
+    outcome = [participant.calculate_score() + 1 for participant in participants]
+    outcome += [any(participant is player for player in blackjack_players) for participant in participants]
+    outcome += [any(participant is player for player in winners) for participant in participants]
+    return zlib.crc32(bytes(outcome)) & 0xFFFF
+
+
+def _new_game(dealer_info: tuple[str, float], players_info: list[tuple[str, float]], seed: int,
+              rng: random.Random = None) -> Game:
+    '''
+        A game on a new Deck lazily shuffled by random.Random(seed), deciding draws with rng.
+    '''
+    deck = Deck(random.Random(seed))
+    deck.shuffle_cards(lazy = True)
+    return Game(dealer_info, players_info, deck = deck, rng = rng)
+
+
+def _record_decisions(participant: Player, decisions: list[bool]):
+    '''
+        Append every draw() result of the participant to decisions. Set on the instance only, like instrument_player.
+    '''
+    draw = participant.draw
+
+    def recording_draw(dealer_upcard = None):
+        decision = draw(dealer_upcard)
+        decisions.append(decision)
+        return decision
+    participant.draw = recording_draw
+
+
+def _replay_decisions(participant: Player, decisions: Iterator[bool]):
+    '''
+        Answer every draw() of the participant with the next logged decision instead of its random number generator.
+    '''
+    def replaying_draw(dealer_upcard = None):
+        decision = next(decisions, None)
+        if decision is None:
+            raise ValueError('Decision log ended before the round did.')
+        return decision
+    participant.draw = replaying_draw
+
+
+def play_recorded_round(dealer_info: tuple[str, float], players_info: list[tuple[str, float]], seed: int,
+                        rng: random.Random = None) -> tuple[Game, RoundLog]:
+    '''
+        Play one round through Game.play_round on a Deck shuffled from seed, with drawing decisions from rng,
+        and record them. The global random module is used for the decisions if rng is not given.
+        Raise ValueError if a round of the table could take more decisions than a RoundLog can hold.
+        Return the game after the round and its RoundLog.
+    '''
+    if not 0 <= seed < 1 << 32:
+        raise ValueError('seed must be between 0 and 2**32 - 1')
+    game = _new_game(dealer_info, players_info, seed, rng)
+    # Every decision of a turn but the last draws a card, so a round takes at most one decision per card and seat.
+    # Checked before the round is played, so the decisions rng is left untouched.
+    max_num_decisions = game._deck.get_num_remaining_cards() + len(game._players) + 1
+    if max_num_decisions > _MAX_NUM_DECISIONS:
+        raise ValueError(f'A round of this table can take up to {max_num_decisions} decisions, '
+                         f'at most {_MAX_NUM_DECISIONS} can be logged.')
+    decisions = []
+    for participant in [game._dealer] + game._players:
+        _record_decisions(participant, decisions)
+    blackjack_players, winners = game.play_round()
+    return game, RoundLog(seed, len(decisions), pack_decisions(decisions), outcome_checksum(game, blackjack_players, winners))
+
+
+def replay_round(dealer_info: tuple[str, float], players_info: list[tuple[str, float]], log: RoundLog) -> Game:
+    '''
+        Re-execute a logged round through Game.play_round with the same players, the same shuffle and the logged decisions.
+        Return the game after the round.
+        Raise ValueError if the round does not consume exactly the logged decisions or ends with a different outcome.
+    '''
+    game = _new_game(dealer_info, players_info, log.seed)
+    decisions = iter(unpack_decisions(log.decisions, log.num_decisions))
+    for participant in [game._dealer] + game._players:
+        _replay_decisions(participant, decisions)
+    blackjack_players, winners = game.play_round()
+    if next(decisions, None) is not None:
+        raise ValueError('Round ended before the decision log did.')
+    if outcome_checksum(game, blackjack_players, winners) != log.checksum:
+        raise ValueError('Replayed round ended with a different outcome than the logged one.')
+    return game
+
+
+def verify_round(dealer_info: tuple[str, float], players_info: list[tuple[str, float]], log: RoundLog) -> bool:
+    '''
+        Return True if replaying the log reproduces the logged outcome, False otherwise.
+    '''
+    try:
+        replay_round(dealer_info, players_info, log)
+    except ValueError:
+        return False
+    return True
+
+
+def iter_recorded_rounds(dealer_info: tuple[str, float], players_info: list[tuple[str, float]], num_rounds: int,
+                         rng: random.Random = None) -> Iterator[RoundLog]:
+    '''
+        Play num_rounds rounds with play_recorded_round and yield their logs.
+        rng: random number generator for the shuffle seeds and the drawing decisions. The global random module is used if not given.
+    '''
+    if num_rounds < 0:
+        raise ValueError('num_rounds can not be negative.')
+    rng = rng if rng is not None else random
+    for round_number in range(num_rounds):
+        game, log = play_recorded_round(dealer_info, players_info, rng.getrandbits(32), rng)
+        yield log
+
+
+def pack_logs(logs: list[RoundLog]) -> bytes:
+    '''
+        Concatenate encoded logs, e.g. to keep the logs of every round of a run in one file.
+    '''
+    return b''.join(log.to_bytes() for log in logs)
+
+
+def iter_unpack_logs(data: bytes) -> Iterator[RoundLog]:
+    '''
+        Decode logs concatenated by pack_logs one at a time.
+    '''
+    offset = 0
+    while offset < len(data):
+        log = RoundLog.from_bytes(data, offset)
+        offset += log.get_size()
+        yield log
@@ -0,0 +1,219 @@
+from src.player import Player
+from src.game import Game
+import json
+import mmap
+import os
+
+# Column name: (format of one value for memoryview.cast, NumPy dtype of the same value), both in native byte order.
+# Seats are 0 for the dealer and i for the i-th player. Bit i of a bitmask is seat i.
+_COLUMNS = {
+    'table_id': ('I', '=u4'),
+    'dealer_score': ('b', '=i1'),
+    'player_scores': ('b', '=i1'),  # num_players values per round.
+    'blackjacks': ('Q', '=u8'),
+    'winners': ('Q', '=u8'),
+}
+_META_FILE = 'meta.json'
+_MAX_NUM_SEATS = 64
+
+
+class _Column:
+    def __init__(self, file_name: str, fmt: str, width: int, num_rows: int, capacity: int):
+        '''
+            A file of fixed-width values, width values per row, written through a memory map.
+            The file is kept at its capacity while open and cut back to the rows written on close.
+        '''
+        self._fmt = fmt
+        self._width = width
+        self._row_size = memoryview(bytes(8)).cast(fmt).itemsize * width
+        self._file = open(file_name, 'r+b' if os.path.exists(file_name) else 'w+b')
+        self._mmap = None
+        self._values = None
+        self._map(max(capacity, num_rows, 1))
+
+    def _map(self, capacity: int):
+        if self._values is not None:
+            self._values.release()
+            self._mmap.close()
+        self._capacity = capacity
+        self._file.truncate(capacity * self._row_size)
+        self._mmap = mmap.mmap(self._file.fileno(), capacity * self._row_size)
+        self._values = memoryview(self._mmap).cast(self._fmt)
+
+    def ensure_capacity(self, num_rows: int):
+        '''
+            Double the capacity until num_rows rows fit.
+        '''
+        if num_rows > self._capacity:
+            capacity = self._capacity
+            while capacity < num_rows:
+                capacity *= 2
+            self._map(capacity)
+
+    def set_value(self, idx: int, value: int):
+        '''
+            idx: row * width + position in the row.
+        '''
+        self._values[idx] = value
+
+    def flush(self):
+        self._mmap.flush()
+
+    def close(self, num_rows: int):
+        self._values.release()
+        self._mmap.close()
+        self._file.truncate(num_rows * self._row_size)
+        self._file.close()
+
+
+class ResultsStore:
+    def __init__(self, path: str, num_players: int, capacity: int = 1 << 16):
+        '''
+            Append-only store of round results, one fixed-width binary file per column in the directory path:
+                table_id: uint32 id of the table the round was played at.
+                dealer_score: int8 final score of the dealer, -1 if busted.
+                player_scores: int8 final scores of the players, num_players per round.
+                blackjacks: uint64 bitmask of the seats with blackjack.
+                winners: uint64 bitmask of the seats in Game.get_winners(). 0 if the round ended with blackjacks.
+            The columns are written through memory maps, so appending a round does not go through Python file writes.
+            An existing store in path is reopened and appended to.
+            capacity: initial number of rounds the files are sized for. It is doubled when needed.
+            Rounds are only guaranteed to be on disk after flush() or close(). Reopen them with open_columns.
+        '''
+        if not isinstance(num_players, int) or isinstance(num_players, bool):
+            raise TypeError('num_players must be int')
+        if num_players < 1 or num_players + 1 > _MAX_NUM_SEATS:
+            raise ValueError(f'num_players must be between 1 and {_MAX_NUM_SEATS - 1}')
+        if capacity < 1:
+            raise ValueError('capacity must be at least 1')
+        os.makedirs(path, exist_ok = True)
+        self._path = path
+        self._num_players = num_players
+        self._num_rounds = 0
+        if os.path.exists(os.path.join(path, _META_FILE)):
+            meta = load_meta(path)
+            if meta['num_players'] != num_players:
+                raise ValueError(f'Store in {path} has {meta["num_players"]} players.')
+            self._num_rounds = meta['num_rounds']
+        self._columns = {name: _Column(os.path.join(path, f'{name}.bin'), fmt, num_players if name == 'player_scores' else 1,
+                                       self._num_rounds, capacity)
+                         for name, (fmt, dtype) in _COLUMNS.items()}
+        self._closed = False
+        self._write_meta()
+
+    def __enter__(self) -> 'ResultsStore':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __str__(self) -> str:
+        return f'ResultsStore in {self._path} with {self._num_players} players and {self._num_rounds} rounds'
+
+    def get_path(self) -> str:
+        return self._path
+
+    def get_num_players(self) -> int:
+        return self._num_players
+
+    def get_num_rounds(self) -> int:
+        return self._num_rounds
+
+    def append(self, table_id: int, scores: list[int], blackjack_mask: int, winner_mask: int) -> bool:
+        '''
+            Append one round.
+            scores: final scores in seat order, the dealer first.
+            blackjack_mask, winner_mask: bitmasks of seats.
+            Return True if successful.
+        '''
+        if self._closed:
+            raise Exception('Store is closed.')
+        if len(scores) != self._num_players + 1:
+            raise ValueError(f'Expected {self._num_players + 1} scores, the dealer first.')
+        row = self._num_rounds
+        columns = self._columns
+        for column in columns.values():
+            column.ensure_capacity(row + 1)
+        columns['table_id'].set_value(row, table_id)
+        columns['dealer_score'].set_value(row, scores[0])
+        player_scores = columns['player_scores']
+        for seat in range(1, self._num_players + 1):
+            player_scores.set_value(row * self._num_players + seat - 1, scores[seat])
+        columns['blackjacks'].set_value(row, blackjack_mask)
+        columns['winners'].set_value(row, winner_mask)
+        self._num_rounds += 1
+        return True
+
+    def record_round(self, table_id: int, game: Game, blackjack_players: list[Player], winners: list[Player]) -> bool:
+        '''
+            Append the outcome of a round returned by Game.play_round, with the scores from Player.calculate_score.
+            Return True if successful.
+        '''
+        participants = [game._dealer] + game._players
+        blackjack_mask = 0
+        winner_mask = 0
+        for seat, participant in enumerate(participants):
+            if any(participant is blackjack_player for blackjack_player in blackjack_players):
+                blackjack_mask |= 1 << seat
+            if any(participant is winner for winner in winners):
+                winner_mask |= 1 << seat
+        return self.append(table_id, [participant.calculate_score() for participant in participants], blackjack_mask, winner_mask)
+
+    def _write_meta(self):
+        meta = {
+            'num_players': self._num_players,
+            'num_rounds': self._num_rounds,
+            'columns': {name: dtype for name, (fmt, dtype) in _COLUMNS.items()},
+        }
+        with open(os.path.join(self._path, _META_FILE), 'w') as f:
+            json.dump(meta, f)
+
+    def flush(self) -> bool:
+        '''
+            Write the appended rounds and the round count to disk.
+            Return True if successful.
+        '''
+        for column in self._columns.values():
+            column.flush()
+        self._write_meta()
+        return True
+
+    def close(self) -> bool:
+        '''
+            Flush and cut the files back to the rounds written. Closing twice does nothing.
+            Return True if successful.
+        '''
+        if self._closed:
+            return True
+        self.flush()
+        for column in self._columns.values():
+            column.close(self._num_rounds)
+        self._closed = True
+        return True
+
+
+def load_meta(path: str) -> dict:
+    '''
+        Return the metadata of the store in path: num_players, num_rounds and the NumPy dtype of every column.
+    '''
+    with open(os.path.join(path, _META_FILE)) as f:
+        return json.load(f)
+
+
+def open_columns(path: str) -> dict:
+    '''
+        Map the columns of the store in path read-only as NumPy arrays, without copying.
+        player_scores has shape (num_rounds, num_players), the other columns (num_rounds,).
+        Only the rounds flushed so far are included.
+    '''
+    import numpy as np  # Only needed for reading, so the store can be written without NumPy.
+    meta = load_meta(path)
+    num_rounds = meta['num_rounds']
+    columns = {}
+    for name, dtype in meta['columns'].items():
+        shape = (num_rounds, meta['num_players']) if name == 'player_scores' else (num_rounds,)
+        if num_rounds == 0:
+            columns[name] = np.zeros(shape, dtype = dtype)
+        else:
+            columns[name] = np.memmap(os.path.join(path, f'{name}.bin'), dtype = dtype, mode = 'r', shape = shape)
+    return columns
@@ -0,0 +1,423 @@
+'''
+    Asyncio host for many concurrent tables, with a line protocol on a local TCP port.
+    Every line is ASCII words separated by spaces and ends with a newline. Seats are 0 for the dealer and
+    1, 2, ... for the players of the round in join order. Cards are sent as their code, see Card.get_code.
+
+    Client to server:
+        JOIN <table_id> <player_id>  sit down at a table, created if needed. Seated from the next round on.
+        START                        start a round at the table if none is in progress.
+        DRAW / STAND                 decision after a TURN message.
+        LEAVE                        leave the table. Closing the connection does the same.
+    Server to client:
+        JOINED <table_id>
+        SEAT <seat>                  the seat of the client in the round that starts.
+        CARDS <seat> <code> <code>   initial hand of a seat, sent for every seat.
+        CARD <seat> <code>           a card drawn by a seat.
+        TURN                         the client has to send DRAW or STAND.
+        END <scores> <blackjack seats> <winner seats>
+                                     comma-separated lists in seat order, - if empty. Busted is score -1.
+        ERR <message>
+
+    Every table has its own Game, Deck and random number generator, and plays its rounds in its own task.
+    Backpressure: a client is not sent anything new until its previous messages were flushed to its socket,
+    and commands of a client are only read once the previous one has been handled.
+'''
+from src.card import CANONICAL_CARDS
+from src.player import Player
+from src.deck import Deck
+from src.game import Game
+import argparse
+import asyncio
+import random
+import time
+
+_MAX_LINE_LENGTH = 256
+# Kernel and transport buffering allowed per client before writes wait for the client to read.
+_WRITE_BUFFER_HIGH_WATER = 64 * 1024
+
+
+def _format_seats(seats: list[int]) -> str:
+    return ','.join(str(seat) for seat in seats) if seats else '-'
+
+
+class _Client:
+    def __init__(self, writer: asyncio.StreamWriter):
+        self._writer = writer
+        self._player_id = None
+        self._table = None
+        self._closed = False
+        writer.transport.set_write_buffer_limits(high = _WRITE_BUFFER_HIGH_WATER)
+
+    def get_player_id(self) -> str:
+        return self._player_id
+
+    def set_player_id(self, player_id: str) -> bool:
+        self._player_id = player_id
+        return True
+
+    def get_table(self) -> '_Table':
+        return self._table
+
+    def set_table(self, table: '_Table') -> bool:
+        self._table = table
+        return True
+
+    def is_closed(self) -> bool:
+        return self._closed
+
+    def set_closed(self) -> bool:
+        self._closed = True
+        return True
+
+    async def send(self, line: str):
+        '''
+            Write a line and wait until the transport buffer is below its high-water mark.
+            A client that went away is marked closed instead of failing the round.
+        '''
+        if self._closed:
+            return
+        try:
+            self._writer.write(line.encode('ascii') + b'\n')
+            await self._writer.drain()
+        except (ConnectionError, RuntimeError):
+            self._closed = True
+
+    async def close(self) -> bool:
+        '''
+            Close the connection and wait until it is closed, whether or not the client is still there.
+        '''
+        self._closed = True
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except (ConnectionError, RuntimeError):
+            pass
+        return True
+
+
+class _Table:
+    def __init__(self, table_id: str, rng: random.Random):
+        self._table_id = table_id
+        self._rng = rng
+        self._clients = []
+        self._round_task = None
+        self._turn_client = None
+        self._decisions = asyncio.Queue(maxsize = 1)
+
+    def get_table_id(self) -> str:
+        return self._table_id
+
+    def get_rng(self) -> random.Random:
+        return self._rng
+
+    def get_clients(self) -> list[_Client]:
+        return list(self._clients)
+
+    def get_num_clients(self) -> int:
+        return len(self._clients)
+
+    def add_client(self, client: _Client) -> bool:
+        self._clients.append(client)
+        return True
+
+    def remove_client(self, client: _Client) -> bool:
+        self._clients.remove(client)
+        return True
+
+    def get_round_task(self) -> asyncio.Task:
+        return self._round_task
+
+    def set_round_task(self, round_task: asyncio.Task) -> bool:
+        self._round_task = round_task
+        return True
+
+    def get_turn_client(self) -> _Client:
+        return self._turn_client
+
+    def set_turn_client(self, turn_client: _Client) -> bool:
+        self._turn_client = turn_client
+        return True
+
+    def get_decisions(self) -> asyncio.Queue:
+        return self._decisions
+
+    async def broadcast(self, clients: list[_Client], line: str):
+        '''
+            Send a line to the clients of a round that are still at the table.
+        '''
+        for client in clients:
+            if client.get_table() is self:
+                await client.send(line)
+
+
+class TableServer:
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, dealer_info: tuple[str, float] = ('dealer', 0.3),
+                 max_tables: int = 10000, max_seats_per_table: int = 7, decision_timeout: float = 30.0, seed: int = None):
+        '''
+            host, port: address to listen on. Port 0 picks a free port, see get_port after start.
+            dealer_info: id and probability of drawing of the dealer of every table.
+            max_tables: tables that can be open at the same time.
+            max_seats_per_table: players per table, at most the max number of players of a Game with a single Deck.
+            decision_timeout: seconds a player has to answer TURN before standing automatically.
+            seed: master seed of the random number generators of the tables, each of which gets its own stream.
+        '''
+        if max_seats_per_table < 1 or max_seats_per_table > len(CANONICAL_CARDS) // 2 - 1:
+            raise ValueError('max_seats_per_table must be between 1 and the max number of players of a Game.')
+        if max_tables < 1:
+            raise ValueError('max_tables must be at least 1.')
+        self._host = host
+        self._port = port
+        self._dealer_info = dealer_info
+        self._max_tables = max_tables
+        self._max_seats_per_table = max_seats_per_table
+        self._decision_timeout = decision_timeout
+        self._seeder = random.Random(seed)
+        self._tables = {}
+        self._clients = set()
+        self._server = None
+
+    async def start(self) -> bool:
+        self._server = await asyncio.start_server(self._handle_client, self._host, self._port, limit = _MAX_LINE_LENGTH)
+        self._port = self._server.sockets[0].getsockname()[1]
+        return True
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> bool:
+        '''
+            Cancel the rounds in progress and close every client connection before the server, which otherwise
+            waits for the connections to be closed.
+        '''
+        for table in list(self._tables.values()):
+            if table.get_round_task() is not None:
+                table.get_round_task().cancel()
+        await asyncio.gather(*[client.close() for client in list(self._clients)])
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        return True
+
+    def get_port(self) -> int:
+        return self._port
+
+    def get_num_tables(self) -> int:
+        return len(self._tables)
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        client = _Client(writer)
+        self._clients.add(client)
+        try:
+            while not client.is_closed():
+                try:
+                    line = await reader.readline()
+                except (ValueError, asyncio.LimitOverrunError):
+                    await client.send('ERR line too long')
+                    break
+                except ConnectionError:
+                    break
+                if not line:
+                    break
+                await self._handle_command(client, line.decode('ascii', errors = 'replace').split())
+        finally:
+            self._clients.discard(client)
+            client.set_closed()
+            self._leave(client)
+            writer.close()
+
+    async def _handle_command(self, client: _Client, words: list[str]):
+        if not words:
+            return
+        command = words[0]
+        if command == 'JOIN' and len(words) == 3:
+            await self._join(client, words[1], words[2])
+        elif command == 'START' and len(words) == 1:
+            await self._start_round(client)
+        elif command in ('DRAW', 'STAND') and len(words) == 1:
+            table = client.get_table()
+            if table is None or table.get_turn_client() is not client or table.get_decisions().full():
+                await client.send('ERR not your turn')
+            else:
+                table.get_decisions().put_nowait(command == 'DRAW')
+        elif command == 'LEAVE' and len(words) == 1:
+            self._leave(client)
+        else:
+            await client.send('ERR unknown command')
+
+    async def _join(self, client: _Client, table_id: str, player_id: str):
+        if client.get_table() is not None:
+            await client.send('ERR already at a table')
+            return
+        table = self._tables.get(table_id)
+        if table is None:
+            if len(self._tables) >= self._max_tables:
+                await client.send('ERR too many tables')
+                return
+            table = _Table(table_id, random.Random(self._seeder.getrandbits(64)))
+            self._tables[table_id] = table
+        if table.get_num_clients() >= self._max_seats_per_table:
+            await client.send('ERR table is full')
+            return
+        client.set_player_id(player_id)
+        client.set_table(table)
+        table.add_client(client)
+        await client.send(f'JOINED {table_id}')
+
+    def _leave(self, client: _Client):
+        table = client.get_table()
+        if table is None:
+            return
+        client.set_table(None)
+        table.remove_client(client)
+        if table.get_turn_client() is client and not table.get_decisions().full():
+            table.get_decisions().put_nowait(False)
+        if table.get_num_clients() == 0 and table.get_round_task() is None:
+            del self._tables[table.get_table_id()]
+
+    async def _start_round(self, client: _Client):
+        table = client.get_table()
+        if table is None:
+            await client.send('ERR not at a table')
+        elif table.get_round_task() is not None:
+            await client.send('ERR round in progress')
+        else:
+            table.set_round_task(asyncio.create_task(self._play_round(table)))
+
+    async def _play_round(self, table: _Table):
+        '''
+            Play one round the way Game.play_round does, with the decisions of the players coming from their clients.
+        '''
+        try:
+            clients = table.get_clients()
+            deck = Deck(table.get_rng())
+            deck.shuffle_cards(lazy = True)
+            game = Game(self._dealer_info, [(client.get_player_id(), 0.0) for client in clients], deck = deck, rng = table.get_rng())
+            participants = [game._dealer] + game._players
+            for seat, client in enumerate(clients, 1):
+                await client.send(f'SEAT {seat}')
+            game.assign_initial_two_cards()
+            for seat, participant in enumerate(participants):
+                await table.broadcast(clients, f'CARDS {seat} ' + ' '.join(str(card.get_code()) for card in participant.get_cards()))
+            blackjack_players = game.get_blackjacks()
+            winners = []
+            if not blackjack_players:
+                game.run_dealer_turn()
+                for card in game._dealer.get_cards()[2:]:
+                    await table.broadcast(clients, f'CARD 0 {card.get_code()}')
+                for seat, client in enumerate(clients, 1):
+                    await self._play_turn(table, clients, seat, client, game._players[seat - 1], deck)
+                    game._turn_number += 1
+                winners = game.get_winners()
+            scores = ','.join(str(participant.calculate_score()) for participant in participants)
+            blackjack_seats = [seat for seat, participant in enumerate(participants) if any(participant is other for other in blackjack_players)]
+            winner_seats = [seat for seat, participant in enumerate(participants) if any(participant is other for other in winners)]
+            await table.broadcast(clients, f'END {scores} {_format_seats(blackjack_seats)} {_format_seats(winner_seats)}')
+        finally:
+            table.set_round_task(None)
+            table.set_turn_client(None)
+            if table.get_num_clients() == 0 and self._tables.get(table.get_table_id()) is table:
+                del self._tables[table.get_table_id()]
+
+    async def _play_turn(self, table: _Table, clients: list[_Client], seat: int, client: _Client, player: Player, deck: Deck):
+        '''
+            Same loop as Game.run_player_turn with the decisions read from the client.
+            A client that left or does not answer in time stands.
+        '''
+        while player.is_alive() and deck.get_num_remaining_cards() > 0 and client.get_table() is table and not client.is_closed():
+            table.set_turn_client(client)
+            await client.send('TURN')
+            try:
+                draws = await asyncio.wait_for(table.get_decisions().get(), self._decision_timeout)
+            except asyncio.TimeoutError:
+                draws = False
+            table.set_turn_client(None)
+            if not draws:
+                return
+            deck.issue_card(player)
+            await table.broadcast(clients, f'CARD {seat} {player.get_cards()[-1].get_code()}')
+
+
+async def run_load_test(host: str, port: int, num_tables: int = 100, clients_per_table: int = 1, num_rounds: int = 10,
+                        prob_to_draw: float = 0.4, seed: int = 0) -> dict:
+    '''
+        Connect num_tables * clients_per_table clients, seat them and play num_rounds rounds at every table.
+        Clients draw with probability prob_to_draw. The decision latency is the time from sending DRAW or STAND
+        to receiving the next line from the server.
+        Return the number of decisions and rounds, rounds/sec over all tables and the p50/p99 decision latency in microseconds.
+    '''
+    seeder = random.Random(seed)
+    latencies = []
+    num_clients = num_tables * clients_per_table
+    all_joined = asyncio.Event()
+    num_joined = 0
+
+    async def play(table_idx: int, client_idx: int, rng: random.Random):
+        nonlocal num_joined
+        reader, writer = await asyncio.open_connection(host, port)
+
+        async def send(line: str):
+            writer.write(line.encode('ascii') + b'\n')
+            await writer.drain()
+        await send(f'JOIN table{table_idx} player{client_idx}')
+        if (await reader.readline()).split()[0] != b'JOINED':
+            raise Exception(f'player{client_idx} could not join table{table_idx}')
+        num_joined += 1
+        if num_joined == num_clients:
+            all_joined.set()
+        await all_joined.wait()
+        is_starter = client_idx % clients_per_table == 0
+        if is_starter:
+            await send('START')
+        num_rounds_done = 0
+        decision_time = None
+        while num_rounds_done < num_rounds:
+            words = (await reader.readline()).split()
+            if decision_time is not None:
+                latencies.append(time.perf_counter() - decision_time)
+                decision_time = None
+            if not words:
+                raise Exception('Server closed the connection.')
+            if words[0] == b'TURN':
+                decision_time = time.perf_counter()
+                await send('DRAW' if rng.random() < prob_to_draw else 'STAND')
+            elif words[0] == b'END':
+                num_rounds_done += 1
+                if is_starter and num_rounds_done < num_rounds:
+                    await send('START')
+        writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*[play(client_idx // clients_per_table, client_idx, random.Random(seeder.getrandbits(64)))
+                           for client_idx in range(num_clients)])
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+
+    def percentile_us(pct: float) -> float:
+        if not latencies:
+            return 0.0
+        return latencies[max(0, min(len(latencies) - 1, int(round(pct / 100 * len(latencies))) - 1))] * 1e6
+    return {
+        'decisions': len(latencies),
+        'rounds': num_tables * num_rounds,
+        'rounds_per_sec': num_tables * num_rounds / elapsed,
+        'p50_us': percentile_us(50),
+        'p99_us': percentile_us(99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Host blackjack tables on a local TCP port.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--max-tables', type=int, default=10000)
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+    server = TableServer(args.host, args.port, max_tables = args.max_tables, seed = args.seed)
+    asyncio.run(server.serve_forever())
+
+
+if __name__ == '__main__':
+    main()
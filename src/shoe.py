@@ -0,0 +1,123 @@
+from src.card import Card, CANONICAL_CARDS
+from src.player import Player
+from src.bulk_random import shuffle
+import random
+
+class Shoe:
+    def __init__(self, num_decks: int = 6, penetration: float = 0.75, rng: random.Random = None):
+        '''
+            num_decks: number of 52-card decks in the shoe.
+            penetration: fraction of the shoe dealt before the cut card is reached.
+            The cards are stored as card codes (see Card.get_code) in a bytearray, one byte per card,
+            so no Card objects are constructed. Issued cards are the shared canonical Card objects.
+            Like Deck, the shoe starts in order. Call shuffle_cards() before dealing.
+            rng: random number generator used for shuffling. The global random module is used if not given.
+        '''
+        if not isinstance(num_decks, int) or isinstance(num_decks, bool):
+            raise TypeError('num_decks must be int')
+        if num_decks < 1:
+            raise ValueError('num_decks must be at least 1')
+        if not isinstance(penetration, float) and not isinstance(penetration, int):
+            raise TypeError('penetration should be type float')
+        if penetration <= 0 or penetration > 1:
+            raise ValueError('penetration must be greater than 0 and at most 1')
+        cards = bytearray(range(len(CANONICAL_CARDS))) * num_decks
+        self._init_fields(num_decks, float(penetration), rng, cards, 0, int(len(cards) * penetration))
+
+    def _init_fields(self, num_decks: int, penetration: float, rng: random.Random, cards: bytearray,
+                     idx_of_next_card_to_issue: int, idx_of_cut_card: int):
+        '''
+            Set every field of the shoe, for both __init__ and _restore.
+        '''
+        self._rng = rng if rng is not None else random
+        self._num_decks = num_decks
+        self._penetration = penetration
+        self._cards = cards
+        self._idx_of_next_card_to_issue = idx_of_next_card_to_issue
+        self._idx_of_cut_card = idx_of_cut_card
+        # Incremented by every shuffle, so trackers like counting.CardCounter start again.
+        self._num_shuffles = 0
+
+    @classmethod
+    def _restore(cls, num_decks: int, penetration: float, rng: random.Random, cards: bytearray,
+                 idx_of_next_card_to_issue: int, idx_of_cut_card: int) -> 'Shoe':
+        '''
+            Construct a shoe from already validated fields, e.g. a Game snapshot, without the checks of __init__.
+            cards: card codes.
+        '''
+        shoe = cls.__new__(cls)
+        shoe._init_fields(num_decks, penetration, rng, cards, idx_of_next_card_to_issue, idx_of_cut_card)
+        return shoe
+
+    def __str__(self) -> str:
+        return (f'Shoe with {self._num_decks} decks, '
+                f'{self.get_num_remaining_cards()} remaining cards, '
+                f'cut card at {self._idx_of_cut_card}')
+
+    def get_num_decks(self) -> int:
+        return self._num_decks
+
+    def get_penetration(self) -> float:
+        return self._penetration
+
+    def set_rng(self, rng: random.Random) -> bool:
+        self._rng = rng
+        return True
+
+    def get_cards(self) -> list[Card]:
+        '''
+            Return the cards of the shoe in dealing order as Card objects.
+        '''
+        return [CANONICAL_CARDS[code] for code in self._cards]
+
+    def shuffle_cards(self) -> bool:
+        '''
+            Put all cards back into the shoe and shuffle them.
+            Return True if successful.
+        '''
+        shuffle(self._cards, self._rng)
+        self._idx_of_next_card_to_issue = 0
+        self._num_shuffles += 1
+        return True
+
+    def is_cut_card_reached(self) -> bool:
+        return self._idx_of_next_card_to_issue >= self._idx_of_cut_card
+
+    def reshuffle_if_needed(self, num_cards_needed: int = 0) -> bool:
+        '''
+            Reshuffle the shoe if the cut card has been reached, or if fewer than num_cards_needed cards remain.
+            Called by Game before dealing a new round, with the cards the round may take, so a large table does not run
+            the shoe dry before the cut card.
+            Return True if the shoe was reshuffled.
+        '''
+        if (self._idx_of_next_card_to_issue < self._idx_of_cut_card and
+                len(self._cards) - self._idx_of_next_card_to_issue >= num_cards_needed):
+            return False
+        return self.shuffle_cards()
+
+    def issue_card(self, player: Player, num_cards_to_issue: int = 1) -> bool:
+        '''
+            player: player or dealer.
+            num_cards_to_issue: number of cards to issue.
+            Same contract as Deck.issue_card.
+            Return True if sucessful.
+            Raise Exception if no more cards available in the shoe.
+        '''
+        for i in range(num_cards_to_issue):
+            if self._idx_of_next_card_to_issue == len(self._cards):
+                raise Exception('Shoe is already empty.')
+            player._receive_card(CANONICAL_CARDS[self._cards[self._idx_of_next_card_to_issue]])
+            self._idx_of_next_card_to_issue += 1
+        return True
+
+    def get_num_remaining_cards(self) -> int:
+        '''
+            Return the number of remaining available cards that have not been issued.
+        '''
+        return len(self._cards) - self._idx_of_next_card_to_issue
+
+    def get_unissued_cards(self) -> list[Card]:
+        '''
+            Return the cards that have not been issued yet in dealing order as Card objects.
+        '''
+        return [CANONICAL_CARDS[code] for code in self._cards[self._idx_of_next_card_to_issue:]]
@@ -0,0 +1,176 @@
+from src.player import Player
+from src.deck import Deck
+from src.infinite_deck import InfiniteDeck
+from src.game import Game
+from src.instrumentation import GameStats
+from concurrent.futures import ProcessPoolExecutor
+import os
+import random
+
+
+class SimulationResult:
+    def __init__(self, participant_ids: list[str]):
+        '''
+            Counts of a Monte Carlo run, kept per participant in seat order (dealer first).
+            participant_ids: ids of the dealer and players.
+        '''
+        self._participant_ids = list(participant_ids)
+        self._num_rounds = 0
+        self._num_blackjack_rounds = 0
+        self._wins = [0] * len(participant_ids)
+        self._busts = [0] * len(participant_ids)
+        self._blackjacks = [0] * len(participant_ids)
+        self._stats = None
+
+    def __eq__(self, other) -> bool:
+        return (self._participant_ids == other._participant_ids and
+                self._num_rounds == other._num_rounds and
+                self._num_blackjack_rounds == other._num_blackjack_rounds and
+                self._wins == other._wins and
+                self._busts == other._busts and
+                self._blackjacks == other._blackjacks)
+
+    def __str__(self) -> str:
+        return (f"SimulationResult with number of rounds: {self._num_rounds}, "
+                f"rounds ended by blackjack: {self._num_blackjack_rounds}, "
+                f"wins: {self.get_wins()}, "
+                f"busts: {self.get_busts()}, "
+                f"blackjacks: {self.get_blackjacks()}")
+
+    def record_round(self, game: Game, blackjack_players: list[Player], winners: list[Player]) -> bool:
+        '''
+            Add the outcome of a round returned by Game.play_round.
+            Return True if successful.
+        '''
+        participants = [game._dealer] + game._players
+        self._num_rounds += 1
+        if blackjack_players:
+            self._num_blackjack_rounds += 1
+        for seat, participant in enumerate(participants):
+            if any(participant is blackjack_player for blackjack_player in blackjack_players):
+                self._blackjacks[seat] += 1
+            elif any(participant is winner for winner in winners):
+                self._wins[seat] += 1
+            elif not blackjack_players and not participant.is_alive():
+                self._busts[seat] += 1
+        return True
+
+    def merge(self, other: 'SimulationResult') -> bool:
+        '''
+            Add the counts of another result for the same participants.
+            Return True if successful.
+        '''
+        if self._participant_ids != other._participant_ids:
+            raise ValueError('Can not merge results of different participants.')
+        self._num_rounds += other._num_rounds
+        self._num_blackjack_rounds += other._num_blackjack_rounds
+        for seat in range(len(self._participant_ids)):
+            self._wins[seat] += other._wins[seat]
+            self._busts[seat] += other._busts[seat]
+            self._blackjacks[seat] += other._blackjacks[seat]
+        if other._stats is not None:
+            if self._stats is None:
+                self._stats = GameStats()
+            self._stats.merge(other._stats)
+        return True
+
+    def get_stats(self) -> GameStats:
+        '''
+            Return the instrumentation counters and phase timings of the rounds, None if the run was not instrumented.
+        '''
+        return self._stats
+
+    def get_participant_ids(self) -> list[str]:
+        return self._participant_ids
+
+    def get_num_rounds(self) -> int:
+        return self._num_rounds
+
+    def get_num_blackjack_rounds(self) -> int:
+        return self._num_blackjack_rounds
+
+    def get_wins(self) -> dict[str, int]:
+        return dict(zip(self._participant_ids, self._wins))
+
+    def get_busts(self) -> dict[str, int]:
+        return dict(zip(self._participant_ids, self._busts))
+
+    def get_blackjacks(self) -> dict[str, int]:
+        return dict(zip(self._participant_ids, self._blackjacks))
+
+    def get_win_rates(self) -> dict[str, float]:
+        '''
+            Return the fraction of rounds each participant won.
+        '''
+        if self._num_rounds == 0:
+            return {participant_id: 0.0 for participant_id in self._participant_ids}
+        return {participant_id: wins / self._num_rounds for participant_id, wins in zip(self._participant_ids, self._wins)}
+
+
+def derive_seeds(seed: int, num_seeds: int) -> list[int]:
+    '''
+        Derive independent 64-bit seeds from one master seed.
+        The same master seed always gives the same seeds.
+    '''
+    seeder = random.Random(seed)
+    return [seeder.getrandbits(64) for i in range(num_seeds)]
+
+
+def run_rounds(dealer_info: tuple[str, float], players_info: list[tuple[str, float]], num_rounds: int, seed: int,
+               instrument: bool = False, infinite_deck: bool = False) -> SimulationResult:
+    '''
+        Play num_rounds rounds, each on a new lazily shuffled Deck, and count the outcomes.
+        Shuffles and drawing decisions use two separate random.Random streams derived from seed,
+        so every call with the same seed deals the same sequence of decks.
+        instrument: if True, every Game collects into one GameStats returned by SimulationResult.get_stats().
+        infinite_deck: if True, every round is dealt from one InfiniteDeck instead, ignoring card removal.
+    '''
+    deck_seed, decision_seed = derive_seeds(seed, 2)
+    deck_rng = random.Random(deck_seed)
+    decision_rng = random.Random(decision_seed)
+    result = SimulationResult([dealer_info[0]] + [player_info[0] for player_info in players_info])
+    if instrument:
+        result._stats = GameStats()
+    if infinite_deck:
+        deck = InfiniteDeck(deck_rng)
+    for i in range(num_rounds):
+        if not infinite_deck:
+            deck = Deck(deck_rng)
+            deck.shuffle_cards(lazy = True)
+        game = Game(dealer_info, players_info, deck = deck, rng = decision_rng, stats = result._stats)
+        blackjack_players, winners = game.play_round()
+        result.record_round(game, blackjack_players, winners)
+    return result
+
+
+def run_simulation(dealer_info: tuple[str, float], players_info: list[tuple[str, float]], num_rounds: int,
+                   num_workers: int = None, seed: int = None, instrument: bool = False,
+                   infinite_deck: bool = False) -> SimulationResult:
+    '''
+        Shard num_rounds rounds of a Game configuration across a pool of num_workers processes.
+        num_workers: number of worker processes. Defaults to the number of CPUs. With 1 worker the rounds run in this process.
+        seed: master seed. Every worker gets its own random streams derived from it,
+        so the same seed and number of workers always give identical totals.
+        instrument: if True, the instrumentation of every worker is merged into SimulationResult.get_stats().
+        infinite_deck: if True, cards are dealt with replacement from an InfiniteDeck, see run_rounds.
+        Return the merged SimulationResult.
+    '''
+    if num_rounds < 0:
+        raise ValueError('num_rounds can not be negative.')
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+    if num_workers < 1:
+        raise ValueError('num_workers must be at least 1.')
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(64)
+    worker_seeds = derive_seeds(seed, num_workers)
+    shard_sizes = [num_rounds // num_workers + (worker < num_rounds % num_workers) for worker in range(num_workers)]
+    if num_workers == 1:
+        return run_rounds(dealer_info, players_info, num_rounds, worker_seeds[0], instrument, infinite_deck)
+    with ProcessPoolExecutor(max_workers = num_workers) as executor:
+        futures = [executor.submit(run_rounds, dealer_info, players_info, shard_size, worker_seed, instrument, infinite_deck)
+                   for shard_size, worker_seed in zip(shard_sizes, worker_seeds)]
+        results = [future.result() for future in futures]
+    for result in results[1:]:
+        results[0].merge(result)
+    return results[0]
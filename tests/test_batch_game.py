@@ -0,0 +1,111 @@
+import unittest
+import random
+import numpy as np
+from src.batch_game import BatchGame, _calculate_scores
+from src.game import Game
+from src.policy import ProbabilisticPolicy, BasicStrategyPolicy
+
+
+def play_object_rounds(dealer_info, players_info, num_rounds: int):
+    '''
+        A helper function for playing rounds through Game in the same way src/main.py does.
+        Return the number of rounds ended by blackjack and the number of wins of each seat (dealer first).
+    '''
+    num_blackjack_rounds = 0
+    num_wins = [0] * (len(players_info) + 1)
+    for trial in range(num_rounds):
+        game = Game(dealer_info, players_info)
+        game._deck.shuffle_cards()
+        game.assign_initial_two_cards()
+        if game.get_blackjacks():
+            num_blackjack_rounds += 1
+            continue
+        game.run_dealer_turn()
+        while not game.is_game_end():
+            game.run_player_turn()
+        winners = game.get_winners()
+        seats = [game._dealer] + game._players
+        for seat, participant in enumerate(seats):
+            if any(winner is participant for winner in winners):
+                num_wins[seat] += 1
+    return num_blackjack_rounds, num_wins
+
+
+class TestBatchGame(unittest.TestCase):
+    def setUp(self):
+        self.dealer_info = ('dealer', 0.3)
+        self.players_info = [('player1', 0.3), ('player2', 0.4), ('player3', 0.5)]
+        self.batch_game = BatchGame(self.dealer_info, self.players_info)
+
+    def test_constructor_fail_too_many_players(self):
+        '''
+            Test the constructor when number of players is over max.
+        '''
+        with self.assertRaises(ValueError):
+            BatchGame(self.dealer_info, [(f'player{i}', 0.4) for i in range(26)])
+
+    def test_constructor_fail_invalid_prob_to_draw(self):
+        '''
+            Test the constructor when a probability of drawing is out of range.
+        '''
+        with self.assertRaises(ValueError):
+            BatchGame(self.dealer_info, [('player1', 1.5)])
+
+    def test_constructor_fail_policy(self):
+        '''
+            Test the constructor refuses a player whose policy is not drawing with prob_to_draw.
+        '''
+        with self.assertRaises(TypeError):
+            BatchGame(self.dealer_info, [('player1', 0.3, BasicStrategyPolicy())])
+        BatchGame(self.dealer_info, [('player1', 0.3, ProbabilisticPolicy())])
+
+    def test_calculate_scores(self):
+        '''
+            Check the vectorized score calculation against hands with Aces treated as 1 and 11.
+        '''
+        hard_totals = np.array([12, 2, 11, 22, 21, 4])
+        num_aces = np.array([0, 2, 1, 1, 1, 4])
+        self.assertEqual(_calculate_scores(hard_totals, num_aces).tolist(), [12, 12, 21, -1, 21, 14])
+
+    def test_play_rounds_shapes(self):
+        '''
+            Check the shapes of the outcome arrays.
+        '''
+        result = self.batch_game.play_rounds(100, np.random.default_rng(0))
+        self.assertEqual(result.get_num_tables(), 100)
+        self.assertEqual(result.seat_ids, ['dealer', 'player1', 'player2', 'player3'])
+        self.assertEqual(result.scores.shape, (100, 4))
+        self.assertEqual(result.blackjacks.shape, (100, 4))
+        self.assertEqual(result.winners.shape, (100, 4))
+        self.assertEqual(result.ended_by_blackjack.shape, (100,))
+
+    def test_play_rounds_consistency(self):
+        '''
+            Check that winners are the alive seats with highest score and blackjack rounds have no winners.
+        '''
+        result = self.batch_game.play_rounds(10000, np.random.default_rng(1))
+        self.assertFalse(result.winners[result.ended_by_blackjack].any())
+        self.assertTrue((result.ended_by_blackjack == result.blackjacks.any(axis=1)).all())
+        dealer_scores = result.scores[~result.ended_by_blackjack, 0]
+        self.assertTrue(((dealer_scores >= 17) | (dealer_scores == -1)).all())
+        for scores, winners in zip(result.scores[~result.ended_by_blackjack], result.winners[~result.ended_by_blackjack]):
+            alive_scores = scores[scores != -1]
+            if len(alive_scores) == 0:
+                self.assertFalse(winners.any())
+            else:
+                self.assertEqual(winners.tolist(), (scores == alive_scores.max()).tolist())
+        self.assertTrue((result.num_cards_issued <= 52).all())
+
+    def test_play_rounds_matches_game_statistically(self):
+        '''
+            Compare the rate of blackjack rounds and the win rate of every seat with rounds played through Game.
+            It uses monte carlo simulation with tolerance level set to 0.015.
+        '''
+        random.seed(2)
+        num_object_rounds = 20000
+        num_blackjack_rounds, num_wins = play_object_rounds(self.dealer_info, self.players_info, num_object_rounds)
+        result = self.batch_game.play_rounds(200000, np.random.default_rng(2))
+        self.assertAlmostEqual(num_blackjack_rounds / num_object_rounds, result.ended_by_blackjack.mean(), delta=0.015)
+        batch_win_rates = result.winners.mean(axis=0)
+        for seat in range(len(num_wins)):
+            self.assertAlmostEqual(num_wins[seat] / num_object_rounds, batch_win_rates[seat], delta=0.015)
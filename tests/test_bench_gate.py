@@ -0,0 +1,85 @@
+import unittest
+from benchmarks.bench_gate import SCENARIOS, HOT_CALLS, compare, percentile, play_scenario, median, relative_spread
+
+
+class TestBenchGate(unittest.TestCase):
+    def setUp(self):
+        self.baseline = {'scenarios': {'main_table': {'rounds_per_sec': 1000.0, 'p50_us': 100.0, 'p90_us': 200.0, 'p99_us': 400.0}}}
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7], 90), 7)
+
+    def test_compare_within_threshold(self):
+        results = {'scenarios': {'main_table': {'rounds_per_sec': 800.0, 'p50_us': 120.0, 'p90_us': 240.0, 'p99_us': 480.0},
+                                 'heads_up': {'rounds_per_sec': 1.0, 'p50_us': 1e6, 'p90_us': 1e6, 'p99_us': 1e6}}}
+        self.assertEqual(compare(results, self.baseline, threshold = 0.25), [])
+
+    def test_compare_regressions(self):
+        '''
+            Test every metric beyond the threshold is reported.
+        '''
+        results = {'scenarios': {'main_table': {'rounds_per_sec': 700.0, 'p50_us': 100.0, 'p90_us': 260.0, 'p99_us': 400.0}}}
+        regressions = compare(results, self.baseline, threshold = 0.25)
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(regressions[0].startswith('main_table: 700 rounds/sec'))
+        self.assertTrue(regressions[1].startswith('main_table: p90_us'))
+
+    def test_compare_widens_threshold_with_noise(self):
+        results = {'scenarios': {'main_table': {'rounds_per_sec': 650.0, 'p50_us': 100.0, 'p90_us': 200.0, 'p99_us': 400.0,
+                                                'noise': 0.1}}}
+        self.assertEqual(compare(results, self.baseline, threshold = 0.25, noise_factor = 4), [])
+        self.assertEqual(len(compare(results, self.baseline, threshold = 0.25, noise_factor = 2)), 1)
+
+    def test_compare_too_noisy(self):
+        '''
+            Test a scenario noisier than max_noise is reported instead of being compared with a widened threshold.
+        '''
+        results = {'scenarios': {'main_table': {'rounds_per_sec': 1000.0, 'p50_us': 100.0, 'noise': 0.5}}}
+        regressions = compare(results, self.baseline, threshold = 0.25, max_noise = 0.1)
+        self.assertEqual(len(regressions), 1)
+        self.assertIn('too noisy', regressions[0])
+        self.assertEqual(compare(results, self.baseline, threshold = 0.25, max_noise = 0.6), [])
+
+    def test_compare_hot_calls(self):
+        '''
+            Test the latency percentiles of every hot call are compared with those of the baseline,
+            p99 with the tail threshold.
+        '''
+        baseline = {'scenarios': {'main_table': {'rounds_per_sec': 1000.0,
+                                                 'calls': {'run_player_turn': {'p50_us': 10.0, 'p99_us': 20.0}}}}}
+        results = {'scenarios': {'main_table': {'rounds_per_sec': 1000.0,
+                                                'calls': {'run_player_turn': {'p50_us': 13.0, 'p99_us': 29.0},
+                                                          'get_winners': {'p50_us': 100.0}}}}}
+        regressions = compare(results, baseline, threshold = 0.25)
+        self.assertEqual(len(regressions), 1)
+        self.assertTrue(regressions[0].startswith('main_table: run_player_turn p50_us'))
+        self.assertEqual(len(compare(results, baseline, threshold = 0.25, tail_threshold = 0.4)), 2)
+
+    def test_compare_scales_by_reference_speed(self):
+        '''
+            Test a machine running the reference workload half as fast as for the baseline is not a regression.
+        '''
+        baseline = {'scenarios': {'main_table': {'rounds_per_sec': 1000.0, 'p50_us': 100.0, 'reference_per_sec': 2e6}}}
+        results = {'scenarios': {'main_table': {'rounds_per_sec': 500.0, 'p50_us': 200.0, 'reference_per_sec': 1e6}}}
+        self.assertEqual(compare(results, baseline), [])
+        results['scenarios']['main_table']['reference_per_sec'] = 2e6
+        self.assertEqual(len(compare(results, baseline)), 2)
+
+    def test_median_and_spread(self):
+        self.assertEqual(median([3, 1, 2]), 2)
+        self.assertEqual(median([4, 1, 2, 3]), 2.5)
+        self.assertAlmostEqual(relative_spread([90, 100, 100, 110, 1000]), 0.1)
+
+    def test_play_scenario(self):
+        '''
+            Test a scenario plays its number of rounds, with a player turn timed for every player of a round without blackjacks.
+        '''
+        latencies = play_scenario('main_table')
+        self.assertEqual(set(latencies), {'round'} | set(HOT_CALLS))
+        self.assertEqual(len(latencies['round']), SCENARIOS['main_table'][3])
+        self.assertEqual(len(latencies['shuffle_cards']), SCENARIOS['main_table'][3])
+        self.assertEqual(len(latencies['run_player_turn']), 3 * len(latencies['run_dealer_turn']))
+        self.assertEqual(len(latencies['get_winners']), len(latencies['run_dealer_turn']))
@@ -0,0 +1,87 @@
+import unittest
+import math
+import random
+from src.bulk_random import randbelow, shuffle, draw_offsets, _plan
+from src.deck import Deck
+from src.player import Player, Dealer
+
+
+class TestBulkRandom(unittest.TestCase):
+    def test_randbelow_same_as_randrange(self):
+        rng = random.Random(1)
+        other = random.Random(1)
+        for n in [1, 2, 3, 52, 1000, 1 << 70]:
+            for i in range(100):
+                self.assertEqual(randbelow(rng, n), other.randrange(n))
+
+    def test_plan_covers_positions(self):
+        '''
+            Test every position but the last is in exactly one group and every product stays below 2**64.
+        '''
+        for num_cards, start in [(52, 0), (52, 30), (312, 0), (2, 0), (52, 51)]:
+            plan = _plan(num_cards, start)
+            positions = [i for product, k, group in plan for i, bound in group]
+            self.assertEqual(positions, list(range(start, num_cards - 1)))
+            for product, k, group in plan:
+                self.assertEqual(product, math.prod(bound for i, bound in group))
+                self.assertLessEqual(product, 1 << 64)
+
+    def test_shuffle_uniform(self):
+        '''
+            Test all orders of 5 cards, and of the last 3 of them, are about equally likely.
+        '''
+        rng = random.Random(2)
+        for start, num_orders in [(0, 120), (2, 6)]:
+            counter = {}
+            num_trials = 1000 * num_orders
+            for trial in range(num_trials):
+                cards = [0, 1, 2, 3, 4]
+                self.assertTrue(shuffle(cards, rng, start))
+                self.assertEqual(cards[:start], list(range(start)))
+                counter[tuple(cards)] = counter.get(tuple(cards), 0) + 1
+            self.assertEqual(len(counter), num_orders)
+            for count in counter.values():
+                self.assertAlmostEqual(count / num_trials, 1 / num_orders, delta = 0.25 / num_orders)
+
+    def test_shuffle_bytearray(self):
+        cards = bytearray(range(52)) * 6
+        shuffle(cards, random.Random(3))
+        self.assertEqual(sorted(cards), sorted(bytearray(range(52)) * 6))
+
+    def test_draw_offsets(self):
+        rng = random.Random(4)
+        offsets = draw_offsets(rng, 52, 40)
+        self.assertEqual(len(offsets), 11)
+        for i, offset in enumerate(reversed(offsets)):
+            self.assertTrue(0 <= offset < 52 - 40 - i)
+        self.assertEqual(draw_offsets(rng, 52, 51), [])
+
+    def test_lazy_deck_cursor_moved(self):
+        '''
+            Test a lazily shuffled deck still deals every card once when the cursor is moved between issues.
+        '''
+        deck = Deck(random.Random(5))
+        deck.shuffle_cards(lazy = True)
+        player = Player('player_id', 0.5)
+        deck.issue_card(player, 3)
+        deck._idx_of_next_card_to_issue = 10
+        deck.issue_card(player, 42)
+        self.assertEqual(sorted(card.get_code() for card in deck._cards), list(range(52)))
+        self.assertEqual(deck.get_num_remaining_cards(), 0)
+
+    def test_draw_decisions_unchanged(self):
+        '''
+            Test drawing decisions are the same as comparing rng.uniform(0, 1) with the probability of drawing.
+        '''
+        player = Player('player_id', 0.4, random.Random(6))
+        dealer = Dealer('dealer_id', 0.4, random.Random(6))
+        dealer._cards = [Deck()._cards[-1], Deck()._cards[-5]]
+        other = random.Random(6)
+        for i in range(100):
+            expected = other.uniform(0, 1) < 0.4
+            self.assertEqual(player.draw(), expected)
+            self.assertEqual(dealer.draw(), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,6 @@
 import unittest
-from src.card import Card
+import heapq
+from src.card import Card, CANONICAL_CARDS, rank_key, sort_cards, compare_cards
 
 class TestCard(unittest.TestCase):
     def setUp(self) -> None:
@@ -241,4 +242,102 @@ class TestCard(unittest.TestCase):
         '''
             Test A <= B for failure cases.
         '''
-        self.assertFalse(Card('3', 'diamond') <= Card('A', 'diamond'))
\ No newline at end of file
+        self.assertFalse(Card('3', 'diamond') <= Card('A', 'diamond'))
+
+    def test_get_code(self):
+        '''
+            Test the integer code rank * 4 + suit_idx follows the order of a freshly constructed deck.
+        '''
+        self.assertEqual(Card('2', 'club').get_code(), 0)
+        self.assertEqual(Card('2', 'spade').get_code(), 3)
+        self.assertEqual(Card('10', 'heart').get_code(), 34)
+        self.assertEqual(Card('A', 'spade').get_code(), 51)
+        
+    def test_setters_update_code(self):
+        '''
+            Test the code is updated after reassignment via setters.
+        '''
+        self.card.set_face_value('K')
+        self.card.set_suit('heart')
+        self.assertEqual(self.card, Card('K', 'heart'))
+        self.assertEqual(self.card.get_code(), Card('K', 'heart').get_code())
+        
+    def test_no_instance_dict(self):
+        '''
+            Test Card objects do not carry a per-instance __dict__.
+        '''
+        self.assertFalse(hasattr(self.card, '__dict__'))
+        
+    def test_canonical_cards(self):
+        '''
+            Test the table of 52 canonical cards is indexed by code and agrees with constructed cards.
+        '''
+        self.assertEqual(len(CANONICAL_CARDS), 52)
+        for face_value in Card._VALID_FACE_VALUES:
+            for suit in Card._VALID_SUITS:
+                card = Card(face_value, suit)
+                canonical_card = Card.from_code(card.get_code())
+                self.assertIs(canonical_card, CANONICAL_CARDS[card.get_code()])
+                self.assertEqual(canonical_card, card)
+                self.assertEqual(canonical_card.score(), card.score())
+                self.assertEqual(canonical_card.is_ace(), card.is_ace())
+                self.assertEqual(canonical_card.is_face(), card.is_face())
+                self.assertEqual(str(canonical_card), str(card))
+                
+    def test_canonical_cards_immutable(self):
+        '''
+            Test canonical cards can not be modified.
+        '''
+        card = Card.from_code(0)
+        with self.assertRaises(AttributeError):
+            card.set_face_value('A')
+        with self.assertRaises(AttributeError):
+            card.set_suit('heart')
+        self.assertEqual(card, Card('2', 'club'))
+        
+    def test_comparisons_total_order(self):
+        '''
+            Test exactly one of A < B, A > B and same face_value holds, and >=, <= agree with them, for every pair of cards.
+        '''
+        for card in CANONICAL_CARDS:
+            for other in CANONICAL_CARDS:
+                self.assertEqual((card < other) + (card > other) + card.has_same_face_value(other), 1)
+                self.assertEqual(card >= other, not card < other)
+                self.assertEqual(card <= other, not card > other)
+                
+    def test_rank_key(self):
+        '''
+            Test rank_key orders cards by face_value (A lowest, K highest) and breaks ties by suit.
+        '''
+        self.assertLess(rank_key(Card('A', 'spade')), rank_key(Card('2', 'club')))
+        self.assertLess(rank_key(Card('10', 'spade')), rank_key(Card('J', 'club')))
+        self.assertLess(rank_key(Card('K', 'club')), rank_key(Card('K', 'spade')))
+        self.assertEqual(Card('Q', 'heart').rank_key(), rank_key(Card('Q', 'heart')))
+        self.assertEqual(len({rank_key(card) for card in CANONICAL_CARDS}), 52)
+        
+    def test_rank_key_heapq(self):
+        '''
+            Test rank_key can be used as the priority of heapq entries.
+        '''
+        heap = [(rank_key(card), card.get_code()) for card in [Card('K', 'club'), Card('A', 'heart'), Card('7', 'spade')]]
+        heapq.heapify(heap)
+        self.assertEqual(Card.from_code(heapq.heappop(heap)[1]), Card('A', 'heart'))
+        
+    def test_sort_cards(self):
+        '''
+            Test sort_cards agrees with sorting by the comparison operators.
+        '''
+        cards = [Card('K', 'club'), Card('2', 'heart'), Card('A', 'spade'), Card('10', 'diamond'), Card('2', 'club')]
+        self.assertEqual(sort_cards(cards), [Card('A', 'spade'), Card('2', 'club'), Card('2', 'heart'), Card('10', 'diamond'), Card('K', 'club')])
+        self.assertEqual(sort_cards(cards, reverse=True)[0], Card('K', 'club'))
+        self.assertEqual([card.get_face_value() for card in sort_cards(cards)], [card.get_face_value() for card in sorted(cards)])
+        
+    def test_compare_cards(self):
+        '''
+            Test pairwise comparison of two lists of cards.
+        '''
+        cards = [Card('2', 'diamond'), Card('A', 'diamond'), Card('J', 'club')]
+        other_cards = [Card('A', 'heart'), Card('3', 'diamond'), Card('J', 'spade')]
+        self.assertEqual(compare_cards(cards, other_cards), [1, -1, 0])
+        with self.assertRaises(ValueError):
+            compare_cards(cards, other_cards[:2])
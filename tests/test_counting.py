@@ -0,0 +1,90 @@
+import unittest
+import random
+from src.card import Card
+from src.deck import Deck
+from src.shoe import Shoe
+from src.player import Player
+from src.game import Game
+from src.counting import CountingSystem, CardCounter, CountIndexPolicy, HI_LO, KO, OMEGA_II
+
+
+def count_of(cards: list[Card], system: CountingSystem) -> int:
+    return sum(system.get_weights()[card.get_code() >> 2] for card in cards)
+
+
+class TestCounting(unittest.TestCase):
+    def test_systems(self):
+        self.assertTrue(HI_LO.is_balanced())
+        self.assertTrue(OMEGA_II.is_balanced())
+        self.assertFalse(KO.is_balanced())
+        self.assertEqual(KO.get_initial_running_count(6), -20)
+        self.assertEqual(HI_LO.get_initial_running_count(6), 0)
+        with self.assertRaises(ValueError):
+            CountingSystem('short', (1, -1))
+
+    def test_counts_follow_shoe_across_reshuffles(self):
+        '''
+            Test the running count always equals a rescan of the cards issued since the last shuffle,
+            while Game reshuffles the shoe at the cut card.
+        '''
+        shoe = Shoe(num_decks = 2, penetration = 0.5, rng = random.Random(3))
+        shoe.shuffle_cards()
+        counters = [CardCounter(shoe, system) for system in (HI_LO, KO, OMEGA_II)]
+        rng = random.Random(4)
+        num_reshuffles = 0
+        for round_number in range(60):
+            game = Game(('dealer_id', 0.3), [('player1', 0.5), ('player2', 0.5)], deck = shoe, rng = rng)
+            num_shuffles = shoe._num_shuffles
+            game.play_round()
+            num_reshuffles += shoe._num_shuffles != num_shuffles
+            issued_cards = shoe.get_cards()[:shoe._idx_of_next_card_to_issue]
+            for counter in counters:
+                system = counter.get_system()
+                self.assertEqual(counter.get_running_count(), system.get_initial_running_count(2) + count_of(issued_cards, system))
+                self.assertEqual(counter.get_num_cards_seen(), len(issued_cards))
+        self.assertGreater(num_reshuffles, 0)
+
+    def test_true_count(self):
+        deck = Deck()
+        counter = CardCounter(deck)
+        deck.issue_card(Player('player_id', 0.3), num_cards_to_issue = 26)
+        # 2-7 and half of the 8s are issued: +20 over 26 remaining cards, i.e. half a deck.
+        self.assertEqual(counter.get_running_count(), 20)
+        self.assertAlmostEqual(counter.get_true_count(), 40.0)
+        # A lazy shuffle only reorders the cards not yet issued.
+        deck.shuffle_cards(lazy = True)
+        self.assertEqual(counter.get_running_count(), 20)
+        deck.shuffle_cards()
+        self.assertEqual(counter.get_running_count(), 0)
+        deck.issue_card(Player('player_id', 0.3), num_cards_to_issue = 10)
+        self.assertEqual(counter.get_num_cards_seen(), 10)
+        self.assertEqual(counter.get_running_count(), count_of(deck.get_cards()[26:36], HI_LO))
+
+    def test_count_index_policy(self):
+        deck = Deck()
+        counter = CardCounter(deck)
+        policy = CountIndexPolicy(counter)
+        player = Player('player_id', 0.0, policy = policy)
+        player.set_cards([Card('10', 'club'), Card('5', 'club')])
+        self.assertTrue(player.draw(Card('K', 'heart')))
+        # Four low cards issued: true count 4 * 52 / 48, above the index 4 of 15 against a 10.
+        deck.issue_card(Player('other_id', 0.3), num_cards_to_issue = 4)
+        self.assertFalse(player.draw(Card('K', 'heart')))
+        # Plays without an index follow basic strategy.
+        self.assertTrue(player.draw(Card('7', 'heart')))
+        with self.assertRaises(TypeError):
+            CountIndexPolicy(HI_LO)
+
+    def test_policy_in_game(self):
+        shoe = Shoe(rng = random.Random(8))
+        shoe.shuffle_cards()
+        counter = CardCounter(shoe)
+        policy = CountIndexPolicy(counter)
+        rng = random.Random(9)
+        for round_number in range(20):
+            Game(('dealer_id', 0.3), [('counter', 0.0, policy)], deck = shoe, rng = rng).play_round()
+        self.assertEqual(counter.get_running_count(), count_of(shoe.get_cards()[:shoe._idx_of_next_card_to_issue], HI_LO))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,8 @@
 import unittest
 import math
-from src.deck import Deck
-from src.card import Card
+import random
+from src.deck import Deck, mask_of, cards_of_mask, rank_counts_of_mask
+from src.card import Card, CANONICAL_CARDS
 from src.player import Player
 
 class TestDeck(unittest.TestCase):
@@ -24,6 +25,13 @@ class TestDeck(unittest.TestCase):
         self.assertEqual(self.deck._cards, cards)
         self.assertEqual(self.deck._idx_of_next_card_to_issue, 0)
         
+    def test_constructor_reuses_canonical_cards(self):
+        '''
+            Test the deck is built from the shared canonical Card objects.
+        '''
+        for card, canonical_card in zip(self.deck._cards, CANONICAL_CARDS):
+            self.assertIs(card, canonical_card)
+        
     def test_swap_card(self):
         '''
             Test if two cards are swapped correctly given their indices.
@@ -64,6 +72,63 @@ class TestDeck(unittest.TestCase):
         for count in permutation_counter.values():    
             self.assertAlmostEqual(count // int(1e5), 1/total_permutations, delta = 0.01)
     
+    def test_shuffle_card_lazy_does_not_move_cards(self):
+        '''
+            Test a lazy shuffle leaves the order of the cards untouched until cards are issued.
+        '''
+        self.assertTrue(self.deck.shuffle_cards(lazy = True))
+        self.assertEqual(self.deck._cards, list(CANONICAL_CARDS))
+        
+    def test_shuffle_card_lazy(self):
+        '''
+            Test if cards issued after a lazy shuffle follow all permutations equally likely.
+        '''
+        self.deck._cards = [Card('2', 'club'), Card('3', 'diamond'), Card('J', 'heart'), Card('A', 'spade')]
+        total_permutations = math.factorial(len(self.deck._cards))
+        num_trials = 24000
+        permutation_counter = {}
+        for trial in range(num_trials):
+            player = Player('player_id', 0.3)
+            self.deck._idx_of_next_card_to_issue = 0
+            self.deck.shuffle_cards(lazy = True)
+            self.deck.issue_card(player, num_cards_to_issue = len(self.deck._cards))
+            cards_tuple = tuple(card.get_code() for card in player._cards)
+            permutation_counter[cards_tuple] = permutation_counter.get(cards_tuple, 0) + 1
+        self.assertEqual(len(permutation_counter), total_permutations)
+        for count in permutation_counter.values():
+            self.assertAlmostEqual(count / num_trials, 1/total_permutations, delta = 0.01)
+            
+    def test_shuffle_card_lazy_complete_shuffle(self):
+        '''
+            Test complete_shuffle() completes a lazy shuffle without changing the cards already issued.
+        '''
+        player = Player('player_id', 0.3)
+        self.deck.shuffle_cards(lazy = True)
+        self.deck.issue_card(player, num_cards_to_issue = 3)
+        self.assertTrue(self.deck.complete_shuffle())
+        cards = self.deck.get_cards()
+        self.assertEqual(cards[:3], player._cards)
+        self.assertEqual(sorted(card.get_code() for card in cards), list(range(52)))
+        self.assertFalse(self.deck._lazy_shuffle)
+
+    def test_get_cards_keeps_lazy_shuffle(self):
+        '''
+            Test get_cards() and printing do not change the cards dealt next from a lazily shuffled deck.
+        '''
+        dealt = []
+        for look in (False, True):
+            deck = Deck(random.Random(4))
+            deck.shuffle_cards(lazy = True)
+            player = Player('player_id', 0.3)
+            deck.issue_card(player, num_cards_to_issue = 2)
+            if look:
+                deck.get_cards()
+                str(deck)
+            deck.issue_card(player, num_cards_to_issue = 3)
+            dealt.append(player.get_cards())
+        self.assertEqual(dealt[0], dealt[1])
+        self.assertTrue(deck._lazy_shuffle)
+    
     def test_issue_card_fail_no_cards_in_initial_deck(self):
         '''
             Check if issue_card() raises Exception when there are no cards in the deck.
@@ -155,6 +220,17 @@ class TestDeck(unittest.TestCase):
         self.assertEqual(player._cards, [Card(face_value = '2', suit = 'club'), Card(face_value = '2', suit = 'diamond'), self.deck._cards[len(self.deck._cards)-1]])
         self.assertEqual(self.deck._idx_of_next_card_to_issue, len(self.deck._cards))    
     
+    def test_issue_card_updates_hand_state(self):
+        '''
+            Test the player's running score is updated by issuing cards.
+        '''
+        player = Player(player_id = 'player_id', prob_to_draw = 0.3)
+        self.deck._idx_of_next_card_to_issue = 48  # Next cards to issue are the four Aces.
+        self.deck.issue_card(player = player, num_cards_to_issue = 2)
+        self.assertEqual(player.get_hard_total(), 2)
+        self.assertEqual(player.get_num_aces(), 2)
+        self.assertEqual(player.calculate_score(), 12)
+        
     def test_get_remaining_cards_no_cards_in_the_initial_deck(self):
         '''
             Test get_num_remaining_cards() for an empty initial deck.
@@ -195,8 +271,83 @@ class TestDeck(unittest.TestCase):
         with self.assertRaises(Exception):
             self.deck.issue_card(Player(player_id='player_id', prob_to_draw = 0.3), num_cards_to_issue=3)
         self.assertEqual(self.deck.get_num_remaining_cards(), 0)
+
+    def test_get_unissued_cards(self):
+        '''
+            Test get_unissued_cards() returns a copy of the cards after the issued ones.
+        '''
+        self.deck._idx_of_next_card_to_issue = 50
+        self.assertEqual(self.deck.get_unissued_cards(), [Card('A', 'heart'), Card('A', 'spade')])
+        self.deck.get_unissued_cards().pop()
+        self.assertEqual(self.deck.get_num_remaining_cards(), 2)
       
     
         
     
-    
\ No newline at end of file
+    
+
+    def test_composition_full_deck(self):
+        self.assertEqual(self.deck.get_remaining_mask(), (1 << 52) - 1)
+        self.assertEqual(self.deck.get_rank_counts(), [4] * 13)
+        self.assertEqual(self.deck.count_remaining_value(10), 16)
+        self.assertEqual(self.deck.get_value_counts(), [4] * 9 + [16])
+
+    def test_composition_follows_issued_cards(self):
+        '''
+            Test the composition index matches the unissued cards after every card issued, shuffled lazily or not.
+        '''
+        for lazy in (False, True):
+            deck = Deck(random.Random(5))
+            deck.shuffle_cards(lazy = lazy)
+            player = Player('player_id', 0.3)
+            while deck.get_num_remaining_cards():
+                deck.issue_card(player, num_cards_to_issue = 3 if deck.get_num_remaining_cards() >= 3 else 1)
+                unissued_cards = deck.get_unissued_cards()
+                self.assertEqual(deck.get_remaining_mask(), mask_of(unissued_cards))
+                self.assertEqual(deck.get_rank_counts(), rank_counts_of_mask(mask_of(unissued_cards)))
+                self.assertEqual(deck.count_remaining('A'), sum(card.is_ace() for card in unissued_cards))
+            self.assertEqual(deck.get_remaining_mask(), 0)
+
+    def test_composition_after_reset(self):
+        '''
+            Test the index is computed again when the cards are replaced, reshuffled, or the cursor moves back.
+        '''
+        self.deck._idx_of_next_card_to_issue = 50
+        self.assertEqual(self.deck.get_rank_counts()[12], 2)
+        self.deck._idx_of_next_card_to_issue = 0
+        self.assertEqual(self.deck.get_rank_counts(), [4] * 13)
+        self.deck.issue_card(Player('player_id', 0.3), num_cards_to_issue = 10)
+        self.deck.shuffle_cards()
+        self.assertEqual(self.deck.get_remaining_mask(), mask_of(self.deck.get_unissued_cards()))
+        self.deck.set_cards([Card('A', 'club'), Card('A', 'club'), Card('2', 'heart')])
+        self.deck._idx_of_next_card_to_issue = 0
+        self.assertEqual(self.deck.count_remaining('A'), 2)
+        self.assertEqual(cards_of_mask(self.deck.get_remaining_mask()), [Card('2', 'heart'), Card('A', 'club')])
+
+    def test_composition_kept_up_to_date(self):
+        '''
+            Test the index is updated by issuing, by swapping cards across the cursor and by returning the issued cards,
+            without being computed again on query.
+        '''
+        self.assertFalse(self.deck._is_composition_synced())
+        self.assertEqual(self.deck.count_remaining_value(1), 4)
+        self.deck.shuffle_cards(lazy = True)
+        self.deck.issue_card(Player('player_id', 0.3), num_cards_to_issue = 5)
+        self.deck._swap_card(2, 30)
+        self.deck._swap_card(40, 1)
+        self.assertTrue(self.deck._is_composition_synced())
+        self.assertEqual(self.deck._remaining_mask, mask_of(self.deck.get_unissued_cards()))
+        self.assertEqual(self.deck._rank_counts, rank_counts_of_mask(mask_of(self.deck.get_unissued_cards())))
+        self.deck.return_issued_cards()
+        self.assertTrue(self.deck._is_composition_synced())
+        self.assertEqual(self.deck._remaining_mask, (1 << 52) - 1)
+        self.assertEqual(self.deck._rank_counts, [4] * 13)
+
+    def test_remaining_mask_without(self):
+        self.deck._idx_of_next_card_to_issue = 48
+        mask = self.deck.get_remaining_mask_without([Card('A', 'club'), Card('K', 'club')])
+        self.assertEqual(cards_of_mask(mask), [Card('A', 'diamond'), Card('A', 'heart'), Card('A', 'spade')])
+        with self.assertRaises(ValueError):
+            self.deck.count_remaining('1')
+        with self.assertRaises(ValueError):
+            self.deck.count_remaining_value(11)
@@ -0,0 +1,77 @@
+import unittest
+import random
+from src.events import InitialHand, DrawDecision, FinalScore, RoundEnd, RoundRecord, iter_round_events, iter_rounds
+from src.game import Game
+from tests.test_game import initialize_deck_for_testcase
+
+
+class TestEvents(unittest.TestCase):
+    def setUp(self):
+        self.dealer_info = ('dealer', 0.3)
+        self.players_info = [('player1', 0.4), ('player2', 0.5)]
+
+    def test_iter_round_events_matches_game_state(self):
+        '''
+            Test the events of a round describe the hands the participants end up with.
+        '''
+        game = Game(self.dealer_info, self.players_info, rng = random.Random(3))
+        initialize_deck_for_testcase(game._deck)  # Initial hands: 2,2 for the dealer, 2,2 and 3,3 for the players.
+        events = list(iter_round_events(game))
+        participants = [game._dealer] + game._players
+        self.assertEqual(events[:3], [InitialHand(0, (0, 1)), InitialHand(1, (2, 3)), InitialHand(2, (4, 5))])
+        for seat, participant in enumerate(participants):
+            drawn = tuple(event.card for event in events if type(event) is DrawDecision and event.seat == seat and event.draws)
+            self.assertEqual(drawn, tuple(card.get_code() for card in participant.get_cards()[2:]))
+        self.assertEqual([event for event in events if type(event) is FinalScore],
+                         [FinalScore(seat, participant.calculate_score()) for seat, participant in enumerate(participants)])
+        winner_seats = tuple(seat for seat, participant in enumerate(participants) if any(participant is winner for winner in game.get_winners()))
+        self.assertEqual(events[-1], RoundEnd((), winner_seats))
+        self.assertTrue(game.is_game_end())
+
+    def test_iter_round_events_blackjack(self):
+        '''
+            Test a round ended by blackjack has no draws and no winners.
+        '''
+        game = Game(self.dealer_info, [('player1', 0.4)])
+        initialize_deck_for_testcase(game._deck)
+        game._deck._swap_card(0, 48)  # Dealer gets A,K.
+        game._deck._swap_card(1, 44)
+        events = list(iter_round_events(game))
+        self.assertFalse(any(type(event) is DrawDecision for event in events))
+        self.assertEqual(events[-1], RoundEnd((0,), ()))
+
+    def test_iter_round_events_stop_early(self):
+        '''
+            Test a consumer that stops after the initial hands leaves the turns unplayed.
+        '''
+        game = Game(self.dealer_info, self.players_info)
+        initialize_deck_for_testcase(game._deck)
+        events = iter_round_events(game)
+        for i in range(3):
+            next(events)
+        self.assertEqual(game._deck.get_num_remaining_cards(), 52 - 6)
+        self.assertEqual(game.get_turn_number(), 0)
+
+    def test_iter_rounds(self):
+        '''
+            Test iter_rounds yields the requested number of records and is reproducible with a seeded rng.
+        '''
+        records = list(iter_rounds(self.dealer_info, self.players_info, num_rounds = 50, rng = random.Random(5)))
+        self.assertEqual(len(records), 50)
+        self.assertEqual([record.round_number for record in records], list(range(50)))
+        for record in records:
+            self.assertIsInstance(record, RoundRecord)
+            self.assertEqual(len(record.initial_hands), 3)
+            self.assertEqual(len(record.final_scores), 3)
+            if record.blackjack_seats:
+                self.assertEqual(record.winner_seats, ())
+        self.assertEqual(records, list(iter_rounds(self.dealer_info, self.players_info, num_rounds = 50, rng = random.Random(5))))
+
+    def test_iter_rounds_unbounded(self):
+        '''
+            Test iter_rounds keeps playing until the consumer stops without num_rounds.
+        '''
+        rounds = iter_rounds(self.dealer_info, self.players_info, rng = random.Random(5))
+        self.assertEqual([next(rounds).round_number for i in range(1000)][-1], 999)
+        with self.assertRaises(ValueError):
+            next(iter_rounds(self.dealer_info, self.players_info, num_rounds = -1))
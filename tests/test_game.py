@@ -272,6 +272,44 @@ class TestGame(unittest.TestCase):
     # def test_run_player_turn_not_busted(self):
     
     
+    def test_play_round(self):
+        '''
+            Test play_round() deals the initial cards, plays every turn and returns the winners.
+        '''
+        game = Game(('dealer', 0.3),[('player1', 0.4), ('player2', 0.5)])
+        initialize_deck_for_testcase(game._deck)  # Initial hands: 2,2 for the dealer, 2,2 and 3,3 for the players.
+        blackjack_players, winners = game.play_round()
+        self.assertEqual(blackjack_players, [])
+        self.assertEqual(game.get_turn_number(), 2)
+        self.assertTrue(game.is_game_end())
+        best_score = max(participant.calculate_score() for participant in [game._dealer] + game._players)
+        self.assertEqual(winners, [participant for participant in [game._dealer] + game._players if participant.calculate_score() == best_score and participant.is_alive()])
+        
+    def test_play_round_ends_with_blackjacks(self):
+        '''
+            Test play_round() returns no winners when there are blackjacks after the initial deal.
+        '''
+        game = Game(('dealer', 0.3),[('player1', 0.4)])
+        initialize_deck_for_testcase(game._deck)
+        game._deck._swap_card(0, 48)  # Dealer gets A,K.
+        game._deck._swap_card(1, 44)
+        blackjack_players, winners = game.play_round()
+        self.assertEqual(blackjack_players, [game._dealer])
+        self.assertEqual(winners, [])
+        self.assertEqual(game._deck._idx_of_next_card_to_issue, 4)
+        
+    def test_rng_reproducible(self):
+        '''
+            Test two games with equally seeded random number generators play identical rounds.
+        '''
+        hands = []
+        for trial in range(2):
+            game = Game(('dealer', 0.3),[('player1', 0.4), ('player2', 0.5)], rng = random.Random(11))
+            game._deck.shuffle_cards()
+            game.play_round()
+            hands.append([participant.get_cards() for participant in [game._dealer] + game._players])
+        self.assertEqual(hands[0], hands[1])
+        
     def test_blackjacks(self):
         '''
             Test get_blackjacks() when there are blackjacks.
@@ -282,6 +320,47 @@ class TestGame(unittest.TestCase):
         game._players[0]._cards = [Card(face_value='10',suit = 'heart'), Card(face_value='10', suit = 'spade')]
         print([str(player) for player in game.get_blackjacks()])
         # self.assertEqual(game.get_blackjacks(), [Dealer(player_id='dealer',prob_to_draw=0.3)])
+
+    def test_reset_game_keeps_participants(self):
+        '''
+            Test reset_game() without arguments empties the hands in place and puts the cards back into the deck.
+        '''
+        game = Game(dealer_info=('dealer', 0.3), players_info=[('player1', 0.4), ('player2', 0.5)], rng = random.Random(6))
+        dealer, players, deck = game._dealer, game._players, game._deck
+        hand = players[0]._hand
+        game.play_round()
+        self.assertTrue(game.reset_game())
+        self.assertIs(game._dealer, dealer)
+        self.assertIs(game._players, players)
+        self.assertIs(game._deck, deck)
+        self.assertIs(players[0]._hand, hand)
+        self.assertEqual(game._turn_number, 0)
+        self.assertEqual(players[0].get_cards(), [])
+        self.assertEqual(players[0].calculate_score(), 0)
+        self.assertEqual(deck.get_num_remaining_cards(), 52)
+        rng = random.Random(8)
+        game = Game(dealer_info=('dealer', 0.3), players_info=[('player1', 0.4)], rng = rng)
+        game.reset_game(dealer_info=('dealer2', 0.2), players_info=[('player3', 0.1)])
+        self.assertEqual([player.get_player_id() for player in game.get_players()], ['player3'])
+        self.assertIs(game._dealer._rng, rng)
+        self.assertIs(game._players[0]._rng, rng)
+
+    def test_play_rounds(self):
+        '''
+            Test a session plays every round on the same objects, each round dealt from a full deck.
+        '''
+        game = Game(dealer_info=('dealer', 0.3), players_info=[('player1', 0.4), ('player2', 0.5)], rng = random.Random(7))
+        participants = [game._dealer] + game._players
+        num_rounds = 0
+        for blackjack_players, winners in game.play_rounds(50):
+            num_rounds += 1
+            num_cards_dealt = sum(len(participant.get_cards()) for participant in participants)
+            self.assertEqual(game._deck.get_num_remaining_cards(), 52 - num_cards_dealt)
+            self.assertEqual(sorted(card.get_code() for card in game._deck.get_cards()), list(range(52)))
+            self.assertTrue(all(any(winner is participant for participant in participants) for winner in winners))
+        self.assertEqual(num_rounds, 50)
+        with self.assertRaises(ValueError):
+            next(game.play_rounds(-1))
     
     
                  
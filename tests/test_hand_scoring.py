@@ -0,0 +1,89 @@
+import unittest
+import random
+import numpy as np
+from src.card import CANONICAL_CARDS
+from src.deck import Deck
+from src.player import Player
+from src.game import Game
+from src.hand_scoring import PAD, score_hands, get_hand_codes, resolve_rounds
+
+
+class TestHandScoring(unittest.TestCase):
+    def test_score_hands_matches_player(self):
+        '''
+            Test every field against Player for random hands of 1 to 12 cards, with extra Aces.
+        '''
+        rng = random.Random(1)
+        aces = [card for card in CANONICAL_CARDS if card.get_face_value() == 'A']
+        hands = []
+        for trial in range(2000):
+            hand = rng.sample(CANONICAL_CARDS, rng.randint(1, 10)) + rng.sample(aces, rng.randint(0, 2))
+            hands.append(hand)
+        codes = np.full((len(hands), 12), PAD, dtype=np.int8)
+        for row, hand in enumerate(hands):
+            codes[row, :len(hand)] = [card.get_code() for card in hand]
+        hand_scores = score_hands(codes)
+        player = Player('player_id', 0.0)
+        for row, hand in enumerate(hands):
+            player.set_cards(hand)
+            self.assertEqual(hand_scores.scores[row], player.calculate_score())
+            self.assertEqual(hand_scores.hard_totals[row], player.get_hard_total())
+            self.assertEqual(hand_scores.busted[row], not player.is_alive())
+            self.assertEqual(hand_scores.blackjacks[row], player.is_blackjack())
+            if player.is_alive():
+                self.assertEqual(hand_scores.soft_totals[row], player.calculate_score())
+
+    def test_score_hands_soft_totals(self):
+        codes = np.array([[48, 32, PAD], [48, 49, 0], [48, 36, PAD], [48, 36, 40]])
+        hand_scores = score_hands(codes)
+        self.assertEqual(hand_scores.hard_totals.tolist(), [11, 4, 11, 21])
+        self.assertEqual(hand_scores.soft_totals.tolist(), [21, 14, 21, 21])
+        self.assertEqual(hand_scores.blackjacks.tolist(), [True, False, True, False])
+
+    def test_score_hands_invalid(self):
+        with self.assertRaises(ValueError):
+            score_hands(np.array([1, 2]))
+        with self.assertRaises(ValueError):
+            score_hands(np.array([[52, PAD]]))
+        with self.assertRaises(ValueError):
+            score_hands(np.array([[-2, PAD]]))
+
+    def test_resolve_rounds_matches_play_round(self):
+        rng = random.Random(2)
+        games = []
+        expected = []
+        for trial in range(300):
+            players_info = [(f'player{i}', rng.random()) for i in range(rng.randint(1, 5))]
+            deck = Deck(rng)
+            deck.shuffle_cards()
+            game = Game(('dealer_id', rng.random()), players_info, deck = deck, rng = rng)
+            games.append(game)
+            expected.append(game.play_round())
+        blackjacks, winners = resolve_rounds(games)
+        self.assertEqual(blackjacks.shape, (300, 6))
+        for game, (blackjack_players, round_winners), game_blackjacks, game_winners in zip(games, expected, blackjacks, winners):
+            participants = [game._dealer] + game._players
+            self.assertEqual([participant for participant, flag in zip(participants, game_blackjacks) if flag], blackjack_players)
+            self.assertEqual([participant for participant, flag in zip(participants, game_winners) if flag], round_winners)
+            self.assertFalse(game_blackjacks[len(participants):].any())
+            self.assertFalse(game_winners[len(participants):].any())
+            self.assertEqual(game.resolve_round(), (blackjack_players, round_winners))
+
+    def test_get_hand_codes(self):
+        game = Game(('dealer_id', 0.0), [('player1', 0.0)], rng = random.Random(3))
+        game._deck.shuffle_cards()
+        game.assign_initial_two_cards()
+        other = Game(('dealer_id', 0.0), [('player1', 0.0), ('player2', 0.0)], rng = random.Random(4))
+        other._deck.shuffle_cards()
+        other.assign_initial_two_cards()
+        other._deck.issue_card(other._players[1])
+        codes, seat_mask = get_hand_codes([game, other])
+        self.assertEqual(codes.shape, (2, 3, 3))
+        self.assertEqual(seat_mask.tolist(), [[True, True, False], [True, True, True]])
+        self.assertEqual(codes[0, 0].tolist(), [card.get_code() for card in game._dealer.get_cards()] + [PAD])
+        self.assertEqual(codes[0, 2].tolist(), [PAD] * 3)
+        self.assertEqual(codes[1, 2].tolist(), [card.get_code() for card in other._players[1].get_cards()])
+
+
+if __name__ == '__main__':
+    unittest.main()
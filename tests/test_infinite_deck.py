@@ -0,0 +1,68 @@
+import unittest
+import random
+from collections import Counter
+from src.card import Card, CANONICAL_CARDS
+from src.player import Player
+from src.game import Game
+from src.infinite_deck import InfiniteDeck
+from src.simulation import run_rounds
+
+
+class TestInfiniteDeck(unittest.TestCase):
+    def setUp(self):
+        self.deck = InfiniteDeck(random.Random(1), batch_size = 5)
+        self.player = Player('player_id', 0.3)
+
+    def test_never_runs_out(self):
+        num_remaining_cards = self.deck.get_num_remaining_cards()
+        self.deck.issue_card(self.player, num_cards_to_issue = 200)
+        self.assertEqual(len(self.player.get_cards()), 200)
+        self.assertEqual(self.deck.get_num_cards_issued(), 200)
+        self.assertEqual(num_remaining_cards - self.deck.get_num_remaining_cards(), 200)
+        self.assertEqual(self.deck.get_cards(), list(CANONICAL_CARDS))
+        self.assertFalse(self.deck.reshuffle_if_needed())
+
+    def test_samples_with_replacement(self):
+        '''
+            Test every card of the composition is dealt about in proportion to its number of copies.
+        '''
+        deck = InfiniteDeck(random.Random(2), cards = [Card('A', 'club')] * 3 + [Card('2', 'club')])
+        deck.issue_card(self.player, num_cards_to_issue = 4000)
+        counts = Counter(card.get_face_value() for card in self.player.get_cards())
+        self.assertAlmostEqual(counts['A'] / 4000, 0.75, delta = 0.03)
+
+    def test_same_seed_same_cards(self):
+        other_player = Player('other_id', 0.3)
+        InfiniteDeck(random.Random(3)).issue_card(self.player, num_cards_to_issue = 30)
+        InfiniteDeck(random.Random(3)).issue_card(other_player, num_cards_to_issue = 30)
+        self.assertEqual(self.player.get_cards(), other_player.get_cards())
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            InfiniteDeck(cards = [])
+        with self.assertRaises(TypeError):
+            InfiniteDeck(cards = ['A'])
+        with self.assertRaises(ValueError):
+            InfiniteDeck(batch_size = 0)
+
+    def test_game(self):
+        game = Game(('dealer_id', 0.3), [('player1', 0.5), ('player2', 0.5)], deck = self.deck, rng = random.Random(4))
+        self.assertEqual(game.get_max_num_players(), 25)
+        game.play_round()
+        self.assertGreaterEqual(self.deck.get_num_cards_issued(), 6)
+        with self.assertRaises(TypeError):
+            game.to_bytes()
+
+    def test_run_rounds(self):
+        '''
+            Test the win rates of an infinite deck are close to those of a finite one.
+        '''
+        finite = run_rounds(('dealer_id', 0.3), [('player1', 0.4)], 4000, seed = 5)
+        infinite = run_rounds(('dealer_id', 0.3), [('player1', 0.4)], 4000, seed = 5, infinite_deck = True)
+        self.assertEqual(infinite.get_num_rounds(), 4000)
+        for participant_id, win_rate in finite.get_win_rates().items():
+            self.assertAlmostEqual(infinite.get_win_rates()[participant_id], win_rate, delta = 0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+import random
+from src.instrumentation import GameStats, PHASES
+from src.game import Game
+from src.player import Player
+from src.simulation import run_simulation
+from tests.test_game import initialize_deck_for_testcase
+
+
+class TestGameStats(unittest.TestCase):
+    def test_record_phase_histogram(self):
+        '''
+            Test latencies land in power-of-two buckets and percentiles are bounded by the max latency.
+        '''
+        stats = GameStats()
+        for elapsed_ns in [1, 3, 1000, 1500, 0]:
+            stats.record_phase('deal', elapsed_ns)
+        snapshot = stats.snapshot()['phases']['deal']
+        self.assertEqual(snapshot['count'], 5)
+        self.assertEqual(snapshot['total_ns'], 2504)
+        self.assertEqual(snapshot['max_ns'], 1500)
+        self.assertEqual(snapshot['histogram'][0], 2)
+        self.assertEqual(snapshot['histogram'][1], 1)
+        self.assertEqual(snapshot['histogram'][9], 1)
+        self.assertEqual(snapshot['histogram'][10], 1)
+        self.assertEqual(stats.get_percentile_ns('deal', 50), 4)
+        self.assertEqual(stats.get_percentile_ns('deal', 100), 1500)
+        self.assertEqual(stats.get_percentile_ns('winners', 50), 0)
+
+    def test_merge(self):
+        stats = GameStats()
+        other = GameStats()
+        stats.record_phase('round', 100)
+        other.record_phase('round', 300)
+        other._cards_issued = 7
+        self.assertTrue(stats.merge(other))
+        self.assertEqual(stats.get_cards_issued(), 7)
+        self.assertEqual(stats.snapshot()['phases']['round']['count'], 2)
+        self.assertAlmostEqual(stats.get_rounds_per_sec(), 2 / 400 * 1e9)
+
+
+class TestGameInstrumentation(unittest.TestCase):
+    def test_disabled_by_default(self):
+        game = Game(('dealer', 0.3), [('player1', 0.4)])
+        self.assertIsNone(game.get_stats())
+        self.assertNotIn('calculate_score', game._dealer.__dict__)
+
+    def test_counters_match_round(self):
+        '''
+            Test the counters of an instrumented round match the cards dealt and the decisions taken.
+        '''
+        game = Game(('dealer', 0.3), [('player1', 0.4), ('player2', 0.5)], rng = random.Random(2))
+        stats = game.enable_instrumentation()
+        game._deck.shuffle_cards()
+        blackjack_players, winners = game.play_round()
+        num_cards_issued = 52 - game._deck.get_num_remaining_cards()
+        self.assertEqual(stats.get_cards_issued(), num_cards_issued)
+        self.assertGreater(stats.get_score_calls(), 0)
+        snapshot = stats.snapshot()
+        self.assertEqual(snapshot['phases']['deal']['count'], 1)
+        self.assertEqual(snapshot['phases']['round']['count'], 1)
+        if not blackjack_players:
+            self.assertEqual(snapshot['phases']['player_turn']['count'], 2)
+            self.assertEqual(snapshot['phases']['winners']['count'], 1)
+            self.assertGreaterEqual(stats.get_draw_decisions(), num_cards_issued - 6)
+
+    def test_draw_decisions(self):
+        '''
+            Test a dealer forced to draw 4 and 7 from 3,3 takes two decisions to draw and one to stop.
+            Deck order as in test_run_dealer_turn_initial_score_below_17_not_busted.
+        '''
+        game = Game(('dealer', 0.0), [('player1', 0.0)])
+        initialize_deck_for_testcase(game._deck)
+        game._deck._swap_card(6, 8)
+        game._deck._swap_card(7, 21)  # Next cards to issue are 4 and 7.
+        game._deck._idx_of_next_card_to_issue = 6
+        game._dealer._cards = [game._deck._cards[4], game._deck._cards[5]]  # 3,3.
+        stats = game.enable_instrumentation()
+        game.run_dealer_turn()
+        self.assertEqual(game._dealer.calculate_score(), 17)
+        self.assertEqual(stats.get_cards_issued(), 2)
+        self.assertEqual(stats.get_draw_decisions(), 3)
+
+    def test_disable_instrumentation(self):
+        game = Game(('dealer', 0.3), [('player1', 0.4)])
+        stats = game.enable_instrumentation()
+        game.add_player(Player('player2', 0.5))
+        game._players[1].calculate_score()
+        self.assertEqual(stats.get_score_calls(), 1)
+        self.assertTrue(game.disable_instrumentation())
+        game._players[1].calculate_score()
+        self.assertEqual(stats.get_score_calls(), 1)
+        self.assertIsNone(game.get_stats())
+
+    def test_run_simulation_instrumented(self):
+        result = run_simulation(('dealer', 0.3), [('player1', 0.4)], 200, num_workers = 1, seed = 3, instrument = True)
+        stats = result.get_stats()
+        self.assertEqual(stats.snapshot()['phases']['round']['count'], 200)
+        self.assertEqual(set(stats.snapshot()['phases']), set(PHASES))
+        self.assertGreater(stats.get_rounds_per_sec(), 0)
+        self.assertIsNone(run_simulation(('dealer', 0.3), [('player1', 0.4)], 10, num_workers = 1, seed = 3).get_stats())
@@ -0,0 +1,85 @@
+import unittest
+import src.optimizer
+from src.optimizer import optimize_prob_to_draw, CandidateResult
+from src.policy import BasicStrategyPolicy
+
+
+class TestOptimizer(unittest.TestCase):
+    def setUp(self):
+        self.dealer_info = ('dealer', 0.3)
+        self.players_info = [('player1', 0.3), ('player2', 0.5)]
+
+    def test_grid_search(self):
+        result = optimize_prob_to_draw(self.dealer_info, self.players_info, 'player2', grid = [0.0, 0.5, 1.0],
+                                       num_rounds = 500, num_workers = 1, seed = 1)
+        self.assertEqual(result.player_id, 'player2')
+        self.assertEqual([candidate.prob_to_draw for candidate in result.candidates], [0.0, 0.5, 1.0])
+        self.assertEqual(result.best.wins, max(candidate.wins for candidate in result.candidates))
+        self.assertEqual((result.best.diff_ci_low, result.best.diff_ci_high), (0.0, 0.0))
+        for candidate in result.candidates:
+            self.assertIsInstance(candidate, CandidateResult)
+            self.assertEqual(candidate.num_rounds, 500)
+            self.assertLessEqual(candidate.ci_low, candidate.win_rate)
+            self.assertGreaterEqual(candidate.ci_high, candidate.win_rate)
+        # Always drawing busts every hand.
+        self.assertEqual(result.candidates[-1].wins, 0)
+        self.assertLess(result.candidates[-1].diff_ci_high, 0)
+
+    def test_common_random_numbers(self):
+        '''
+            Test candidates play the same shuffles: nearly equal probabilities give nearly equal round by round results,
+            so their paired difference is far narrower than the interval of either win rate.
+        '''
+        result = optimize_prob_to_draw(self.dealer_info, self.players_info, 'player1', grid = [0.3, 0.31],
+                                       num_rounds = 2000, num_workers = 1, seed = 2)
+        first, second = result.candidates
+        self.assertLess(second.diff_ci_high - second.diff_ci_low + first.diff_ci_high - first.diff_ci_low,
+                        (first.ci_high - first.ci_low) / 2)
+
+    def test_common_random_numbers_past_pre_drawn(self):
+        '''
+            Test candidates still play the same shuffles when seats make more decisions in a turn than the numbers
+            drawn for them before the round.
+        '''
+        max_decisions = src.optimizer._MAX_DECISIONS_PER_TURN
+        src.optimizer._MAX_DECISIONS_PER_TURN = 1
+        try:
+            result = optimize_prob_to_draw(self.dealer_info, self.players_info, 'player1', grid = [0.3, 0.31],
+                                           num_rounds = 2000, num_workers = 1, seed = 2)
+        finally:
+            src.optimizer._MAX_DECISIONS_PER_TURN = max_decisions
+        first, second = result.candidates
+        self.assertLess(second.diff_ci_high - second.diff_ci_low + first.diff_ci_high - first.diff_ci_low,
+                        (first.ci_high - first.ci_low) / 2)
+
+    def test_refinement(self):
+        result = optimize_prob_to_draw(self.dealer_info, self.players_info, 'player1', grid = [0.0, 0.4, 0.8],
+                                       num_rounds = 300, num_refinements = 2, num_workers = 1, seed = 3)
+        self.assertGreater(len(result.candidates), 3)
+        probs = [candidate.prob_to_draw for candidate in result.candidates]
+        self.assertEqual(probs, sorted(probs))
+        self.assertTrue(all(0 <= prob_to_draw <= 1 for prob_to_draw in probs))
+
+    def test_reproducible_over_processes(self):
+        result = optimize_prob_to_draw(self.dealer_info, self.players_info, 'player1', grid = [0.2, 0.6],
+                                       num_rounds = 400, num_workers = 2, seed = 4)
+        self.assertEqual(result, optimize_prob_to_draw(self.dealer_info, self.players_info, 'player1', grid = [0.2, 0.6],
+                                                       num_rounds = 400, num_workers = 2, seed = 4))
+        self.assertEqual(result.best.num_rounds, 400)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            optimize_prob_to_draw(self.dealer_info, self.players_info, 'nobody', num_workers = 1)
+        with self.assertRaises(ValueError):
+            optimize_prob_to_draw(self.dealer_info, self.players_info, 'player1', grid = [1.5], num_workers = 1)
+        with self.assertRaises(ValueError):
+            optimize_prob_to_draw(self.dealer_info, self.players_info, 'player1', num_rounds = 0, num_workers = 1)
+        with self.assertRaises(ValueError):
+            optimize_prob_to_draw(self.dealer_info, self.players_info, 'player1', confidence = 1.0, num_workers = 1)
+        with self.assertRaises(TypeError):
+            optimize_prob_to_draw(self.dealer_info, [('player1', 0.3), ('player2', 0.5, BasicStrategyPolicy())], 'player1',
+                                  num_workers = 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,5 @@
 import unittest
-from src.player import Player, Dealer
+from src.player import Player, Dealer, HandState
 from src.card import Card
 
 class TestPlayer(unittest.TestCase):
@@ -429,4 +429,82 @@ class TestPlayer(unittest.TestCase):
             num_trials = int(1e5)
             for trial in range(num_trials):
                 num_draws += self.dealer.draw()
-            self.assertAlmostEqual(num_draws/num_trials,0.4, delta=0.01)
\ No newline at end of file
+            self.assertAlmostEqual(num_draws/num_trials,0.4, delta=0.01)
+
+    def test_hand_state_empty_hand(self):
+        '''
+            Check the hand state of a player without cards.
+        '''
+        self.assertEqual(self.player.get_hand_state(), HandState(hard_total=0, num_aces=0, is_soft=False, score=0))
+        
+    def test_hand_state_not_changed_through_get_cards(self):
+        '''
+            Check the hand and its score can not be changed through the list returned by get_cards() or by changing
+            a Card object after giving it to the player.
+        '''
+        card = Card('5', 'heart')
+        cards = [Card('10', 'club'), card]
+        self.player.set_cards(cards)
+        self.player.get_cards()[1] = Card('A', 'club')
+        cards.append(Card('2', 'club'))
+        card.set_face_value('A')
+        self.assertEqual(self.player.get_cards(), [Card('10', 'club'), Card('5', 'heart')])
+        self.assertEqual(self.player.calculate_score(), 15)
+        added_card = Card('3', 'club')
+        self.player.add_card(added_card)
+        added_card.set_suit('heart')
+        self.assertEqual(self.player.get_cards()[-1], Card('3', 'club'))
+        self.assertEqual(self.player.calculate_score(), 18)
+
+    def test_hand_state_updated_by_add_card(self):
+        '''
+            Check the running hard total, number of Aces and soft flag as cards are added one by one.
+        '''
+        self.player.add_card(Card('A', 'spade'))
+        self.assertEqual(self.player.get_hand_state(), HandState(1, 1, True, 11))
+        self.player.add_card(Card('6', 'heart'))
+        self.assertEqual(self.player.get_hand_state(), HandState(7, 1, True, 17))
+        self.player.add_card(Card('A', 'club'))
+        self.assertEqual(self.player.get_hand_state(), HandState(8, 2, True, 18))
+        self.player.add_card(Card('K', 'club'))
+        self.assertEqual(self.player.get_hand_state(), HandState(18, 2, False, 18))
+        self.player.add_card(Card('5', 'club'))
+        self.assertEqual(self.player.get_hand_state(), HandState(23, 2, False, -1))
+        self.assertFalse(self.player.is_alive())
+        
+    def test_hand_state_after_set_cards(self):
+        '''
+            Check the hand state is recomputed when the cards at hand are replaced.
+        '''
+        self.player.set_cards([Card('A', 'diamond'), Card('K', 'heart')])
+        self.assertEqual(self.player.get_hard_total(), 11)
+        self.assertEqual(self.player.get_num_aces(), 1)
+        self.assertTrue(self.player.is_soft())
+        self.assertTrue(self.player.is_blackjack())
+        self.player._cards = [Card('9', 'diamond'), Card('K', 'heart')]
+        self.assertEqual(self.player.calculate_score(), 19)
+        self.assertFalse(self.player.is_soft())
+        self.assertFalse(self.player.is_blackjack())
+        
+    def test_hand_state_after_direct_append(self):
+        '''
+            Check the hand state stays correct when cards are appended to the list of cards directly.
+        '''
+        self.player._cards.append(Card('10', 'diamond'))
+        self.player._cards.append(Card('10', 'heart'))
+        self.assertEqual(self.player.calculate_score(), 20)
+        self.player._cards.append(Card('2', 'heart'))
+        self.assertFalse(self.player.is_alive())
+        
+    def test_hand_state_matches_rescan(self):
+        '''
+            Check the incremental score against a rescan of the cards for every hand built from a full deck in order.
+        '''
+        for start in range(52):
+            player = Player('player_id', 0.3)
+            for code in range(start, min(start + 6, 52)):
+                player.add_card(Card.from_code(code))
+                rescanned_player = Player('player_id', 0.3)
+                rescanned_player._cards = list(player._cards)
+                self.assertEqual(player.calculate_score(), rescanned_player.calculate_score())
+                self.assertEqual(player.get_hand_state(), rescanned_player.get_hand_state())
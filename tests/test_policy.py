@@ -0,0 +1,125 @@
+import unittest
+import random
+from src.card import Card
+from src.player import Player, Dealer
+from src.game import Game
+from src.policy import (Policy, ProbabilisticPolicy, LookupTablePolicy, BasicStrategyPolicy, build_table,
+                        PROBABILISTIC_POLICY, DEALER_POLICY)
+from src.simulation import run_rounds
+
+
+class AlwaysDraw(Policy):
+    def should_draw(self, player: Player, dealer_upcard: Card = None) -> bool:
+        return True
+
+
+class TestPolicy(unittest.TestCase):
+    def setUp(self):
+        self.policy = BasicStrategyPolicy()
+        self.player = Player('player_id', 0.0, policy = self.policy)
+
+    def decide(self, cards: list[tuple[str, str]], upcard: str) -> bool:
+        self.player.set_cards([Card(face_value, suit) for face_value, suit in cards])
+        return self.player.draw(Card(upcard, 'club'))
+
+    def test_default_policies(self):
+        self.assertIs(Player('player_id', 0.3).get_policy(), PROBABILISTIC_POLICY)
+        self.assertIs(Dealer('dealer_id', 0.3).get_policy(), DEALER_POLICY)
+        self.assertIsInstance(DEALER_POLICY, ProbabilisticPolicy)
+
+    def test_policy_is_abstract(self):
+        with self.assertRaises(TypeError):
+            Policy()
+
+    def test_has_default_policy(self):
+        self.assertTrue(Player('player_id', 0.3).has_default_policy())
+        self.assertTrue(Player('player_id', 0.3, policy = ProbabilisticPolicy()).has_default_policy())
+        self.assertTrue(Dealer('dealer_id', 0.3).has_default_policy())
+        self.assertFalse(Dealer('dealer_id', 0.3, policy = PROBABILISTIC_POLICY).has_default_policy())
+        self.assertFalse(self.player.has_default_policy())
+
+    def test_set_policy_invalid(self):
+        with self.assertRaises(TypeError):
+            self.player.set_policy(lambda player, upcard: True)
+
+    def test_basic_strategy_hard_totals(self):
+        self.assertTrue(self.decide([('5', 'club'), ('6', 'heart')], '10'))
+        self.assertFalse(self.decide([('10', 'club'), ('2', 'heart')], '5'))
+        self.assertTrue(self.decide([('10', 'club'), ('2', 'heart')], '3'))
+        self.assertFalse(self.decide([('10', 'club'), ('6', 'heart')], '6'))
+        self.assertTrue(self.decide([('10', 'club'), ('6', 'heart')], 'K'))
+        self.assertTrue(self.decide([('10', 'club'), ('6', 'heart')], 'A'))
+        self.assertFalse(self.decide([('10', 'club'), ('7', 'heart')], 'A'))
+
+    def test_basic_strategy_soft_totals(self):
+        self.assertTrue(self.decide([('A', 'club'), ('6', 'heart')], '2'))
+        self.assertFalse(self.decide([('A', 'club'), ('7', 'heart')], '8'))
+        self.assertTrue(self.decide([('A', 'club'), ('7', 'heart')], '9'))
+        self.assertTrue(self.decide([('A', 'club'), ('7', 'heart')], 'A'))
+        self.assertFalse(self.decide([('A', 'club'), ('8', 'heart')], 'A'))
+        # An Ace that can no longer count as 11 makes the hand hard.
+        self.assertTrue(self.decide([('A', 'club'), ('5', 'heart'), ('10', 'spade')], '7'))
+        self.assertFalse(self.decide([('A', 'club'), ('5', 'heart'), ('10', 'spade')], '6'))
+
+    def test_basic_strategy_unknown_upcard(self):
+        self.player.set_cards([Card('2', 'club'), Card('3', 'club')])
+        self.assertFalse(self.player.draw())
+
+    def test_lookup_table(self):
+        policy = LookupTablePolicy(build_table(lambda score, is_soft, upcard_value: score < upcard_value + 5), default = True)
+        player = Player('player_id', 0.0, policy = policy)
+        player.set_cards([Card('10', 'club'), Card('4', 'club')])
+        self.assertTrue(player.draw(Card('10', 'heart')))
+        self.assertFalse(player.draw(Card('9', 'heart')))
+        self.assertTrue(player.draw())
+        self.assertEqual(policy, LookupTablePolicy(policy.get_table(), default = True))
+        with self.assertRaises(ValueError):
+            LookupTablePolicy(bytes(10))
+
+    def test_dealer_policy(self):
+        dealer = Dealer('dealer_id', 0.0)
+        dealer.set_cards([Card('10', 'club'), Card('6', 'club')])
+        self.assertTrue(dealer.draw())
+        dealer.add_card(Card('A', 'club'))
+        self.assertFalse(dealer.draw())
+        dealer.set_policy(AlwaysDraw())
+        self.assertTrue(dealer.draw())
+
+    def test_game_uses_policy(self):
+        '''
+            Test a player given a policy in players_info draws until busted or the deck is empty.
+        '''
+        game = Game(('dealer_id', 0.0), [('player1', 0.0, AlwaysDraw()), ('player2', 0.0)], rng = random.Random(1))
+        game._deck.shuffle_cards()
+        game.assign_initial_two_cards()
+        game.run_dealer_turn()
+        game.run_player_turn()
+        game.run_player_turn()
+        self.assertFalse(game._players[0].is_alive())
+        self.assertEqual(len(game._players[1].get_cards()), 2)
+
+    def test_game_passes_dealer_upcard(self):
+        upcards = []
+
+        class RecordUpcard(Policy):
+            def should_draw(self, player: Player, dealer_upcard: Card = None) -> bool:
+                upcards.append(dealer_upcard)
+                return False
+        game = Game(('dealer_id', 0.0), [('player1', 0.0, RecordUpcard())], rng = random.Random(2))
+        game._deck.shuffle_cards()
+        game.assign_initial_two_cards()
+        game.run_dealer_turn()
+        game.run_player_turn()
+        self.assertEqual(len(upcards), 1)
+        self.assertIs(upcards[0], game._dealer.get_cards()[0])
+
+    def test_basic_strategy_beats_coin_flip(self):
+        '''
+            Test basic strategy wins more rounds than drawing with probability 0.5 from the same seats.
+        '''
+        result = run_rounds(('dealer_id', 0.0), [('basic', 0.0, BasicStrategyPolicy()), ('coin', 0.5)], 3000, seed = 1)
+        self.assertGreater(result.get_wins()['basic'], result.get_wins()['coin'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,289 @@
+import unittest
+import random
+import time
+from src.probability import DealerOutcomeCalculator, WinProbabilityCalculator, composition_of, composition_key
+from src.card import Card, CANONICAL_CARDS
+from src.game import Game
+from src.policy import BasicStrategyPolicy
+
+
+class TestDealerOutcomeCalculator(unittest.TestCase):
+    def setUp(self):
+        self.calculator = DealerOutcomeCalculator(prob_to_draw = 0.3)
+
+    def test_constructor_fail_invalid_inputs(self):
+        with self.assertRaises(ValueError):
+            DealerOutcomeCalculator(prob_to_draw = 1.5)
+        with self.assertRaises(TypeError):
+            DealerOutcomeCalculator(prob_to_draw = '0.3')
+        with self.assertRaises(ValueError):
+            DealerOutcomeCalculator(prob_to_draw = 0.3, max_cache_size = 0)
+
+    def test_composition(self):
+        '''
+            Test cards are counted by hard value and packed with 8 bits per value.
+        '''
+        counts = composition_of([Card('A', 'club'), Card('A', 'heart'), Card('K', 'club'), Card('10', 'club'), Card('2', 'spade')])
+        self.assertEqual(counts, [2, 1, 0, 0, 0, 0, 0, 0, 0, 2])
+        self.assertEqual(composition_key(counts), 2 | 1 << 8 | 2 << 72)
+        self.assertEqual(composition_of(CANONICAL_CARDS), [4] * 9 + [16])
+
+    def test_stand_without_draws(self):
+        '''
+            Test a dealer at 17 with probability of drawing 0 always stands.
+        '''
+        calculator = DealerOutcomeCalculator(prob_to_draw = 0)
+        self.assertEqual(calculator.get_final_score_distribution([Card('10', 'club'), Card('7', 'club')], list(CANONICAL_CARDS[:8])), {17: 1.0})
+
+    def test_forced_draws_small_deck(self):
+        '''
+            Test the distribution on a small deck enumerated by hand.
+            Dealer has 10,5 and must draw. Remaining cards: 2, 6, 10.
+            Drawing 2 gives 17 and drawing 6 gives 21. Then the dealer draws again with probability 0.3 and busts.
+            Drawing 10 busts.
+        '''
+        remaining_cards = [Card('2', 'club'), Card('6', 'club'), Card('J', 'club')]
+        distribution = self.calculator.get_final_score_distribution([Card('10', 'club'), Card('5', 'club')], remaining_cards)
+        self.assertAlmostEqual(distribution[17], 1/3 * 0.7)
+        self.assertAlmostEqual(distribution[21], 1/3 * 0.7)
+        self.assertAlmostEqual(distribution[-1], 1/3 + 2/3 * 0.3)
+
+    def test_runs_out_of_cards(self):
+        '''
+            Test the dealer stops below 17 when no cards remain.
+        '''
+        distribution = self.calculator.get_final_score_distribution([Card('2', 'club')], [Card('3', 'club')])
+        self.assertEqual(distribution, {5: 1.0})
+
+    def test_distribution_sums_to_one(self):
+        '''
+            Test the probabilities of every upcard sum to one.
+        '''
+        for upcard in CANONICAL_CARDS[::4]:
+            remaining_cards = [card for card in CANONICAL_CARDS if card is not upcard]
+            distribution = self.calculator.get_final_score_distribution([upcard], remaining_cards)
+            self.assertAlmostEqual(sum(distribution.values()), 1.0)
+            self.assertTrue(all(score == -1 or 17 <= score <= 21 for score in distribution))
+
+    def test_matches_run_dealer_turn(self):
+        '''
+            Compare the exact distribution with Game.run_dealer_turn from an upcard of 6 on shuffled remaining cards.
+            It uses monte carlo simulation with tolerance level set to 0.015.
+        '''
+        upcard = Card('6', 'heart')
+        remaining_cards = [card for card in CANONICAL_CARDS if card != upcard]
+        distribution = self.calculator.get_final_score_distribution([upcard], remaining_cards)
+        rng = random.Random(0)
+        num_trials = 20000
+        counter = {}
+        for trial in range(num_trials):
+            game = Game(('dealer', 0.3), [('player1', 0.4)], rng = rng)
+            game._deck._cards = list(remaining_cards)
+            game._deck.shuffle_cards()
+            game._dealer._cards = [upcard]
+            game.run_dealer_turn()
+            score = game._dealer.calculate_score()
+            counter[score] = counter.get(score, 0) + 1
+        for score, prob in distribution.items():
+            self.assertAlmostEqual(counter.get(score, 0) / num_trials, prob, delta = 0.015)
+
+    def test_cache_bounded(self):
+        '''
+            Test the cache never grows over its max size and results do not depend on evictions.
+        '''
+        calculator = DealerOutcomeCalculator(prob_to_draw = 0.3, max_cache_size = 50)
+        remaining_cards = list(CANONICAL_CARDS[4:])
+        distribution = calculator.get_final_score_distribution([Card('2', 'club')], remaining_cards)
+        self.assertLessEqual(calculator.get_cache_size(), 50)
+        expected = self.calculator.get_final_score_distribution([Card('2', 'club')], remaining_cards)
+        for score in expected:
+            self.assertAlmostEqual(distribution[score], expected[score])
+        self.assertTrue(calculator.clear_cache())
+        self.assertEqual(calculator.get_cache_size(), 0)
+
+
+class TestWinProbabilityCalculator(unittest.TestCase):
+    def setUp(self):
+        self.calculator = WinProbabilityCalculator()
+
+    def make_game(self, hands: list[list[Card]], remaining_cards: list[Card], turn_number: int) -> Game:
+        '''
+            A helper function for a game with dealer 0.3 and players 0.4 and 0.5 in the middle of a round.
+            hands: the cards of the dealer and of each player.
+        '''
+        game = Game(('dealer', 0.3), [('player1', 0.4), ('player2', 0.5)])
+        game._deck._cards = list(remaining_cards)
+        for participant, cards in zip([game._dealer] + game._players, hands):
+            participant._cards = list(cards)
+        game._turn_number = turn_number
+        return game
+
+    def test_constructor_fail_invalid_inputs(self):
+        with self.assertRaises(ValueError):
+            WinProbabilityCalculator(max_cache_size = 0)
+        with self.assertRaises(ValueError):
+            WinProbabilityCalculator(max_num_states = 0)
+
+    def test_everyone_done(self):
+        '''
+            Test the winners are certain once everyone had their turn, including ties.
+        '''
+        hands = [[Card('10', 'club'), Card('8', 'club')], [Card('9', 'club'), Card('9', 'heart')], [Card('10', 'heart'), Card('5', 'club')]]
+        game = self.make_game(hands, [Card('2', 'club')], turn_number = 2)
+        self.assertEqual(self.calculator.get_win_probabilities(game), {'dealer': 1.0, 'player1': 1.0, 'player2': 0.0})
+
+    def test_last_player_small_deck(self):
+        '''
+            Test the probabilities on a small deck enumerated by hand.
+            Dealer has 18, player1 has 19 and player2 has 15 with remaining cards 4 and 10.
+            player2 stands with probability 0.5, draws 4 and reaches 19 with probability 0.25, or busts.
+            After drawing 4 player2 draws again with probability 0.5 and busts.
+        '''
+        hands = [[Card('10', 'club'), Card('8', 'club')], [Card('9', 'club'), Card('10', 'heart')], [Card('10', 'spade'), Card('5', 'club')]]
+        game = self.make_game(hands, [Card('4', 'club'), Card('K', 'club')], turn_number = 1)
+        probs = self.calculator.get_win_probabilities(game)
+        self.assertEqual(probs['dealer'], 0.0)
+        self.assertAlmostEqual(probs['player1'], 1.0)
+        self.assertAlmostEqual(probs['player2'], 0.25 * 0.5)
+
+    def test_dealer_turn_done(self):
+        '''
+            Test the dealer below 17 only draws if its turn has not been run.
+        '''
+        hands = [[Card('10', 'club'), Card('6', 'club')], [Card('10', 'heart'), Card('5', 'heart')], [Card('10', 'spade'), Card('4', 'club')]]
+        calculator = WinProbabilityCalculator()
+        game = self.make_game(hands, [Card('K', 'club')], turn_number = 0)
+        game._players[0].set_prob_to_draw(0)
+        game._players[1].set_prob_to_draw(0)
+        self.assertEqual(calculator.get_win_probabilities(game), {'dealer': 0.0, 'player1': 1.0, 'player2': 0.0})
+        self.assertEqual(calculator.get_win_probabilities(game, dealer_turn_done = True), {'dealer': 1.0, 'player1': 0.0, 'player2': 0.0})
+
+    def test_policy_fail(self):
+        '''
+            Test a player still to draw with a policy other than drawing with prob_to_draw is refused,
+            while a player who is done can have any policy.
+        '''
+        hands = [[Card('10', 'club'), Card('8', 'club')], [Card('9', 'club'), Card('10', 'heart')], [Card('10', 'spade'), Card('5', 'club')]]
+        game = self.make_game(hands, [Card('4', 'club'), Card('K', 'club')], turn_number = 1)
+        game._players[0].set_policy(BasicStrategyPolicy())
+        self.calculator.get_win_probabilities(game)
+        game._players[1].set_policy(BasicStrategyPolicy())
+        with self.assertRaises(TypeError):
+            self.calculator.get_win_probabilities(game)
+
+    def test_matches_monte_carlo(self):
+        '''
+            Compare the probabilities with playing out the rest of the round after the dealer's turn.
+            It uses monte carlo simulation with tolerance level set to 0.015.
+        '''
+        hands = [[Card('10', 'club'), Card('7', 'club')], [Card('9', 'club'), Card('4', 'heart')], [Card('A', 'spade'), Card('5', 'club')]]
+        remaining_cards = [card for card in CANONICAL_CARDS if not any(card == hand_card for hand in hands for hand_card in hand)]
+        probs = self.calculator.get_win_probabilities(self.make_game(hands, remaining_cards, turn_number = 0), dealer_turn_done = True)
+        rng = random.Random(0)
+        num_trials = 20000
+        counter = {'dealer': 0, 'player1': 0, 'player2': 0}
+        for trial in range(num_trials):
+            game = self.make_game(hands, remaining_cards, turn_number = 0)
+            for participant in [game._dealer] + game._players:
+                participant.set_rng(rng)
+            game._deck.set_rng(rng)
+            game._deck.shuffle_cards()
+            while not game.is_game_end():
+                game.run_player_turn()
+            for winner in game.get_winners():
+                counter[winner.get_player_id()] += 1
+        for participant_id, prob in probs.items():
+            self.assertAlmostEqual(counter[participant_id] / num_trials, prob, delta = 0.015)
+
+    def test_five_players_three_to_draw(self):
+        '''
+            Test a table of five players after the dealer busted and two players had their turns, with three players
+            at 6, 16 and 14 left to draw, is solved in well under a second and matches playing out the rest of the round.
+        '''
+        game = Game(('dealer', 0.3), [(f'player{i}', 0.1 * (i + 3)) for i in range(5)], rng = random.Random(12))
+        game._deck.shuffle_cards()
+        game.assign_initial_two_cards()
+        game.run_dealer_turn()
+        game.run_player_turn()
+        game.run_player_turn()
+        self.assertEqual([player.get_hand_state().score for player in game.get_players()[2:]], [6, 16, 14])
+        start = time.perf_counter()
+        probs = self.calculator.get_win_probabilities(game)
+        self.assertLess(time.perf_counter() - start, 0.5)
+        data = game.to_bytes()
+        rng = random.Random(13)
+        num_trials = 10000
+        counter = dict.fromkeys(probs, 0)
+        for trial in range(num_trials):
+            trial_game = Game.from_bytes(data, rng)
+            trial_game._deck.shuffle_cards(lazy = True)
+            while not trial_game.is_game_end():
+                trial_game.run_player_turn()
+            for winner in trial_game.get_winners():
+                counter[winner.get_player_id()] += 1
+        for participant_id, prob in probs.items():
+            self.assertAlmostEqual(counter[participant_id] / num_trials, prob, delta = 0.02)
+
+    def test_five_players_from_the_deal(self):
+        '''
+            Test tables of five players right after the deal are solved in well under a second each without memoized
+            sub-results, and one of them matches playing out the whole round.
+        '''
+        games = []
+        seed = 0
+        while len(games) < 8:
+            game = Game(('dealer', 0.3), [(f'player{i}', 0.1 * (i + 3)) for i in range(5)], rng = random.Random(seed))
+            game._deck.shuffle_cards()
+            game.assign_initial_two_cards()
+            if not game.get_blackjacks():
+                games.append(game)
+            seed += 1
+        for game in games:
+            start = time.perf_counter()
+            probs = WinProbabilityCalculator().get_win_probabilities(game)
+            self.assertLess(time.perf_counter() - start, 0.5)
+        data = games[-1].to_bytes()
+        rng = random.Random(14)
+        num_trials = 10000
+        counter = dict.fromkeys(probs, 0)
+        for trial in range(num_trials):
+            trial_game = Game.from_bytes(data, rng)
+            trial_game._deck.shuffle_cards(lazy = True)
+            trial_game.run_dealer_turn()
+            while not trial_game.is_game_end():
+                trial_game.run_player_turn()
+            for winner in trial_game.get_winners():
+                counter[winner.get_player_id()] += 1
+        for participant_id, prob in probs.items():
+            self.assertAlmostEqual(counter[participant_id] / num_trials, prob, delta = 0.02)
+
+    def test_deck_can_run_out(self):
+        '''
+            Test a deck of five cards that can run out before the last player is done, with the players drawing in turn.
+            Dealer has 18 and is done. player1 at 12 draws with probability 0.8, player2 at 14 with probability 0.5.
+            The probabilities are exact, and stay close with too few states allowed for that.
+        '''
+        hands = [[Card('10', 'club'), Card('8', 'club')], [Card('10', 'heart'), Card('2', 'club')], [Card('10', 'spade'), Card('4', 'club')]]
+        remaining_cards = [Card('2', 'heart'), Card('3', 'heart'), Card('2', 'spade'), Card('A', 'heart'), Card('5', 'spade')]
+        game = self.make_game(hands, remaining_cards, turn_number = 0)
+        game._players[0].set_prob_to_draw(0.8)
+        probs = self.calculator.get_win_probabilities(game, dealer_turn_done = True)
+        rng = random.Random(15)
+        num_trials = 20000
+        counter = dict.fromkeys(probs, 0)
+        for trial in range(num_trials):
+            trial_game = self.make_game(hands, remaining_cards, turn_number = 0)
+            trial_game._players[0].set_prob_to_draw(0.8)
+            for participant in [trial_game._dealer] + trial_game._players:
+                participant.set_rng(rng)
+            trial_game._deck.set_rng(rng)
+            trial_game._deck.shuffle_cards()
+            while not trial_game.is_game_end():
+                trial_game.run_player_turn()
+            for winner in trial_game.get_winners():
+                counter[winner.get_player_id()] += 1
+        for participant_id, prob in probs.items():
+            self.assertAlmostEqual(counter[participant_id] / num_trials, prob, delta = 0.015)
+        bounded_probs = WinProbabilityCalculator(max_num_states = 2).get_win_probabilities(game, dealer_turn_done = True)
+        for participant_id, prob in probs.items():
+            self.assertAlmostEqual(bounded_probs[participant_id], prob, delta = 0.05)
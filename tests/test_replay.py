@@ -0,0 +1,73 @@
+import unittest
+import random
+from src.replay import (RoundLog, pack_decisions, unpack_decisions, play_recorded_round, replay_round, verify_round,
+                        iter_recorded_rounds, pack_logs, iter_unpack_logs)
+
+DEALER_INFO = ('dealer_id', 0.3)
+PLAYERS_INFO = [('player1', 0.3), ('player2', 0.4), ('player3', 0.5)]
+
+
+class TestReplay(unittest.TestCase):
+    def test_pack_decisions(self):
+        decisions = [True, False, False, True, True, False, True, False, True]
+        data = pack_decisions(decisions)
+        self.assertEqual(data, bytes([0b01011001, 0b1]))
+        self.assertEqual(unpack_decisions(data, len(decisions)), decisions)
+        self.assertEqual(pack_decisions([]), b'')
+
+    def test_replay_reproduces_round(self):
+        '''
+            Test replaying a recorded round reproduces every hand and the deck, without the decision rng.
+        '''
+        for seed in range(50):
+            game, log = play_recorded_round(DEALER_INFO, PLAYERS_INFO, seed, random.Random(seed + 1000))
+            replayed = replay_round(DEALER_INFO, PLAYERS_INFO, log)
+            self.assertEqual(replayed._dealer, game._dealer)
+            self.assertEqual(replayed._players, game._players)
+            self.assertEqual(replayed._deck.get_num_remaining_cards(), game._deck.get_num_remaining_cards())
+            self.assertTrue(verify_round(DEALER_INFO, PLAYERS_INFO, log))
+
+    def test_replay_detects_mismatch(self):
+        seed = next(seed for seed in range(100)
+                    if play_recorded_round(DEALER_INFO, PLAYERS_INFO, seed, random.Random(seed))[1].num_decisions > 1)
+        game, log = play_recorded_round(DEALER_INFO, PLAYERS_INFO, seed, random.Random(seed))
+        self.assertFalse(verify_round(DEALER_INFO, PLAYERS_INFO, log._replace(checksum = log.checksum ^ 1)))
+        self.assertFalse(verify_round(DEALER_INFO, PLAYERS_INFO, log._replace(num_decisions = log.num_decisions - 1)))
+        self.assertFalse(verify_round(DEALER_INFO, PLAYERS_INFO, log._replace(num_decisions = log.num_decisions + 8,
+                                                                             decisions = log.decisions + b'\x00')))
+        with self.assertRaises(ValueError):
+            replay_round(DEALER_INFO, PLAYERS_INFO, log._replace(checksum = log.checksum ^ 1))
+
+    def test_logs_are_small(self):
+        logs = list(iter_recorded_rounds(DEALER_INFO, PLAYERS_INFO, 1000, random.Random(0)))
+        data = pack_logs(logs)
+        self.assertLess(len(data) / len(logs), 10)
+        self.assertEqual(list(iter_unpack_logs(data)), logs)
+        self.assertTrue(all(verify_round(DEALER_INFO, PLAYERS_INFO, log) for log in logs))
+
+    def test_iter_recorded_rounds_deterministic(self):
+        self.assertEqual(list(iter_recorded_rounds(DEALER_INFO, PLAYERS_INFO, 20, random.Random(5))),
+                         list(iter_recorded_rounds(DEALER_INFO, PLAYERS_INFO, 20, random.Random(5))))
+
+    def test_from_bytes_truncated(self):
+        game, log = play_recorded_round(DEALER_INFO, PLAYERS_INFO, 1, random.Random(1))
+        self.assertEqual(RoundLog.from_bytes(log.to_bytes()), log)
+        with self.assertRaises(ValueError):
+            RoundLog.from_bytes(log.to_bytes()[:5])
+
+    def test_largest_table(self):
+        '''
+            Test a round of the largest table a Deck can deal to fits in a log.
+        '''
+        players_info = [(f'player{i}', 1.0) for i in range(25)]
+        for seed in range(20):
+            game, log = play_recorded_round(DEALER_INFO, players_info, seed, random.Random(seed))
+            self.assertTrue(verify_round(DEALER_INFO, players_info, log))
+
+    def test_invalid_seed(self):
+        with self.assertRaises(ValueError):
+            play_recorded_round(DEALER_INFO, PLAYERS_INFO, -1)
+
+
+if __name__ == '__main__':
+    unittest.main()
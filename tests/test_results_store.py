@@ -0,0 +1,109 @@
+import unittest
+import array
+import os
+import random
+import tempfile
+from src.results_store import ResultsStore, load_meta, open_columns
+from src.game import Game
+from src.card import Card
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def read_column(path: str, name: str, fmt: str) -> list[int]:
+    '''
+        A helper function for reading a column file without NumPy.
+    '''
+    values = array.array(fmt)
+    with open(os.path.join(path, f'{name}.bin'), 'rb') as f:
+        values.frombytes(f.read())
+    return values.tolist()
+
+
+class TestResultsStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, 'results')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_constructor_fail_invalid_inputs(self):
+        with self.assertRaises(ValueError):
+            ResultsStore(self.path, num_players = 0)
+        with self.assertRaises(ValueError):
+            ResultsStore(self.path, num_players = 64)
+        with self.assertRaises(TypeError):
+            ResultsStore(self.path, num_players = 2.0)
+
+    def test_append_and_close(self):
+        '''
+            Test appended rounds end up in fixed-width column files cut to the number of rounds, growing past the capacity.
+        '''
+        with ResultsStore(self.path, num_players = 2, capacity = 2) as store:
+            for table_id in range(5):
+                self.assertTrue(store.append(table_id, [17, -1, 20 - table_id], 0, 0b100))
+            self.assertEqual(store.get_num_rounds(), 5)
+        self.assertEqual(load_meta(self.path)['num_rounds'], 5)
+        self.assertEqual(read_column(self.path, 'table_id', 'I'), [0, 1, 2, 3, 4])
+        self.assertEqual(read_column(self.path, 'dealer_score', 'b'), [17] * 5)
+        self.assertEqual(read_column(self.path, 'player_scores', 'b'), [-1, 20, -1, 19, -1, 18, -1, 17, -1, 16])
+        self.assertEqual(read_column(self.path, 'winners', 'Q'), [0b100] * 5)
+        with self.assertRaises(Exception):
+            store.append(5, [17, 18, 19], 0, 0)
+
+    def test_append_fail_wrong_number_of_scores(self):
+        with ResultsStore(self.path, num_players = 2) as store:
+            with self.assertRaises(ValueError):
+                store.append(0, [17, 18], 0, 0)
+
+    def test_reopen_appends(self):
+        '''
+            Test reopening a store keeps its rounds and appends after them.
+        '''
+        with ResultsStore(self.path, num_players = 1) as store:
+            store.append(0, [17, 18], 0, 0b10)
+        with ResultsStore(self.path, num_players = 1) as store:
+            self.assertEqual(store.get_num_rounds(), 1)
+            store.append(1, [21, 5], 0b1, 0)
+        self.assertEqual(read_column(self.path, 'table_id', 'I'), [0, 1])
+        self.assertEqual(read_column(self.path, 'blackjacks', 'Q'), [0, 0b1])
+        with self.assertRaises(ValueError):
+            ResultsStore(self.path, num_players = 2)
+
+    def test_record_round(self):
+        '''
+            Test recording a round with winners and a busted player.
+        '''
+        game = Game(('dealer', 0.3), [('player1', 0.3), ('player2', 0.5)])
+        game._dealer._cards = [Card('10', 'club'), Card('9', 'club')]
+        game._players[0]._cards = [Card('10', 'heart'), Card('9', 'heart')]
+        game._players[1]._cards = [Card('10', 'spade'), Card('9', 'spade'), Card('5', 'spade')]
+        with ResultsStore(self.path, num_players = 2) as store:
+            self.assertTrue(store.record_round(7, game, [], game.get_winners()))
+        self.assertEqual(read_column(self.path, 'dealer_score', 'b'), [19])
+        self.assertEqual(read_column(self.path, 'player_scores', 'b'), [19, -1])
+        self.assertEqual(read_column(self.path, 'winners', 'Q'), [0b011])
+
+    @unittest.skipIf(np is None, 'NumPy is not installed')
+    def test_open_columns(self):
+        '''
+            Test the columns reopen as NumPy arrays matching the rounds played through Game.play_round.
+        '''
+        rng = random.Random(1)
+        expected_scores = []
+        with ResultsStore(self.path, num_players = 3, capacity = 16) as store:
+            for table_id in range(100):
+                game = Game(('dealer', 0.3), [('player1', 0.3), ('player2', 0.4), ('player3', 0.5)], rng = rng)
+                game._deck.shuffle_cards()
+                blackjack_players, winners = game.play_round()
+                store.record_round(table_id, game, blackjack_players, winners)
+                expected_scores.append([participant.calculate_score() for participant in [game._dealer] + game._players])
+        columns = open_columns(self.path)
+        self.assertIsInstance(columns['table_id'], np.memmap)
+        self.assertEqual(columns['player_scores'].shape, (100, 3))
+        self.assertEqual(columns['table_id'].tolist(), list(range(100)))
+        self.assertEqual(columns['dealer_score'].tolist(), [scores[0] for scores in expected_scores])
+        self.assertEqual(columns['player_scores'].tolist(), [scores[1:] for scores in expected_scores])
@@ -0,0 +1,115 @@
+import unittest
+import asyncio
+from src.server import TableServer, run_load_test
+
+
+class TestTableServer(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = TableServer(seed = 0, decision_timeout = 5.0)
+        await self.server.start()
+
+    async def asyncTearDown(self):
+        await self.server.close()
+
+    async def connect(self):
+        reader, writer = await asyncio.open_connection('127.0.0.1', self.server.get_port())
+        self.addAsyncCleanup(self.close_writer, writer)
+        return reader, writer
+
+    async def close_writer(self, writer: asyncio.StreamWriter):
+        writer.close()
+
+    async def send(self, writer: asyncio.StreamWriter, line: str):
+        writer.write(line.encode('ascii') + b'\n')
+        await writer.drain()
+
+    async def receive(self, reader: asyncio.StreamReader) -> list[str]:
+        return (await asyncio.wait_for(reader.readline(), 5.0)).decode('ascii').split()
+
+    async def play_round(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, decision: str) -> list[list[str]]:
+        '''
+            A helper function that answers every TURN with decision and returns the lines up to END.
+        '''
+        lines = []
+        while True:
+            words = await self.receive(reader)
+            lines.append(words)
+            if words[0] == 'TURN':
+                await self.send(writer, decision)
+            elif words[0] == 'END':
+                return lines
+
+    async def test_round(self):
+        '''
+            Test joining, dealing and standing, with hands and scores consistent with each other.
+        '''
+        reader, writer = await self.connect()
+        await self.send(writer, 'JOIN table1 alice')
+        self.assertEqual(await self.receive(reader), ['JOINED', 'table1'])
+        await self.send(writer, 'START')
+        lines = await self.play_round(reader, writer, 'STAND')
+        self.assertEqual(lines[0], ['SEAT', '1'])
+        self.assertEqual([words[:2] for words in lines[1:3]], [['CARDS', '0'], ['CARDS', '1']])
+        self.assertFalse(any(words[:2] == ['CARD', '1'] for words in lines))
+        self.assertEqual(len(lines[-1]), 4)
+        self.assertEqual(len(lines[-1][1].split(',')), 2)
+
+    async def test_errors(self):
+        reader, writer = await self.connect()
+        await self.send(writer, 'DRAW')
+        self.assertEqual(await self.receive(reader), ['ERR', 'not', 'your', 'turn'])
+        await self.send(writer, 'START')
+        self.assertEqual(await self.receive(reader), ['ERR', 'not', 'at', 'a', 'table'])
+        await self.send(writer, 'HELLO')
+        self.assertEqual(await self.receive(reader), ['ERR', 'unknown', 'command'])
+        await self.send(writer, 'JOIN table1 alice')
+        await self.receive(reader)
+        await self.send(writer, 'JOIN table2 alice')
+        self.assertEqual(await self.receive(reader), ['ERR', 'already', 'at', 'a', 'table'])
+
+    async def test_tables_isolated(self):
+        '''
+            Test a player waiting to decide at one table does not hold up another table.
+        '''
+        slow_reader, slow_writer = await self.connect()
+        reader, writer = await self.connect()
+        await self.send(slow_writer, 'JOIN table1 slow')
+        await self.send(writer, 'JOIN table2 fast')
+        await self.receive(slow_reader)
+        await self.receive(reader)
+        await self.send(slow_writer, 'START')
+        for i in range(5):
+            await self.send(writer, 'START')
+            await self.play_round(reader, writer, 'DRAW')
+        self.assertEqual(self.server.get_num_tables(), 2)
+
+    async def test_leave_removes_table(self):
+        reader, writer = await self.connect()
+        await self.send(writer, 'JOIN table1 alice')
+        await self.receive(reader)
+        self.assertEqual(self.server.get_num_tables(), 1)
+        writer.close()
+        for i in range(100):
+            if self.server.get_num_tables() == 0:
+                break
+            await asyncio.sleep(0.01)
+        self.assertEqual(self.server.get_num_tables(), 0)
+
+    async def test_close_with_clients(self):
+        '''
+            Test closing the server in the middle of a round closes the connections of its clients and returns.
+        '''
+        reader, writer = await self.connect()
+        await self.send(writer, 'JOIN table1 alice')
+        await self.receive(reader)
+        await self.send(writer, 'START')
+        while (await self.receive(reader))[0] != 'TURN':
+            pass
+        self.assertTrue(await asyncio.wait_for(self.server.close(), 5.0))
+        self.assertEqual(await asyncio.wait_for(reader.read(), 5.0), b'')
+
+    async def test_load_test(self):
+        result = await run_load_test('127.0.0.1', self.server.get_port(), num_tables = 20, clients_per_table = 3, num_rounds = 5)
+        self.assertEqual(result['rounds'], 100)
+        self.assertGreater(result['decisions'], 0)
+        self.assertLessEqual(result['p50_us'], result['p99_us'])
@@ -0,0 +1,149 @@
+import unittest
+import random
+from src.shoe import Shoe
+from src.card import Card, CANONICAL_CARDS
+from src.player import Player
+from src.game import Game
+
+class TestShoe(unittest.TestCase):
+    def setUp(self):
+        self.shoe = Shoe(num_decks = 6, penetration = 0.75)
+
+    def test_constructor(self):
+        '''
+            Test the following fields inside the constructor:
+                self._cards
+                self._idx_of_next_card_to_issue
+                self._idx_of_cut_card
+        '''
+        self.assertEqual(len(self.shoe._cards), 6 * 52)
+        self.assertEqual(self.shoe._cards[:52], bytearray(range(52)))
+        for code in range(52):
+            self.assertEqual(self.shoe._cards.count(code), 6)
+        self.assertEqual(self.shoe._idx_of_next_card_to_issue, 0)
+        self.assertEqual(self.shoe._idx_of_cut_card, 234)
+
+    def test_constructor_fail_invalid_inputs(self):
+        '''
+            Test the constructor with invalid number of decks or penetration.
+        '''
+        with self.assertRaises(ValueError):
+            Shoe(num_decks = 0)
+        with self.assertRaises(TypeError):
+            Shoe(num_decks = 1.5)
+        with self.assertRaises(ValueError):
+            Shoe(penetration = 0)
+        with self.assertRaises(ValueError):
+            Shoe(penetration = 1.2)
+
+    def test_get_cards(self):
+        '''
+            Test get_cards() returns the canonical Card objects in dealing order.
+        '''
+        cards = self.shoe.get_cards()
+        self.assertEqual(len(cards), 312)
+        self.assertIs(cards[53], CANONICAL_CARDS[1])
+
+    def test_get_unissued_cards(self):
+        '''
+            Test get_unissued_cards() returns the canonical Card objects after the issued ones.
+        '''
+        self.shoe._idx_of_next_card_to_issue = 310
+        self.assertEqual(self.shoe.get_unissued_cards(), [CANONICAL_CARDS[50], CANONICAL_CARDS[51]])
+
+    def test_shuffle_cards(self):
+        '''
+            Test shuffling keeps every card and puts issued cards back into the shoe.
+        '''
+        self.shoe._idx_of_next_card_to_issue = 100
+        self.assertTrue(self.shoe.shuffle_cards())
+        self.assertEqual(self.shoe._idx_of_next_card_to_issue, 0)
+        self.assertEqual(sorted(self.shoe._cards), sorted(bytearray(range(52)) * 6))
+        self.assertNotEqual(self.shoe._cards, bytearray(range(52)) * 6)
+
+    def test_issue_card(self):
+        '''
+            Test issuing cards appends the canonical Card objects and updates the hand state.
+        '''
+        player = Player('player_id', 0.3)
+        self.shoe._idx_of_next_card_to_issue = 48  # Next cards to issue are the four Aces of the first deck.
+        self.assertTrue(self.shoe.issue_card(player, num_cards_to_issue = 2))
+        self.assertEqual(player._cards, [Card('A', 'club'), Card('A', 'diamond')])
+        self.assertIs(player._cards[0], CANONICAL_CARDS[48])
+        self.assertEqual(player.calculate_score(), 12)
+        self.assertEqual(self.shoe.get_num_remaining_cards(), 312 - 50)
+
+    def test_issue_card_fail_all_cards_issued(self):
+        '''
+            Check if issue_card() raises Exception when all cards in the shoe have been issued.
+        '''
+        player = Player('player_id', 0.3)
+        self.shoe._idx_of_next_card_to_issue = len(self.shoe._cards) - 1
+        with self.assertRaises(Exception):
+            self.shoe.issue_card(player, num_cards_to_issue = 2)
+        self.assertEqual(len(player._cards), 1)
+        self.assertEqual(self.shoe.get_num_remaining_cards(), 0)
+
+    def test_reshuffle_if_needed(self):
+        '''
+            Test the shoe is reshuffled only once the cut card has been reached.
+        '''
+        self.shoe._idx_of_next_card_to_issue = 233
+        self.assertFalse(self.shoe.is_cut_card_reached())
+        self.assertFalse(self.shoe.reshuffle_if_needed())
+        self.assertEqual(self.shoe._idx_of_next_card_to_issue, 233)
+        self.shoe._idx_of_next_card_to_issue = 234
+        self.assertTrue(self.shoe.is_cut_card_reached())
+        self.assertTrue(self.shoe.reshuffle_if_needed())
+        self.assertEqual(self.shoe._idx_of_next_card_to_issue, 0)
+
+    def test_game_with_shoe_allows_large_tables(self):
+        '''
+            Test a Game with a shoe accepts more than 25 players and deals them their initial two cards.
+        '''
+        players_info = [(f'player{i}', 0.3) for i in range(40)]
+        with self.assertRaises(ValueError):
+            Game(('dealer', 0.3), players_info)
+        game = Game(('dealer', 0.3), players_info, deck = self.shoe)
+        self.assertEqual(game.get_max_num_players(), 77)
+        self.shoe.shuffle_cards()
+        self.assertTrue(game.assign_initial_two_cards())
+        self.assertEqual(self.shoe.get_num_remaining_cards(), 312 - 82)
+        for player in game.get_players():
+            self.assertEqual(len(player.get_cards()), 2)
+
+    def test_reshuffle_if_needed_num_cards_needed(self):
+        '''
+            Test the shoe is reshuffled before the cut card if fewer cards than needed remain.
+        '''
+        self.shoe._idx_of_next_card_to_issue = 200
+        self.assertFalse(self.shoe.reshuffle_if_needed(112))
+        self.assertEqual(self.shoe._idx_of_next_card_to_issue, 200)
+        self.assertTrue(self.shoe.reshuffle_if_needed(113))
+        self.assertEqual(self.shoe._idx_of_next_card_to_issue, 0)
+
+    def test_game_with_shoe_large_table_rounds(self):
+        '''
+            Test the largest table a shoe seats plays many rounds without running the shoe dry, and that a table
+            too large for the shoe, which used to run out of cards in its second round, is refused.
+        '''
+        rng = random.Random(6)
+        with self.assertRaises(ValueError):
+            Game(('dealer', 0.3), [(f'player{i}', 0.3) for i in range(100)], deck = self.shoe, rng = rng)
+        for num_players in [40, 77]:
+            shoe = Shoe(num_decks = 6, penetration = 0.75, rng = rng)
+            shoe.shuffle_cards()
+            game = Game(('dealer', 0.3), [(f'player{i}', 0.1 * (i % 10)) for i in range(num_players)], deck = shoe, rng = rng)
+            num_shuffles = shoe._num_shuffles
+            for blackjack_players, winners in game.play_rounds(50):
+                self.assertGreater(shoe.get_num_remaining_cards(), 0)
+            self.assertGreater(shoe._num_shuffles - num_shuffles, 10)
+
+    def test_game_reshuffles_shoe_at_cut_card(self):
+        '''
+            Test Game reshuffles the shoe before dealing when the cut card has been reached.
+        '''
+        game = Game(('dealer', 0.3), [('player1', 0.4)], deck = self.shoe)
+        self.shoe._idx_of_next_card_to_issue = 300
+        game.assign_initial_two_cards()
+        self.assertEqual(self.shoe._idx_of_next_card_to_issue, 4)
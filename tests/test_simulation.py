@@ -0,0 +1,91 @@
+import unittest
+from src.simulation import SimulationResult, derive_seeds, run_rounds, run_simulation
+from src.game import Game
+from src.card import Card
+
+
+class TestSimulation(unittest.TestCase):
+    def setUp(self):
+        self.dealer_info = ('dealer', 0.3)
+        self.players_info = [('player1', 0.3), ('player2', 0.5)]
+
+    def test_derive_seeds(self):
+        '''
+            Test seeds derived from the same master seed are identical and distinct from each other.
+        '''
+        self.assertEqual(derive_seeds(7, 4), derive_seeds(7, 4))
+        self.assertEqual(len(set(derive_seeds(7, 4))), 4)
+        self.assertNotEqual(derive_seeds(7, 4), derive_seeds(8, 4))
+
+    def test_record_round_winners(self):
+        '''
+            Test recording a round with winners and a busted player.
+        '''
+        game = Game(self.dealer_info, self.players_info)
+        game._dealer._cards = [Card('10', 'club'), Card('9', 'club')]
+        game._players[0]._cards = [Card('10', 'heart'), Card('9', 'heart')]
+        game._players[1]._cards = [Card('10', 'spade'), Card('9', 'spade'), Card('5', 'spade')]
+        result = SimulationResult(['dealer', 'player1', 'player2'])
+        self.assertTrue(result.record_round(game, [], game.get_winners()))
+        self.assertEqual(result.get_num_rounds(), 1)
+        self.assertEqual(result.get_wins(), {'dealer': 1, 'player1': 1, 'player2': 0})
+        self.assertEqual(result.get_busts(), {'dealer': 0, 'player1': 0, 'player2': 1})
+
+    def test_record_round_blackjacks(self):
+        '''
+            Test recording a round ended by blackjack.
+        '''
+        game = Game(self.dealer_info, self.players_info)
+        game._dealer._cards = [Card('10', 'club'), Card('5', 'club')]
+        game._players[0]._cards = [Card('A', 'heart'), Card('K', 'heart')]
+        game._players[1]._cards = [Card('10', 'spade'), Card('9', 'spade')]
+        result = SimulationResult(['dealer', 'player1', 'player2'])
+        result.record_round(game, game.get_blackjacks(), [])
+        self.assertEqual(result.get_num_blackjack_rounds(), 1)
+        self.assertEqual(result.get_blackjacks(), {'dealer': 0, 'player1': 1, 'player2': 0})
+        self.assertEqual(result.get_wins(), {'dealer': 0, 'player1': 0, 'player2': 0})
+
+    def test_merge(self):
+        '''
+            Test merging the counts of two results.
+        '''
+        result = run_rounds(self.dealer_info, self.players_info, 100, seed = 1)
+        other = run_rounds(self.dealer_info, self.players_info, 50, seed = 2)
+        wins = {participant_id: result.get_wins()[participant_id] + other.get_wins()[participant_id] for participant_id in result.get_participant_ids()}
+        self.assertTrue(result.merge(other))
+        self.assertEqual(result.get_num_rounds(), 150)
+        self.assertEqual(result.get_wins(), wins)
+        with self.assertRaises(ValueError):
+            result.merge(SimulationResult(['someone_else']))
+
+    def test_run_rounds_reproducible(self):
+        '''
+            Test the same seed gives identical counts.
+        '''
+        self.assertEqual(run_rounds(self.dealer_info, self.players_info, 500, seed = 3),
+                         run_rounds(self.dealer_info, self.players_info, 500, seed = 3))
+        self.assertNotEqual(run_rounds(self.dealer_info, self.players_info, 500, seed = 3),
+                            run_rounds(self.dealer_info, self.players_info, 500, seed = 4))
+
+    def test_run_simulation_reproducible_with_workers(self):
+        '''
+            Test the same seed and number of workers give identical totals over a process pool.
+        '''
+        result = run_simulation(self.dealer_info, self.players_info, 1001, num_workers = 2, seed = 5)
+        self.assertEqual(result.get_num_rounds(), 1001)
+        self.assertEqual(result, run_simulation(self.dealer_info, self.players_info, 1001, num_workers = 2, seed = 5))
+        num_decided_rounds = result.get_num_rounds() - result.get_num_blackjack_rounds()
+        self.assertGreaterEqual(sum(result.get_wins().values()), num_decided_rounds * 0.9)
+
+    def test_run_simulation_one_worker(self):
+        '''
+            Test a single worker runs the rounds in process with the derived seed.
+        '''
+        result = run_simulation(self.dealer_info, self.players_info, 300, num_workers = 1, seed = 6)
+        self.assertEqual(result, run_rounds(self.dealer_info, self.players_info, 300, derive_seeds(6, 1)[0]))
+
+    def test_run_simulation_invalid_inputs(self):
+        with self.assertRaises(ValueError):
+            run_simulation(self.dealer_info, self.players_info, -1, num_workers = 1)
+        with self.assertRaises(ValueError):
+            run_simulation(self.dealer_info, self.players_info, 10, num_workers = 0)
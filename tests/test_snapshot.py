@@ -0,0 +1,140 @@
+import unittest
+import random
+from src.card import CANONICAL_CARDS
+from src.deck import Deck
+from src.shoe import Shoe
+from src.player import Player, Dealer
+from src.game import Game
+from src.policy import BasicStrategyPolicy, LookupTablePolicy, ProbabilisticPolicy, build_table
+from tests.test_policy import AlwaysDraw
+
+
+class TestGameSnapshot(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        self.game = Game(('dealer_id', 0.3), [('player1', 0.4), ('玩家2', 0.5)], deck = Deck(rng), rng = rng)
+        self.game._deck.shuffle_cards()
+        self.game.assign_initial_two_cards()
+        self.game.run_dealer_turn()
+
+    def assert_games_equal(self, game: Game, other: Game):
+        self.assertEqual(game._dealer, other._dealer)
+        self.assertEqual(game._players, other._players)
+        self.assertEqual(game._turn_number, other._turn_number)
+        self.assertEqual(list(game._deck._cards), list(other._deck._cards))
+        self.assertEqual(game._deck._idx_of_next_card_to_issue, other._deck._idx_of_next_card_to_issue)
+        for participant, restored in zip([game._dealer] + game._players, [other._dealer] + other._players):
+            self.assertEqual(participant.calculate_score(), restored.calculate_score())
+
+    def test_round_trip_mid_round(self):
+        '''
+            Test a restored game has the same hands, scores, deck order and cursor, and plays on identically.
+        '''
+        restored = Game.from_bytes(self.game.to_bytes(), rng = random.Random(1))
+        self.assert_games_equal(self.game, restored)
+        self.assertIsInstance(restored._dealer, Dealer)
+        self.assertIs(type(restored._players[0]), Player)
+        self.assertTrue(all(card is CANONICAL_CARDS[card._code] for card in restored._deck._cards))
+        self.assertEqual(restored.to_bytes(), self.game.to_bytes())
+        rng = random.Random(1)
+        restored_rng = random.Random(1)
+        for player, restored_player in zip(self.game._players, restored._players):
+            player.set_rng(rng)
+            restored_player.set_rng(restored_rng)
+        self.game.run_player_turn()
+        restored.run_player_turn()
+        self.assert_games_equal(self.game, restored)
+
+    def test_round_trip_lazy_shuffle(self):
+        game = Game(('dealer_id', 0.3), [('player1', 0.4)])
+        game._deck.shuffle_cards(lazy = True)
+        game.assign_initial_two_cards()
+        restored = Game.from_bytes(game.to_bytes())
+        self.assertEqual(restored._deck._lazy_shuffle, game._deck._lazy_shuffle)
+        self.assert_games_equal(game, restored)
+
+    def test_round_trip_shoe(self):
+        rng = random.Random(3)
+        shoe = Shoe(2, 0.6, rng)
+        shoe.shuffle_cards()
+        game = Game(('dealer_id', 0.3), [('player1', 0.4)], deck = shoe, rng = rng)
+        game.play_round()
+        restored = Game.from_bytes(game.to_bytes())
+        self.assertIsInstance(restored._deck, Shoe)
+        self.assertEqual(restored._deck._num_decks, 2)
+        self.assertEqual(restored._deck._penetration, 0.6)
+        self.assertEqual(restored._deck._idx_of_cut_card, shoe._idx_of_cut_card)
+        self.assert_games_equal(game, restored)
+
+    def test_round_trip_policies(self):
+        '''
+            Test every seat keeps its policy, a LookupTablePolicy with its own table.
+        '''
+        table = build_table(lambda score, is_soft, upcard_value: score < 17 or is_soft and upcard_value > 9)
+        self.game._players[0].set_policy(BasicStrategyPolicy())
+        self.game._players[1].set_policy(LookupTablePolicy(table, default = True))
+        restored = Game.from_bytes(self.game.to_bytes())
+        self.assert_games_equal(self.game, restored)
+        self.assertIs(type(restored._dealer.get_policy()), type(self.game._dealer.get_policy()))
+        self.assertIs(type(restored._players[0].get_policy()), BasicStrategyPolicy)
+        self.assertEqual(restored._players[1].get_policy(), LookupTablePolicy(table, default = True))
+        self.assertEqual(restored.to_bytes(), self.game.to_bytes())
+
+    def test_to_bytes_unencodable_policy(self):
+        self.game._players[0].set_policy(AlwaysDraw())
+        with self.assertRaises(TypeError):
+            self.game.to_bytes()
+        self.game._players[0].set_policy(ProbabilisticPolicy())
+        self.assertIs(type(Game.from_bytes(self.game.to_bytes())._players[0].get_policy()), ProbabilisticPolicy)
+
+    def test_from_bytes_version_1(self):
+        '''
+            Test a snapshot of version 1, without policy tags, restores every seat with its default policy.
+        '''
+        data = self.game.to_bytes()
+        # A header of 9 bytes and a deck header of 4 bytes, then participants of 11 bytes ending in the policy tag.
+        end = 13 + 11 * (len(self.game._players) + 1)
+        participants = [data[offset:offset + 10] for offset in range(13, end, 11)]
+        version_1 = b''.join([data[:2], bytes([1]), data[3:13]] + participants + [data[end:]])
+        self.assert_games_equal(self.game, Game.from_bytes(version_1))
+
+    def test_snapshot_is_compact(self):
+        self.assertLess(len(self.game.to_bytes()), 200)
+
+    def test_from_bytes_invalid(self):
+        data = self.game.to_bytes()
+        with self.assertRaises(ValueError):
+            Game.from_bytes(b'XX' + data[2:])
+        with self.assertRaises(ValueError):
+            Game.from_bytes(data[:2] + bytes([99]) + data[3:])
+        for length in [0, 5, 12, 30, len(data) - 1]:
+            with self.assertRaises(ValueError):
+                Game.from_bytes(data[:length])
+        with self.assertRaises(ValueError):
+            Game.from_bytes(data + b'\x00')
+
+    def test_from_bytes_corrupted(self):
+        '''
+            Test snapshots whose fields decode but do not make a valid game are refused.
+        '''
+        data = self.game.to_bytes()
+        # The turn number is at offset 5, the index of the next card to issue at offset 11, the deck codes at the end.
+        with self.assertRaises(ValueError):
+            Game.from_bytes(data[:5] + (3).to_bytes(2, 'little') + data[7:])
+        with self.assertRaises(ValueError):
+            Game.from_bytes(data[:11] + (53).to_bytes(2, 'little') + data[13:])
+        with self.assertRaises(ValueError):
+            Game.from_bytes(data[:-1] + data[-2:-1])
+        with self.assertRaises(ValueError):
+            Game.from_bytes(data[:-1] + bytes([52]))
+        shoe = Shoe(2, 0.6, random.Random(3))
+        shoe.shuffle_cards()
+        data = Game(('dealer_id', 0.3), [('player1', 0.4)], deck = shoe).to_bytes()
+        self.assertEqual(len(Game.from_bytes(data)._deck._cards), 104)
+        for corrupted in (data[:-1] + bytes([52]), data[:-1] + data[-2:-1]):
+            with self.assertRaises(ValueError):
+                Game.from_bytes(corrupted)
+
+
+if __name__ == '__main__':
+    unittest.main()